@@ -1,8 +1,12 @@
+from .file_registration import RegistrationBatch
 from .input_ingestion import InputIngestionService, ingest_csv_to_stage0
+from .stage0_streaming import stream_csv_to_stage0
 
 __all__ = [
     "InputIngestionService",
+    "RegistrationBatch",
     "ingest_csv_to_stage0",
+    "stream_csv_to_stage0",
 ]
 
 
@@ -0,0 +1,91 @@
+"""
+FILE REGISTRATION MODULE
+========================
+
+Gebündelte Registrierung von Input-/Stage0-Dateien in der JSON-DB (Files-Tabelle).
+
+Statt je CSV eine eigene DB-Instanz zu laden, zwei Records anzulegen und zu speichern, läuft
+eine ganze Ingestion über eine Instanz und genau ein `save()`:
+
+    db = ChurnJSONDatabase()
+    with RegistrationBatch(db) as batch:
+        batch.register("input.csv", "input_data")
+        batch.register("<hash>.json", "stage0_cache")
+        ...                                   # weitere Änderungen an db.data (z. B. rawdata) werden mitgespeichert
+    if not batch.saved:
+        ...
+
+- Doppelte Registrierungen (Dateiname + source_type) werden übersprungen
+- Verschachtelte Batches auf derselben DB speichern nur im äußersten Batch
+- Bei einer Ausnahme wird nicht gespeichert (DB-Datei unverändert) und die Files-Tabelle im
+  Speicher auf den Stand vor dem Batch zurückgesetzt. Nur die Files-Tabelle: andere Änderungen an
+  `db.data` im Batch (z. B. rawdata) bleiben im Speicher stehen – der Aufrufer verwirft die Instanz
+  bzw. lädt sie neu, bevor er sie weiterverwendet
+- `save=False`: der Aufrufer besitzt die DB-Instanz und speichert selbst (injizierter Handle)
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+_DEPTH_ATTR = "_registration_batch_depth"
+
+
+def file_records(db) -> List[Dict[str, Any]]:
+    return db.data.setdefault("tables", {}).setdefault("files", {}).setdefault("records", [])
+
+
+class RegistrationBatch:
+    """Transaktionale File-Registrierung auf einer DB-Instanz mit einem `save()` am Ende."""
+
+    def __init__(self, db, save: bool = True):
+        self.db = db
+        self.save = save
+        self.saved = False
+        self.created: List[Tuple[str, str]] = []
+        self._registered: Set[Tuple[str, str]] = set()
+        self._snapshot: Optional[List[Dict[str, Any]]] = None
+        self._outermost = False
+
+    def __enter__(self) -> "RegistrationBatch":
+        depth = getattr(self.db, _DEPTH_ATTR, 0)
+        self._outermost = depth == 0
+        setattr(self.db, _DEPTH_ATTR, depth + 1)
+        records = file_records(self.db)
+        self._snapshot = [dict(record) for record in records]
+        self._registered = {
+            ((r.get("file_name") or ""), (r.get("source_type") or "").lower())
+            for r in records
+        }
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        setattr(self.db, _DEPTH_ATTR, getattr(self.db, _DEPTH_ATTR, 1) - 1)
+        if exc_type is not None:
+            file_records(self.db)[:] = self._snapshot or []
+            self.created = []
+            return False
+        if self.save and self._outermost:
+            self.saved = bool(self.db.save())
+        return False
+
+    # -------------------------
+    # Registrierung
+    # -------------------------
+
+    def is_registered(self, file_name: str, source_type: str) -> bool:
+        return (file_name, source_type.lower()) in self._registered
+
+    def registered_names(self, source_type: str) -> Set[str]:
+        source_type = source_type.lower()
+        return {name for name, kind in self._registered if kind == source_type}
+
+    def register(self, file_name: str, source_type: str) -> bool:
+        """Datei registrieren (ohne save). Liefert False, wenn sie bereits registriert war."""
+        key = (file_name, source_type.lower())
+        if key in self._registered:
+            return False
+        self.db.create_file_record(file_name=file_name, source_type=source_type)
+        self._registered.add(key)
+        self.created.append(key)
+        return True
@@ -0,0 +1,180 @@
+"""
+INGESTION MANIFEST MODULE
+=========================
+
+Schnelle Änderungserkennung für Input-CSVs ohne erneutes Hashen.
+
+Je ingestierter Datei hält das Manifest (`ProjectPaths.ingestion_manifest_file()`):
+- Stat-Signatur: Größe, mtime (ns), Inode
+- Inhalts-Hash (`full`: SHA-256 der ganzen Datei, `sampled`: Größe + Stichprobenblöcke)
+- Name der erzeugten Stage0-Datei und Stage0-Modus (`step0`, `streaming`, `streaming-approx`)
+
+Prüfreihenfolge:
+1. Stat-Signatur und Stage0-Modus unverändert, Stage0-Export vorhanden → Datei gilt als unverändert
+   (kein Lesen)
+2. Stat geändert (z. B. `touch`, Kopie), Inhalts-Hash gleich → nur Signatur aktualisieren
+3. sonst → Step0-Analyse erforderlich (bei geändertem Modus mit Neu-Analyse)
+
+Das Manifest beschreibt nur die Dateiseite; ob Registrierung und rawdata-Partition in der
+JSON-DB noch existieren (z. B. nach `make cleanDB`), prüft `ingest_data.missing_in_database`.
+Damit dafür nicht jeder Lauf die ganze DB lädt, hält das Manifest eine Zustandsmarke der DB-Datei
+(Pfad, Größe, mtime) vom letzten Abgleich: unverändert → DB-Stand gilt weiter als bestätigt.
+
+`sampled` liest bei großen Dateien (ab `INGEST_SAMPLED_HASH_MIN_BYTES`) nur Blöcke an festen
+Positionen; Änderungen zwischen den Stichproben bei gleicher Größe und gleichem Stat bleiben dann
+unerkannt – der Modus ist daher optional.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+from config.paths_config import ProjectPaths
+
+HASH_MODES = ("full", "sampled")
+SAMPLED_HASH_MIN_BYTES = int(os.environ.get("INGEST_SAMPLED_HASH_MIN_BYTES", str(64 * 1024 * 1024)))
+
+_HASH_BLOCK = 1024 * 1024
+_SAMPLE_POSITIONS = 8
+
+
+def stat_signature(path: Path) -> Dict[str, int]:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "inode": stat.st_ino}
+
+
+def database_stamp(db_path: Path) -> Optional[Dict[str, Any]]:
+    """Zustandsmarke der JSON-DB-Datei; ändert sich mit jedem `save()` (None: Datei fehlt)."""
+    try:
+        stat = Path(db_path).stat()
+    except OSError:
+        return None
+    return {"path": str(db_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def content_hash(path: Path, mode: str = "full") -> str:
+    """Inhalts-Hash; `sampled` nur für große Dateien, kleine werden immer vollständig gehasht."""
+    if mode not in HASH_MODES:
+        raise ValueError(f"Unknown hash mode: {mode}")
+    size = path.stat().st_size
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        if mode == "sampled" and size >= SAMPLED_HASH_MIN_BYTES:
+            digest.update(f"sampled:{size}".encode())
+            step = max((size - _HASH_BLOCK) // (_SAMPLE_POSITIONS - 1), 1)
+            for index in range(_SAMPLE_POSITIONS):
+                fh.seek(min(index * step, size - _HASH_BLOCK))
+                digest.update(fh.read(_HASH_BLOCK))
+            return f"sampled:{digest.hexdigest()}"
+        for block in iter(lambda: fh.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """Manifest der ingestierten Input-Dateien (Dateiname → Signatur, Hash, Stage0-Datei)."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path is not None else ProjectPaths.ingestion_manifest_file()
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.database: Optional[Dict[str, Any]] = None
+        self.dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            self.entries = data.get("files", {})
+            self.database = data.get("database")
+        except (OSError, ValueError):
+            self.entries = {}
+
+    # -------------------------
+    # Prüfen
+    # -------------------------
+
+    def is_unchanged(self, csv_path: Path, stage0_dir: Optional[Path] = None, stage0_mode: Optional[str] = None) -> bool:
+        """Stat-Signatur und Stage0-Modus unverändert, Stage0-Export vorhanden (ohne die Datei zu lesen)."""
+        entry = self.entries.get(csv_path.name)
+        if not entry or entry.get("signature") != stat_signature(csv_path):
+            return False
+        return self.mode_matches(csv_path, stage0_mode) and self._stage0_present(entry, stage0_dir)
+
+    def refresh_if_same_content(self, csv_path: Path, stage0_dir: Optional[Path] = None, stage0_mode: Optional[str] = None) -> bool:
+        """Stat geändert, Inhalt und Stage0-Modus gleich → Signatur aktualisieren und True liefern."""
+        entry = self.entries.get(csv_path.name)
+        if not entry or not self.mode_matches(csv_path, stage0_mode) or not self._stage0_present(entry, stage0_dir):
+            return False
+        # Vergleich im Modus des gespeicherten Hashes
+        stored_mode = "sampled" if str(entry.get("content_hash", "")).startswith("sampled:") else "full"
+        if content_hash(csv_path, stored_mode) != entry.get("content_hash"):
+            return False
+        entry["signature"] = stat_signature(csv_path)
+        self.dirty = True
+        return True
+
+    def mode_matches(self, csv_path: Path, stage0_mode: Optional[str]) -> bool:
+        """Stage0 im gewünschten Modus erzeugt (ältere Einträge ohne Modus: Step0)."""
+        entry = self.entries.get(csv_path.name)
+        if entry is None:
+            return False
+        return stage0_mode is None or entry.get("stage0_mode", "step0") == stage0_mode
+
+    def database_unchanged(self, db_path: Path) -> bool:
+        """DB-Datei seit dem letzten bestätigten Abgleich unverändert (nur `stat`, kein Laden)."""
+        stamp = database_stamp(db_path)
+        return stamp is not None and stamp == self.database
+
+    @staticmethod
+    def _stage0_present(entry: Dict[str, Any], stage0_dir: Optional[Path]) -> bool:
+        if stage0_dir is None or not entry.get("stage0_file"):
+            return True
+        return (stage0_dir / entry["stage0_file"]).exists()
+
+    # -------------------------
+    # Schreiben
+    # -------------------------
+
+    def record(
+        self,
+        csv_path: Path,
+        stage0_file: Optional[str],
+        digest: Optional[str] = None,
+        mode: str = "full",
+        stage0_mode: str = "step0",
+    ) -> None:
+        self.entries[csv_path.name] = {
+            "signature": stat_signature(csv_path),
+            "content_hash": digest or content_hash(csv_path, mode),
+            "stage0_file": stage0_file,
+            "stage0_mode": stage0_mode,
+            "ingested_at": datetime.now().isoformat(),
+        }
+        self.dirty = True
+
+    def record_database(self, db_path: Path) -> None:
+        """DB-Stand als abgeglichen merken (nach `db.save()` bzw. einer Prüfung ohne Befund)."""
+        stamp = database_stamp(db_path)
+        if stamp != self.database:
+            self.database = stamp
+            self.dirty = True
+
+    def forget(self, file_names: Iterable[str]) -> None:
+        for name in file_names:
+            if self.entries.pop(name, None) is not None:
+                self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        staging = self.path.with_name(f".{self.path.name}.{uuid.uuid4().hex[:8]}")
+        staging.write_text(
+            json.dumps({"version": 1, "files": self.entries, "database": self.database}, indent=2, sort_keys=True),
+            encoding="utf-8",
+        )
+        os.replace(staging, self.path)
+        self.dirty = False
@@ -0,0 +1,101 @@
+"""
+INGESTION WATCH MODULE
+======================
+
+Polling-basierte Überwachung des Input-Verzeichnisses (`ProjectPaths.input_data_directory()`).
+
+Entprellung teilweise geschriebener Dateien über Stabilitätsprüfung: eine CSV gilt erst als
+bereit, wenn Größe und mtime über mindestens `settle_seconds` (und zwei Abfragen) unverändert
+geblieben sind. Danach wird sie genau einmal gemeldet – bis sich ihre Signatur wieder ändert.
+
+Bewusst ohne inotify/FSEvents: Polling funktioniert auch auf Netzlaufwerken und Docker-Volumes,
+und die Kosten sind ein `stat()` je Datei und Intervall.
+"""
+
+from __future__ import annotations
+
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Typische Namen unvollständiger Uploads/Kopien werden nie gemeldet
+_PARTIAL_SUFFIXES = (".part", ".tmp", ".crdownload", ".partial")
+
+
+def is_candidate(path: Path) -> bool:
+    name = path.name
+    return not name.startswith(".") and not name.startswith("~") and not name.endswith(_PARTIAL_SUFFIXES)
+
+
+class StableFileTracker:
+    """Meldet neue/geänderte Dateien, sobald sie `settle_seconds` lang unverändert sind."""
+
+    def __init__(self, settle_seconds: float = 5.0, clock=time.monotonic):
+        self.settle_seconds = settle_seconds
+        self._clock = clock
+        # Name → (Signatur, seit wann stabil)
+        self._observed: Dict[str, Tuple[Tuple[int, int], float]] = {}
+        # Name → zuletzt gemeldete Signatur
+        self._reported: Dict[str, Tuple[int, int]] = {}
+
+    def seed(self, paths: Iterable[Path]) -> None:
+        """Dateien als bereits gemeldet übernehmen (z. B. nach dem initialen Ingestion-Lauf)."""
+        for path in paths:
+            signature = self._signature(path)
+            if signature is not None:
+                self._reported[path.name] = signature
+
+    def forget(self, names: Iterable[str]) -> None:
+        """Meldung zurücknehmen (z. B. fehlgeschlagene Ingestion → beim nächsten Poll erneut)."""
+        for name in names:
+            self._reported.pop(name, None)
+            self._observed.pop(name, None)
+
+    def poll(self, paths: Iterable[Path]) -> Tuple[List[Path], List[str]]:
+        """
+        Verzeichnisinhalt abgleichen.
+
+        Returns:
+            (bereite Dateien, seit der letzten Meldung entfernte Dateinamen)
+        """
+        now = self._clock()
+        ready: List[Path] = []
+        present: Set[str] = set()
+        for path in sorted(paths):
+            if not is_candidate(path):
+                continue
+            signature = self._signature(path)
+            if signature is None:
+                continue
+            present.add(path.name)
+            if self._reported.get(path.name) == signature:
+                self._observed.pop(path.name, None)
+                continue
+            previous = self._observed.get(path.name)
+            if previous is None or previous[0] != signature:
+                # Neu oder noch in Bewegung → Stabilitätsfenster (neu) starten
+                self._observed[path.name] = (signature, now)
+                continue
+            if now - previous[1] >= self.settle_seconds:
+                ready.append(path)
+                self._reported[path.name] = signature
+                del self._observed[path.name]
+
+        removed = sorted(set(self._reported) - present)
+        for name in removed:
+            del self._reported[name]
+        for name in set(self._observed) - present:
+            del self._observed[name]
+        return ready, removed
+
+    def pending(self) -> List[str]:
+        """Dateien, die gerade entprellt werden (noch nicht stabil)."""
+        return sorted(self._observed)
+
+    @staticmethod
+    def _signature(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
@@ -5,10 +5,17 @@ INPUT INGESTION MODULE
 Zentrale, domänen-agnostische CSV→Stage0 Ingestion.
 
 - Delegiert die eigentliche Analyse/Speicherung an `bl/Churn/Step0_InputAnalysis.py`
-- Registriert erzeugte Stage0-Dateien optional in der JSON-Datenbank
+- Optional: chunkweiser Streaming-Pfad (`stage0_streaming.py`) mit begrenztem Speicher
+- Optional: approximatives Spaltenprofil (`profile="approx"`) für sehr große Dateien
+- Registriert erzeugte Stage0-Dateien optional in der JSON-Datenbank (gebündelt, ein `save()` je Lauf)
+- Outbox-Export über den Artifact Store (Hardlink statt Kopie)
 - Verwendet ausschließlich `ProjectPaths` für Pfade
 
-Hinweis: Keine Logik-Duplikation – Step0 bleibt der alleinige Erzeuger.
+Hinweis: Zwei Stage0-Erzeuger mit verschiedenen Formaten – Step0 (Standard) und der
+Streaming-Pfad (`chunk_rows` bzw. `profile="approx"`). Streaming-Stage0 ist ein eigenes Format
+(`"format": "stage0-stream/1"`, `records`, `column_stats`, `schema`) und nicht inhaltsgleich mit Step0.
+Die Erzeuger schreiben getrennt: Step0 nach `stage0_cache/`, Streaming nach `stage0_stream/` (Cache und
+Outbox, registriert mit gleichnamigem source_type) – keine Datei des einen landet beim Leser des anderen.
 """
 
 from __future__ import annotations
@@ -18,11 +25,27 @@ from pathlib import Path
 import shutil
 from typing import Optional, Dict, Any, Tuple
 
+from config.artifact_store import ArtifactStore
 from config.paths_config import ProjectPaths
 
 # Step0-Delegation
 from bl.Churn.Step0_InputAnalysis import analyze_csv_input, CSVStructureAnalyzer
 
+# Streaming-Pfad (als Paket `bl-input` oder mit bl-input im Python-Pfad importierbar)
+try:
+    from .stage0_streaming import (
+        STEP0_DIRECTORY, STREAM_DIRECTORY, configured_chunk_rows, configured_profile, stream_csv_to_stage0,
+    )
+except ImportError:
+    from stage0_streaming import (
+        STEP0_DIRECTORY, STREAM_DIRECTORY, configured_chunk_rows, configured_profile, stream_csv_to_stage0,
+    )
+
+try:
+    from .file_registration import RegistrationBatch
+except ImportError:
+    from file_registration import RegistrationBatch
+
 # JSON-DB (nur für optionale Registrierung der erzeugten Datei)
 from bl.json_database.churn_json_database import ChurnJSONDatabase
 
@@ -33,13 +56,18 @@ class InputIngestionService:
 
     Responsibilities:
     - CSV-Hashing/Analyse delegiert an Step0 (keine Duplikation)
-    - Erzeugte Stage0-Datei lokalisieren (`stage0_cache/<hash>.json`)
+    - Erzeugte Stage0-Datei lokalisieren (`stage0_cache/<hash>.json` bzw. `stage0_stream/<hash>.json`)
     - Optional: Registrierung in JSON-DB (Files-Tabelle)
+
+    Mit injiziertem DB-Handle (`db=...`) registriert der Service nur im Speicher; laden und
+    speichern übernimmt der Aufrufer (eine Instanz, ein `save()` für den ganzen Lauf).
     """
 
-    def __init__(self):
-        self.stage0_dir: Path = ProjectPaths.dynamic_system_outputs_directory() / "stage0_cache"
+    def __init__(self, db: Optional[ChurnJSONDatabase] = None):
+        self.stage0_dir: Path = ProjectPaths.dynamic_system_outputs_directory() / STEP0_DIRECTORY
+        self.stream_dir: Path = ProjectPaths.dynamic_system_outputs_directory() / STREAM_DIRECTORY
         ProjectPaths.ensure_directory_exists(self.stage0_dir)
+        self.db = db
 
     def ingest_csv_to_stage0(
         self,
@@ -47,6 +75,8 @@ class InputIngestionService:
         force_reanalysis: bool = False,
         register_in_json_db: bool = True,
         export_to_outbox: bool = True,
+        chunk_rows: Optional[int] = None,
+        profile: Optional[str] = None,
     ) -> Tuple[Optional[Path], Dict[str, Any]]:
         """
         Führt CSV→Stage0-Ingestion durch und gibt Pfad zur Stage0-Datei zurück.
@@ -55,6 +85,10 @@ class InputIngestionService:
             csv_path: Pfad zur Eingabe-CSV
             force_reanalysis: True erzwingt Neu-Analyse trotz Cache
             register_in_json_db: File-Registrierung in JSON-DB (Files-Tabelle)
+            chunk_rows: Streaming-Pfad mit Blöcken dieser Zeilenzahl (None → ENV `STAGE0_CHUNK_ROWS`;
+                ohne Angabe Delegation an Step0)
+            profile: `approx` → approximatives Spaltenprofil mit Fehlerschranken (Streaming-Pfad,
+                Records exakt); None → ENV `STAGE0_PROFILE`, Standard `exact`
 
         Returns:
             (stage0_file_path, results_dict)
@@ -63,8 +97,22 @@ class InputIngestionService:
         if not csv_path.exists():
             return None, {"error": f"CSV not found: {csv_path}"}
 
-        # Delegation an Step0 (speichert automatisch <hash>.json in stage0_cache)
-        results: Dict[str, Any] = analyze_csv_input(str(csv_path), force_reanalysis=force_reanalysis)
+        if chunk_rows is None:
+            chunk_rows = configured_chunk_rows()
+        profile = profile or configured_profile()
+        streamed = chunk_rows is not None or profile == "approx"
+        if streamed:
+            # Streaming: Speicher durch Blockgröße begrenzt, Stage0 wird blockweise geschrieben
+            # (Step0 profiliert nur exakt → approximatives Profil immer über den Streaming-Pfad)
+            streamed_path, results = stream_csv_to_stage0(
+                csv_path, self.stream_dir, chunk_rows=chunk_rows, force_reanalysis=force_reanalysis,
+                profile=profile,
+            )
+            if streamed_path is None:
+                return None, results
+        else:
+            # Delegation an Step0 (speichert automatisch <hash>.json in stage0_cache)
+            results = analyze_csv_input(str(csv_path), force_reanalysis=force_reanalysis)
         if isinstance(results, dict) and results.get("error"):
             return None, results
 
@@ -72,20 +120,20 @@ class InputIngestionService:
         if not csv_hash:
             return None, {"error": "csv_hash missing in Step0 results"}
 
-        stage0_path: Path = self.stage0_dir / f"{csv_hash}.json"
+        stage0_directory = STREAM_DIRECTORY if streamed else STEP0_DIRECTORY
+        stage0_path: Path = (self.stream_dir if streamed else self.stage0_dir) / f"{csv_hash}.json"
         if not stage0_path.exists():
             # Step0 sollte gespeichert haben – falls nicht, ist dies ein Fehlerzustand
             return None, {"error": f"Stage0 file not found after analysis: {stage0_path}"}
 
         if register_in_json_db:
             try:
-                db = ChurnJSONDatabase()
-                # Registriere die ursprüngliche CSV-Datei
-                csv_filename = Path(csv_path).name
-                db.create_file_record(file_name=csv_filename, source_type="input_data")
-                # Registriere die Stage0-Datei
-                db.create_file_record(file_name=stage0_path.name, source_type="stage0_cache")
-                db.save()  # Persistiere Änderungen
+                # Injizierter Handle: nur registrieren, der Aufrufer speichert; sonst eigene Instanz + ein save()
+                db = self.db if self.db is not None else ChurnJSONDatabase()
+                with RegistrationBatch(db, save=self.db is None) as batch:
+                    # Registriere die ursprüngliche CSV-Datei und die Stage0-Datei
+                    batch.register(Path(csv_path).name, "input_data")
+                    batch.register(stage0_path.name, stage0_directory)
             except Exception as e:
                 # Registrierung ist optional – Fehler nicht eskalieren, aber zurückmelden
                 results.setdefault("warnings", []).append(f"JSON-DB registration failed: {e}")
@@ -94,11 +142,14 @@ class InputIngestionService:
         outbox_path: Optional[Path] = None
         if export_to_outbox:
             try:
-                outbox_dir = ProjectPaths.outbox_directory() / "stage0_cache"
+                outbox_dir = ProjectPaths.outbox_directory() / stage0_directory
                 ProjectPaths.ensure_directory_exists(outbox_dir)
                 outbox_path = outbox_dir / stage0_path.name
-                # Nur kopieren, wenn nicht bereits vorhanden oder Quelle neuer ist
-                if (not outbox_path.exists()) or (stage0_path.stat().st_mtime > outbox_path.stat().st_mtime):
+                if streamed:
+                    # Streaming-Writer ersetzt atomar → Cache- und Outbox-Datei teilen sich einen Blob
+                    ArtifactStore().export(stage0_path, outbox_path, link_source=True)
+                elif (not outbox_path.exists()) or (stage0_path.stat().st_mtime > outbox_path.stat().st_mtime):
+                    # Step0 schreibt seinen Cache an Ort und Stelle → eigenständige Kopie, nur wenn neuer
                     shutil.copy2(stage0_path, outbox_path)
                 results["outbox_path"] = str(outbox_path)
             except Exception as e:
@@ -125,12 +176,16 @@ def ingest_csv_to_stage0(
     csv_path: Path | str,
     force_reanalysis: bool = False,
     register_in_json_db: bool = True,
+    chunk_rows: Optional[int] = None,
+    profile: Optional[str] = None,
 ) -> Tuple[Optional[Path], Dict[str, Any]]:
     """Convenience-Funktion ohne explizite Service-Instanziierung."""
     return InputIngestionService().ingest_csv_to_stage0(
         csv_path=csv_path,
         force_reanalysis=force_reanalysis,
         register_in_json_db=register_in_json_db,
+        chunk_rows=chunk_rows,
+        profile=profile,
     )
 
 
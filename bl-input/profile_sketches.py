@@ -0,0 +1,258 @@
+"""
+PROFILE SKETCHES MODULE
+=======================
+
+Approximative Spaltenprofile für sehr große CSVs (`stage0_streaming`, `profile="approx"`).
+
+- `RowReservoir`: Reservoir-Stichprobe fester Größe über alle Blöcke (Algorithm L – nur die
+  gezogenen Zeilen werden angefasst, Kosten ~ k · log(n/k) statt n)
+- `HyperLogLog`: Distinct-Schätzung mit festem Speicher (2**p Register),
+  relativer Standardfehler 1.04 / sqrt(2**p); Zahlen werden mit numpy (falls installiert)
+  vektorisiert gehasht, Text über die Block-Distinct-Werte
+- `TDigest`: Quantile über einen mergenden t-Digest; Blöcke werden sortiert und vorab zu
+  Zentroiden verdichtet, Python-Schleifen laufen damit über Zentroiden statt über Werte
+
+Alle Sketches sind deterministisch (feste Seeds, stabile Hashes) – gleiche Eingabe, gleiche Stage0.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import random
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # optional – ohne numpy hasht HyperLogLog in Python
+    np = None
+
+_MASK64 = (1 << 64) - 1
+_FLOAT = struct.Struct("<d")
+_FLOAT_BITS = struct.Struct("<Q")
+
+
+# -------------------------
+# Reservoir-Stichprobe
+# -------------------------
+
+class RowReservoir:
+    """Gleichverteilte Stichprobe von `k` Zeilenpositionen über einen Strom von Blöcken."""
+
+    def __init__(self, k: int, seed: int = 0):
+        self.k = k
+        self.seen = 0
+        self.filled = 0
+        self._rng = random.Random(seed)
+        self._w = 1.0
+        self._next = 0
+
+    def _uniform(self) -> float:
+        return 1.0 - self._rng.random()  # (0, 1] – log() ohne Polstelle
+
+    def _advance(self) -> None:
+        self._w *= math.exp(math.log(self._uniform()) / self.k)
+        self._next += math.floor(math.log(self._uniform()) / math.log1p(-self._w)) + 1 if self._w < 1.0 else 1
+
+    def select(self, n: int) -> List[Tuple[int, int]]:
+        """
+        Nächsten Block mit `n` Zeilen anbieten.
+
+        Returns:
+            (Position im Block, Reservoir-Slot) in Anwendungsreihenfolge
+        """
+        picks: List[Tuple[int, int]] = []
+        base = self.seen
+        end = base + n
+        # Füllphase: die ersten k Zeilen
+        while self.filled < self.k and self.seen < end:
+            picks.append((self.seen - base, self.filled))
+            self.filled += 1
+            self.seen += 1
+            if self.filled == self.k:
+                self._next = self.seen - 1
+                self._advance()
+        # Ersetzungsphase: nur die übersprungenen Positionen werden berechnet
+        if self.filled == self.k:
+            while self._next < end:
+                picks.append((self._next - base, self._rng.randrange(self.k)))
+                self._advance()
+        self.seen = end
+        return picks
+
+
+# -------------------------
+# HyperLogLog
+# -------------------------
+
+def _splitmix64(value: int) -> int:
+    value = (value + 0x9E3779B97F4A7C15) & _MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+def stable_hash64(value: Any) -> int:
+    """Prozessunabhängiger 64-Bit-Hash (Zahlen über ihre float64-Bits: 5 und 5.0 gleich)."""
+    if isinstance(value, str):
+        return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+    # + 0.0 normalisiert -0.0 → 0.0
+    return _splitmix64(_FLOAT_BITS.unpack(_FLOAT.pack(float(value) + 0.0))[0])
+
+
+def _hash64_numpy(values: Sequence[float]):
+    """Vektorisierte Variante von `stable_hash64` für Zahlen (identische Hashes)."""
+    bits = (np.asarray(values, dtype=np.float64) + 0.0).view(np.uint64)
+    with np.errstate(over="ignore"):
+        h = bits + np.uint64(0x9E3779B97F4A7C15)
+        h = (h ^ (h >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        h = (h ^ (h >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return h ^ (h >> np.uint64(31))
+
+
+def _bit_length_numpy(values):
+    lengths = np.zeros(values.shape, dtype=np.uint8)
+    remaining = values.copy()
+    for shift in (32, 16, 8, 4, 2, 1):
+        wide = remaining >= np.uint64(1 << shift)
+        lengths[wide] += shift
+        remaining[wide] >>= np.uint64(shift)
+    lengths += (remaining > 0).astype(np.uint8)
+    return lengths
+
+
+class HyperLogLog:
+    """Distinct-Zähler mit 2**precision Registern."""
+
+    def __init__(self, precision: int = 12):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+        self._rest_bits = 64 - precision
+        self._rest_mask = (1 << self._rest_bits) - 1
+
+    @property
+    def relative_error(self) -> float:
+        """Relativer Standardfehler der Schätzung."""
+        return 1.04 / math.sqrt(self.m)
+
+    def add_many(self, values: Sequence[Any]) -> None:
+        if np is not None and values and not isinstance(values[0], str):
+            self._add_numbers_numpy(values)
+            return
+        registers = self.registers
+        shift = self._rest_bits
+        mask = self._rest_mask
+        # Im Block doppelte Werte nur einmal hashen (C-seitiges set)
+        for value in set(values):
+            h = stable_hash64(value)
+            index = h >> shift
+            rank = shift - (h & mask).bit_length() + 1
+            if rank > registers[index]:
+                registers[index] = rank
+
+    def _add_numbers_numpy(self, values: Sequence[float]) -> None:
+        # Zahlenspalten (oft hochkardinal): Hashing und Registerupdate ohne Python-Schleife
+        h = _hash64_numpy(values)
+        index = (h >> np.uint64(self._rest_bits)).astype(np.intp)
+        ranks = (self._rest_bits + 1 - _bit_length_numpy(h & np.uint64(self._rest_mask)).astype(np.int64))
+        registers = np.frombuffer(self.registers, dtype=np.uint8)
+        np.maximum.at(registers, index, ranks.astype(np.uint8))
+
+    def estimate(self) -> int:
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / math.fsum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * m and zeros:
+            # Kleine Kardinalitäten: Linear Counting
+            return int(round(m * math.log(m / zeros)))
+        return int(round(raw))
+
+
+# -------------------------
+# t-Digest
+# -------------------------
+
+class TDigest:
+    """Mergender t-Digest (Zentroiden: (Mittelwert, Gewicht), aufsteigend)."""
+
+    def __init__(self, compression: int = 100):
+        self.compression = compression
+        self.centroids: List[Tuple[float, int]] = []
+        self.count = 0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+
+    def _limit(self, q: float, total: int) -> float:
+        return max(1.0, 4.0 * total * q * (1.0 - q) / self.compression)
+
+    def add_many(self, values: Sequence[float]) -> None:
+        if not values:
+            return
+        ordered = sorted(values)
+        n = len(ordered)
+        self.min = ordered[0] if self.min is None else min(self.min, ordered[0])
+        self.max = ordered[-1] if self.max is None else max(self.max, ordered[-1])
+        # Block vorab verdichten: Scheiben nach der Größenschranke des Blocks (Ränder fein)
+        batch: List[Tuple[float, int]] = []
+        start = 0
+        while start < n:
+            size = max(1, int(self._limit((start + 0.5) / n, n)))
+            chunk = ordered[start:start + size]
+            batch.append((math.fsum(chunk) / len(chunk), len(chunk)))
+            start += size
+        self._merge(batch)
+
+    def _merge(self, batch: List[Tuple[float, int]]) -> None:
+        merged = sorted(self.centroids + batch)
+        total = self.count + sum(weight for _, weight in batch)
+        result: List[Tuple[float, int]] = []
+        mean, weight = merged[0]
+        cumulative = 0
+        for next_mean, next_weight in merged[1:]:
+            q = (cumulative + (weight + next_weight) / 2.0) / total
+            if weight + next_weight <= self._limit(q, total):
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                result.append((mean, weight))
+                cumulative += weight
+                mean, weight = next_mean, next_weight
+        result.append((mean, weight))
+        self.centroids = result
+        self.count = total
+
+    def quantile(self, q: float) -> Tuple[Optional[float], float]:
+        """(Schätzwert, Rangfehler-Schätzung als Anteil) für das Quantil q."""
+        if not self.centroids:
+            return None, 0.0
+        if q <= 0:
+            return self.min, 0.0
+        if q >= 1:
+            return self.max, 0.0
+        target = q * self.count
+        cumulative = 0.0
+        previous_center, previous_mean = 0.0, self.min
+        for mean, weight in self.centroids:
+            center = cumulative + weight / 2.0
+            if target <= center:
+                span = center - previous_center
+                fraction = (target - previous_center) / span if span > 0 else 0.0
+                value = previous_mean + (mean - previous_mean) * fraction
+                # Fehler ≤ halbes Gewicht des umgebenden Zentroids (Rang), relativ zur Anzahl
+                return value, weight / (2.0 * self.count)
+            cumulative += weight
+            previous_center, previous_mean = center, mean
+        return self.max, self.centroids[-1][1] / (2.0 * self.count)
+
+    def quantiles(self, levels: Iterable[float]) -> Tuple[Dict[str, Optional[float]], float]:
+        """Quantile als `p01`, `p50` … und der größte Rangfehler darunter."""
+        values: Dict[str, Optional[float]] = {}
+        worst = 0.0
+        for level in levels:
+            value, error = self.quantile(level)
+            values[f"p{int(round(level * 100)):02d}"] = value
+            worst = max(worst, error)
+        return values, worst
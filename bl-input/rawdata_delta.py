@@ -0,0 +1,399 @@
+"""
+RAWDATA DELTA MODULE
+====================
+
+Inkrementeller Import Stage0 → `rawdata`, partitioniert nach `id_files`.
+
+Statt `rawdata` bei jeder Ingestion aus allen Stage0-Dateien neu aufzubauen
+(`import_from_outbox_stage0_union(replace=True)`), hält die Tabelle einen Partitionsstand
+(`rawdata.partitions`: id_files → Stage0-Datei) und gleicht nur Abweichungen ab:
+
+- neue Input-Datei        → Partition anhängen (Kosten ~ neue Datei)
+- geänderte Stage0-Datei  → Partition ersetzen
+- entfernte Input-Datei   → Partition löschen
+
+Spaltentypen: die kompakten physischen Typen der Stage0-Dateien (`schema`) werden ins
+Tabellenschema `rawdata.schema` übernommen (nur verbreitert, `config/compact_dtypes.py`) und beim
+Import erzwungen – jede Spalte hat danach genau einen Python-Typ. Nach dem Union-Import (Step0-Stage0
+ohne Schema) leitet `compact_union_records` dieselben Typen aus den importierten Records ab.
+
+Deduplizierung (optional, `dedup="newest"|"oldest"`): je Schlüssel (`Kunde`, `I_TIMEBASE`) bleibt
+genau eine Zeile – aus der Datei mit Vorrang (`newest`: höchste id_files, d. h. zuletzt
+registriert). Hash-basiert über ein Schlüssel-Set, Datei für Datei; Statistik je Datei
+(`rows`, `kept`, `duplicates` innerhalb der Datei, `superseded` durch andere Dateien) steht in
+`rawdata.dedup_stats`, die aktive Regel in `rawdata.dedup`.
+
+Der Partitionsstand wird mit `db.save()` gemeinsam mit den Records gespeichert, samt Zeilenzahl
+je Partition (`rawdata.partition_rows`). Fehlt er bei vorhandenen Records (Altbestand aus dem
+Union-Import) oder passt die Zeilenzahl nicht zu den Records (z. B. nach `clean_database.py`,
+das nur `records` leert), wird einmalig vollständig neu aufgebaut.
+Gelesen wird nur das Streaming-Format (`stage0_streaming`, Kennung `"format": "stage0-stream/1"`);
+andere Stage0-Dateien (Step0) → `DeltaImportUnavailable`, der Aufrufer fällt dann auf den
+Union-Import zurück.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config.compact_dtypes import coerce_records, column_schema, infer_physical_type, widen
+
+try:
+    from .stage0_streaming import ColumnStats, is_stream_stage0
+except ImportError:
+    from stage0_streaming import ColumnStats, is_stream_stage0
+
+PARTITIONS_KEY = "partitions"
+PARTITION_ROWS_KEY = "partition_rows"
+DEDUP_STATE_KEY = "dedup"
+DEDUP_STATS_KEY = "dedup_stats"
+DEDUP_POLICIES = ("newest", "oldest")
+DEDUP_KEY_COLUMNS = ("Kunde", "I_TIMEBASE")
+
+
+class DeltaImportUnavailable(Exception):
+    """Delta-Import nicht möglich (z. B. Stage0-Format ohne Records)."""
+
+
+def load_stage0_partition(stage0_path: Path) -> Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]:
+    """(Records, Spaltenschema) einer Streaming-Stage0-Datei; andere Formate → `DeltaImportUnavailable`."""
+    if not is_stream_stage0(stage0_path):
+        raise DeltaImportUnavailable(f"{Path(stage0_path).name}: not in stage0_streaming format")
+    try:
+        data = json.loads(Path(stage0_path).read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise DeltaImportUnavailable(f"{Path(stage0_path).name}: {e}")
+    records = data.get("records") if isinstance(data, dict) else None
+    if not isinstance(records, list):
+        raise DeltaImportUnavailable(f"{Path(stage0_path).name}: no records list")
+    return records, data.get("schema") or {}
+
+
+def merge_schema(
+    table_schema: Dict[str, Dict[str, Any]], incoming: Iterable[Dict[str, Dict[str, Any]]]
+) -> List[str]:
+    """
+    Physische Typen der Partitionen ins Tabellenschema übernehmen (nur verbreitern).
+
+    Beschreibungen bestehender Schema-Einträge bleiben erhalten. Liefert die Spalten, deren
+    bereits vorhandener Typ verbreitert wurde (Bestandszeilen müssen neu gecastet werden).
+    """
+    widened = []
+    for schema in incoming:
+        for name, info in schema.items():
+            physical_type = (info or {}).get("physical_type")
+            if not physical_type:
+                continue
+            entry = table_schema.get(name) or {}
+            current = entry.get("physical_type")
+            merged = widen(current, physical_type)
+            if merged != current:
+                if current is not None:
+                    widened.append(name)
+                table_schema[name] = column_schema(merged, entry.get("description", ""))
+    return sorted(set(widened))
+
+
+def trusted_partitions(rawdata: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """
+    Partitionsstand, sofern er zu den Records passt (Summe der Zeilenzahlen je Partition).
+
+    None: kein oder ein verwaister Stand (Records wurden außerhalb des Delta-Imports geändert).
+    """
+    state = rawdata.get(PARTITIONS_KEY)
+    if state is None:
+        return None
+    records = rawdata.get("records") or []
+    counts = rawdata.get(PARTITION_ROWS_KEY)
+    if counts is None:
+        # Stand ohne Zeilenzahlen: nur ein leerer Stand passt zu leeren Records
+        return state if records or not state else None
+    return state if sum(counts.values()) == len(records) else None
+
+
+def _precedence_key(file_id: Any) -> Tuple[int, Any]:
+    """Registrierungsreihenfolge der Input-Dateien (numerische id_files vor Text)."""
+    try:
+        return 0, int(file_id)
+    except (TypeError, ValueError):
+        return 1, str(file_id)
+
+
+def _record_key(record: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+    key = tuple(record.get(column) for column in DEDUP_KEY_COLUMNS)
+    return None if any(value is None for value in key) else key
+
+
+def import_rawdata_delta(
+    db, partitions: Dict[Any, Path], dedup: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    `rawdata` auf den gewünschten Partitionsstand bringen (ohne save).
+
+    Args:
+        db: JSON-DB-Instanz (`db.data["tables"]`)
+        partitions: id_files → Stage0-Datei (Outbox) aller aktuellen Input-Dateien
+        dedup: optionale Deduplizierung auf (Kunde, I_TIMEBASE): `newest` (spätere Datei gewinnt)
+            oder `oldest` (frühere Datei gewinnt); None → reine Union
+
+    Returns:
+        Partitions- und Zeilenzähler (added/replaced/removed/unchanged), bei Dedup zusätzlich
+        `rows_deduplicated` und `dedup` (Statistik je id_files)
+    """
+    if dedup is not None and dedup not in DEDUP_POLICIES:
+        raise ValueError(f"Unknown dedup policy: {dedup}")
+    tables = db.data.setdefault("tables", {})
+    rawdata = tables.setdefault("rawdata", {})
+    records: List[Dict[str, Any]] = rawdata.setdefault("records", [])
+    state = trusted_partitions(rawdata)
+    # Neuaufbau: Altbestand ohne Partitionsstand oder geänderte Dedup-Regel (verdeckte Zeilen)
+    rebuild = (state is None and bool(records)) or (
+        rawdata.get(DEDUP_STATE_KEY) != dedup and bool(records or state)
+    )
+    state = {str(file_id): name for file_id, name in (state or {}).items()}
+
+    wanted = {str(file_id): Path(path).name for file_id, path in partitions.items()}
+    ids = {str(file_id): file_id for file_id in partitions}
+    added = sorted(fid for fid in wanted if fid not in state)
+    replaced = sorted(fid for fid in wanted if fid in state and state[fid] != wanted[fid])
+    removed = sorted(fid for fid in state if fid not in wanted)
+    if rebuild:
+        added = sorted(wanted)
+        replaced = []
+
+    # Neue Partitionen zuerst vollständig laden: bei Fehlern bleibt rawdata unverändert
+    # (Dedup-Neuaufbau lädt Datei für Datei selbst und ersetzt die Records erst am Ende)
+    eager = [] if dedup is not None and rebuild else added + replaced
+    loaded = {fid: load_stage0_partition(partitions[ids[fid]]) for fid in eager}
+    incoming = {fid: records_ for fid, (records_, _) in loaded.items()}
+
+    stats = {
+        "partitions_added": len(added),
+        "partitions_replaced": len(replaced),
+        "partitions_removed": len(removed),
+        "partitions_unchanged": len(wanted) - len(added) - len(replaced),
+        "rows_added": 0,
+        "rows_replaced": 0,
+        "rows_removed": 0,
+    }
+
+    # Kompakte Spaltentypen: Tabellenschema verbreitern (Neuaufbau: aus den Partitionen neu ableiten)
+    table_schema: Dict[str, Dict[str, Any]] = rawdata.setdefault("schema", {})
+    if rebuild or not state:
+        for entry in table_schema.values():
+            (entry or {}).pop("physical_type", None)
+    widened = merge_schema(table_schema, (schema for _, schema in loaded.values()))
+
+    if dedup is not None:
+        _import_deduplicated(
+            rawdata, partitions, ids, wanted, state, added, replaced, removed,
+            loaded, rebuild, dedup, widened, stats,
+        )
+        rawdata[PARTITIONS_KEY] = wanted
+        rawdata[PARTITION_ROWS_KEY] = {fid: entry["kept"] for fid, entry in rawdata[DEDUP_STATS_KEY].items()}
+        return stats
+    rawdata.pop(DEDUP_STATE_KEY, None)
+    rawdata.pop(DEDUP_STATS_KEY, None)
+
+    counts: Dict[str, int] = {} if rebuild or not state else dict(rawdata.get(PARTITION_ROWS_KEY) or {})
+    dropped = set(replaced) | set(removed)
+    if rebuild:
+        stats["rows_removed"] = len(records)
+        records.clear()
+    elif dropped:
+        # Einziger Durchlauf über Bestandszeilen – nur bei Ersetzen/Entfernen nötig
+        removed_ids = set(removed)
+        kept = []
+        for record in records:
+            file_id = str(record.get("id_files"))
+            if file_id not in dropped:
+                kept.append(record)
+            elif file_id in removed_ids:
+                stats["rows_removed"] += 1
+        records[:] = kept
+
+    if widened and records:
+        # Typ verbreitert (z. B. int8 → float32) → Bestandszeilen dieser Spalten angleichen
+        coerce_records(records, table_schema, widened)
+
+    for fid in added + replaced:
+        file_id = ids[fid]
+        rows = [dict(record, id_files=file_id) for record in incoming[fid]]
+        coerce_records(rows, table_schema)
+        records.extend(rows)
+        counts[fid] = len(rows)
+        stats["rows_replaced" if fid in replaced else "rows_added"] += len(rows)
+
+    rawdata[PARTITIONS_KEY] = wanted
+    rawdata[PARTITION_ROWS_KEY] = {fid: counts.get(fid, 0) for fid in wanted}
+    return stats
+
+
+def _import_deduplicated(
+    rawdata: Dict[str, Any],
+    partitions: Dict[Any, Path],
+    ids: Dict[str, Any],
+    wanted: Dict[str, str],
+    state: Dict[str, str],
+    added: List[str],
+    replaced: List[str],
+    removed: List[str],
+    loaded: Dict[str, Tuple[List[Dict[str, Any]], Dict[str, Dict[str, Any]]]],
+    rebuild: bool,
+    dedup: str,
+    widened: List[str],
+    stats: Dict[str, Any],
+) -> None:
+    """
+    Union mit Deduplizierung auf `DEDUP_KEY_COLUMNS` (hash-basiert, Datei für Datei).
+
+    Partitionen werden in Vorrangreihenfolge verarbeitet; eine Zeile bleibt nur, wenn ihr
+    Schlüssel noch nicht von einer Datei höheren Vorrangs (bzw. früher in derselben Datei)
+    belegt ist. Zeilen ohne vollständigen Schlüssel bleiben immer erhalten.
+
+    Schneller Pfad: nur neue Dateien mit höherem Vorrang als alle vorhandenen (typisch:
+    neuer Monatsexport bei `newest`) → ein Durchlauf über den Bestand entfernt überholte
+    Zeilen. Sonst (Ersetzen/Entfernen, ältere Datei nachgereicht, Regelwechsel) wird aus allen
+    Stage0-Dateien neu aufgebaut, da verdeckte Zeilen wieder sichtbar werden können.
+    """
+    records: List[Dict[str, Any]] = rawdata["records"]
+    table_schema: Dict[str, Dict[str, Any]] = rawdata["schema"]
+    # Höchster Vorrang zuerst
+    order = sorted(wanted, key=lambda fid: _precedence_key(ids[fid]), reverse=dedup == "newest")
+    rank = {fid: position for position, fid in enumerate(order)}
+    unchanged = [fid for fid in wanted if fid in state and fid not in replaced]
+    persisted: Dict[str, Dict[str, int]] = {
+        fid: dict(entry) for fid, entry in (rawdata.get(DEDUP_STATS_KEY) or {}).items() if fid in wanted
+    }
+    fast = (
+        not rebuild and not replaced and not removed
+        and all(rank[fid] < min((rank[other] for other in unchanged), default=len(order)) for fid in added)
+        and all(fid in persisted for fid in unchanged)
+    )
+
+    owners: Dict[Tuple[Any, ...], str] = {}
+    file_stats: Dict[str, Dict[str, int]] = {}
+
+    def take(fid: str, rows: List[Dict[str, Any]], target: List[Dict[str, Any]]) -> None:
+        entry = {"rows": len(rows), "kept": 0, "duplicates": 0, "superseded": 0}
+        file_id = ids[fid]
+        for record in rows:
+            key = _record_key(record)
+            if key is not None:
+                owner = owners.get(key)
+                if owner is not None:
+                    entry["duplicates" if owner == fid else "superseded"] += 1
+                    continue
+                owners[key] = fid
+            target.append(dict(record, id_files=file_id))
+            entry["kept"] += 1
+        file_stats[fid] = entry
+
+    if fast:
+        new_rows: List[Dict[str, Any]] = []
+        for fid in (fid for fid in order if fid in loaded):
+            take(fid, loaded[fid][0], new_rows)
+        dropped = sum(entry["duplicates"] + entry["superseded"] for entry in file_stats.values())
+        coerce_records(new_rows, table_schema)
+        # Bestand: von neuen Dateien überholte Zeilen entfernen (ein Durchlauf, Hash-Lookup)
+        if owners:
+            superseded: Dict[str, int] = {}
+            kept = []
+            for record in records:
+                key = _record_key(record)
+                if key is not None and key in owners:
+                    file_id = str(record.get("id_files"))
+                    superseded[file_id] = superseded.get(file_id, 0) + 1
+                else:
+                    kept.append(record)
+            records[:] = kept
+            for fid, count in superseded.items():
+                entry = persisted.setdefault(fid, {"rows": 0, "kept": 0, "duplicates": 0, "superseded": 0})
+                entry["kept"] -= count
+                entry["superseded"] += count
+                file_stats[fid] = entry
+            stats["rows_removed"] = sum(superseded.values())
+            dropped += stats["rows_removed"]
+        if widened and records:
+            coerce_records(records, table_schema, widened)
+        records.extend(new_rows)
+        stats["rows_added"] = len(new_rows)
+    else:
+        # Neuaufbau Datei für Datei (Schema neu ableiten); Records werden erst am Ende ersetzt
+        for entry in table_schema.values():
+            (entry or {}).pop("physical_type", None)
+        rebuilt: List[Dict[str, Any]] = []
+        for fid in order:
+            rows, schema = loaded.get(fid) or load_stage0_partition(partitions[ids[fid]])
+            merge_schema(table_schema, [schema])
+            take(fid, rows, rebuilt)
+        coerce_records(rebuilt, table_schema)
+        stats["rows_removed"] = len(records)
+        stats["rows_added"] = len(rebuilt)
+        records[:] = rebuilt
+        persisted = {}
+        dropped = sum(entry["duplicates"] + entry["superseded"] for entry in file_stats.values())
+        stats["dedup_rebuild"] = True
+
+    persisted.update(file_stats)
+    rawdata[DEDUP_STATE_KEY] = dedup
+    rawdata[DEDUP_STATS_KEY] = persisted
+    stats["rows_deduplicated"] = dropped
+    stats["dedup"] = {fid: dict(entry) for fid, entry in file_stats.items()}
+
+
+def _value_kind(values: List[Any]) -> str:
+    """Typregel für bereits importierte Werte: nur Ganzzahlen → integer, nur Zahlen → double, sonst string."""
+    kind = "integer"
+    for value in values:
+        if value is None or isinstance(value, (bool, int)):
+            continue
+        if isinstance(value, float):
+            kind = "double"
+            continue
+        return "string"
+    return kind
+
+
+def compact_union_records(db) -> Dict[str, str]:
+    """
+    Kompakte Spaltentypen für rawdata aus dem Union-Import ableiten und erzwingen (ohne save).
+
+    Step0-Stage0 trägt kein Schema; die Statistiken entstehen daher aus den importierten Records
+    (`ColumnStats` wie im Streaming-Pfad). Beschreibungen im Tabellenschema bleiben erhalten.
+    Liefert Spalte → physischer Typ.
+    """
+    rawdata = db.data.get("tables", {}).get("rawdata")
+    if not isinstance(rawdata, dict) or not rawdata.get("records"):
+        return {}
+    records: List[Dict[str, Any]] = rawdata["records"]
+    columns = list(dict.fromkeys(name for record in records for name in record if name != "id_files"))
+    inferred: Dict[str, Dict[str, Any]] = {}
+    for name in columns:
+        values = [record.get(name) for record in records]
+        kind = _value_kind(values)
+        if kind == "string":
+            values = [None if value is None else str(value) for value in values]
+        else:
+            values = [int(value) if isinstance(value, bool) else value for value in values]
+        stats = ColumnStats(name, kind)
+        stats.update(values)
+        inferred[name] = column_schema(infer_physical_type(name, stats.as_dict()))
+    table_schema: Dict[str, Dict[str, Any]] = rawdata.setdefault("schema", {})
+    for entry in table_schema.values():
+        (entry or {}).pop("physical_type", None)
+    merge_schema(table_schema, [inferred])
+    coerce_records(records, table_schema)
+    return {name: info["physical_type"] for name, info in inferred.items()}
+
+
+def invalidate_partitions(db) -> None:
+    """Partitionsstand verwerfen (nach Union-Import unbekannt) → nächster Delta-Import baut neu auf."""
+    rawdata = db.data.get("tables", {}).get("rawdata")
+    if isinstance(rawdata, dict):
+        rawdata.pop(PARTITIONS_KEY, None)
+        rawdata.pop(PARTITION_ROWS_KEY, None)
+        rawdata.pop(DEDUP_STATE_KEY, None)
+        rawdata.pop(DEDUP_STATS_KEY, None)
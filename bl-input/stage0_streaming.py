@@ -0,0 +1,575 @@
+"""
+STAGE0 STREAMING MODULE
+=======================
+
+Chunkweise CSV→Stage0-Ingestion mit begrenztem Speicher.
+
+- Liest die CSV in Blöcken fester Zeilenzahl (`chunk_rows`, ENV `STAGE0_CHUNK_ROWS`)
+- Aktualisiert Spaltenstatistiken inkrementell (Anzahl, Nullwerte, Min/Max, exakte Summen,
+  Distinct-Werte bis `DISTINCT_LIMIT`)
+- Schreibt die Stage0-JSON inkrementell (Records je Block, Statistiken am Ende)
+
+Der Spitzenspeicher hängt nur von `chunk_rows` ab, nicht von der Dateigröße. `chunk_rows=0`
+verarbeitet die Datei in einem Block (nicht-streamender Referenzpfad); beide Wege liefern
+byte-identische Stage0-Dateien:
+- Werte werden je Zelle nach den Data-Dictionary-Typregeln konvertiert (unabhängig vom Block)
+- Summen werden exakt akkumuliert (ganzzahlig skaliert), die Blockgrenzen ändern
+  Mittelwert/Standardabweichung also nicht
+
+Approximatives Profil (`profile="approx"`, ENV `STAGE0_PROFILE`) für sehr große Dateien:
+Distinct über HyperLogLog, Quantile über t-Digest, Typmerkmale aus einer Reservoir-Stichprobe
+(`profile_sketches.py`). Die Records werden weiterhin exakt konvertiert; Spaltenstatistiken
+tragen ihre Fehlerschranken (`error`), der Abschnitt `profile` fasst sie zusammen. Die
+Byte-Identität über Blockgrößen gilt nur für das exakte Profil.
+
+Eigenes Format, eigener Ort: Streaming-Stage0 liegt in `stage0_stream/` (Cache unter
+`dynamic_system_outputs`, Export in der Outbox) und trägt als ersten Schlüssel `"format": "stage0-stream/1"`.
+Step0 schreibt weiterhin nach `stage0_cache/` – Step0-Cache und Union-Import der json-database sehen
+keine Streaming-Dateien, Leser des Streaming-Formats (Delta-Import) prüfen die Kennung (`is_stream_stage0`).
+
+Der Trailer endet immer mit `profile` (`{"mode": "exact"}` bzw. der Approx-Zusammenfassung). Eine
+vorhandene `<csv_hash>.json` wird nur wiederverwendet, wenn Kennung und Profil passen.
+
+Stage0-Format:
+    {"format": "stage0-stream/1", "csv_hash": ..., "source_file": ..., "delimiter": ";", "columns": [...],
+     "records": [{"Kunde": 1, "I_TIMEBASE": 202401, ...}, ...],
+     "row_count": ..., "column_stats": {"Kunde": {...}, ...},
+     "schema": {"Kunde": {"display_type": "integer", "physical_type": "int32", ...}, ...},
+     "profile": {"mode": "exact"}}
+
+`schema` enthält je Spalte den kompakten physischen Typ (`config/compact_dtypes.py`), abgeleitet
+aus den Spaltenstatistiken – ebenfalls unabhängig von den Blockgrenzen.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import json
+import math
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from config.compact_dtypes import FLOAT32_DIGITS, column_schema, infer_physical_type, is_period, significant_digits
+from config.paths_config import ProjectPaths
+
+try:
+    from .profile_sketches import HyperLogLog, RowReservoir, TDigest
+except ImportError:
+    from profile_sketches import HyperLogLog, RowReservoir, TDigest
+
+STREAM_FORMAT = "stage0-stream/1"
+# Verzeichnisname je Erzeuger (unter dynamic_system_outputs und Outbox) = source_type in der Files-Tabelle
+STEP0_DIRECTORY = "stage0_cache"
+STREAM_DIRECTORY = "stage0_stream"
+
+ENV_CHUNK_ROWS = "STAGE0_CHUNK_ROWS"
+ENV_PROFILE = "STAGE0_PROFILE"
+DEFAULT_CHUNK_ROWS = 50_000
+DISTINCT_LIMIT = 1000
+
+PROFILES = ("exact", "approx")
+# Approximatives Profil: Stichprobengröße, HLL-Präzision, t-Digest-Kompression, gemeldete Quantile
+RESERVOIR_ROWS = int(os.environ.get("STAGE0_RESERVOIR_ROWS", "10000"))
+HLL_PRECISION = 12
+TDIGEST_COMPRESSION = 100
+QUANTILE_LEVELS = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+_SNIFF_BYTES = 64 * 1024
+_HASH_BLOCK = 1024 * 1024
+_TRAILER_BYTES = 16 * 1024
+_FORMAT_PREFIX = json.dumps({"format": STREAM_FORMAT})[:-1].encode("utf-8")
+
+
+def configured_chunk_rows() -> Optional[int]:
+    """Blockgröße aus `STAGE0_CHUNK_ROWS` (None: Streaming nicht konfiguriert)."""
+    value = os.environ.get(ENV_CHUNK_ROWS, "").strip()
+    return int(value) if value else None
+
+
+def configured_profile() -> str:
+    """Profilmodus aus `STAGE0_PROFILE` (`exact` oder `approx`, Standard: exact)."""
+    value = os.environ.get(ENV_PROFILE, "").strip().lower() or "exact"
+    if value not in PROFILES:
+        raise ValueError(f"Unknown Stage0 profile: {value}")
+    return value
+
+
+def stage0_mode(chunk_rows: Optional[int] = None, profile: Optional[str] = None) -> str:
+    """
+    Erzeuger/Format der Stage0-Datei wie in `ingest_csv_to_stage0` (ENV-Fallbacks eingeschlossen):
+    `step0`, `streaming` oder `streaming-approx`. Die Blockgröße selbst ändert das Ergebnis nicht.
+    """
+    if chunk_rows is None:
+        chunk_rows = configured_chunk_rows()
+    if (profile or configured_profile()) == "approx":
+        return "streaming-approx"
+    return "streaming" if chunk_rows is not None else "step0"
+
+
+def stage0_directory_name(mode: str) -> str:
+    """Verzeichnis (und source_type) der Stage0-Dateien eines Modus: Step0 und Streaming getrennt."""
+    return STEP0_DIRECTORY if mode == "step0" else STREAM_DIRECTORY
+
+
+# -------------------------
+# Typregeln & Konvertierung
+# -------------------------
+
+def column_kind(name: str) -> str:
+    """Typ nach Data-Dictionary-Regeln: `Kunde`, `I_TIMEBASE`, `i_*` → integer, `n_*` → double."""
+    lowered = name.strip().lower()
+    if lowered in ("kunde", "i_timebase") or lowered.startswith("i_"):
+        return "integer"
+    if lowered.startswith("n_"):
+        return "double"
+    return "string"
+
+
+def convert_value(raw: str, kind: str) -> Any:
+    """Zellwert konvertieren; leere Zellen → None, nicht parsebare Zahlen bleiben Text."""
+    value = raw.strip()
+    if value == "":
+        return None
+    if kind == "string":
+        return value
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        number = float(value.replace(",", ".") if "." not in value else value)
+    except ValueError:
+        return value
+    if not math.isfinite(number):
+        return value
+    if kind == "integer" and number.is_integer():
+        return int(number)
+    return number
+
+
+# -------------------------
+# Inkrementelle Statistiken
+# -------------------------
+
+class ExactSum:
+    """
+    Exakte Summe: Gleitkommazahlen als ganzzahlige Vielfache von 2**-1074 aufaddiert.
+    Das Ergebnis ist unabhängig von Reihenfolge und Blockgrenzen (einmal korrekt gerundet).
+    """
+
+    _SCALE_BITS = 1074
+
+    def __init__(self):
+        self._integer = 0
+        self._scaled = 0
+        self._has_float = False
+
+    def add_many(self, values: List[float | int]) -> None:
+        integer = 0
+        scaled = 0
+        for value in values:
+            if isinstance(value, int):
+                integer += value
+            else:
+                numerator, denominator = value.as_integer_ratio()
+                scaled += numerator << (self._SCALE_BITS + 1 - denominator.bit_length())
+                self._has_float = True
+        self._integer += integer
+        self._scaled += scaled
+
+    def value(self) -> float | int:
+        if not self._has_float:
+            return self._integer
+        return ((self._integer << self._SCALE_BITS) + self._scaled) / (1 << self._SCALE_BITS)
+
+
+class ColumnStats:
+    """Statistik einer Spalte, blockweise fortgeschrieben."""
+
+    def __init__(self, name: str, kind: str):
+        self.name = name
+        self.kind = kind
+        self.count = 0
+        self.nulls = 0
+        self.invalid = 0
+        self.min: Any = None
+        self.max: Any = None
+        self.sum = ExactSum()
+        self.sum_squares = ExactSum()
+        self.distinct: set = set()
+        self.distinct_capped = False
+        # Für die kompakte Typableitung (config/compact_dtypes.py)
+        self.all_integer = True
+        self.max_digits = 0
+
+    def update(self, values: List[Any]) -> None:
+        present = [value for value in values if value is not None]
+        self.nulls += len(values) - len(present)
+        if self.kind != "string":
+            # Zahl erwartet, Text vorgefunden → nicht in Min/Max/Summen
+            numbers = [value for value in present if not isinstance(value, str)]
+            self.invalid += len(present) - len(numbers)
+            present = numbers
+            self.sum.add_many(present)
+            self.sum_squares.add_many([value * value for value in present])
+            floats = [value for value in present if isinstance(value, float)]
+            if floats:
+                self.all_integer = False
+                # Ab FLOAT32_DIGITS + 1 steht float64 fest → nicht weiter zählen
+                if self.max_digits <= FLOAT32_DIGITS:
+                    self.max_digits = max(self.max_digits, max(map(significant_digits, floats)))
+        if not present:
+            return
+        self.count += len(present)
+        low, high = min(present), max(present)
+        if self.min is None or low < self.min:
+            self.min = low
+        if self.max is None or high > self.max:
+            self.max = high
+        if not self.distinct_capped:
+            self.distinct.update(present)
+            if len(self.distinct) > DISTINCT_LIMIT:
+                self.distinct_capped = True
+                self.distinct = set()
+
+    def as_dict(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "type": self.kind,
+            "count": self.count,
+            "nulls": self.nulls,
+            "min": self.min,
+            "max": self.max,
+            "distinct": None if self.distinct_capped else len(self.distinct),
+        }
+        if self.kind != "string":
+            stats["invalid"] = self.invalid
+            mean = std = None
+            if self.count:
+                total = self.sum.value()
+                mean = total / self.count
+                if self.count > 1:
+                    # Varianz aus exakten Summen (blockunabhängig)
+                    variance = (self.sum_squares.value() - total * mean) / (self.count - 1)
+                    std = math.sqrt(max(variance, 0.0))
+            stats["mean"] = mean
+            stats["std"] = std
+            stats["all_integer"] = self.all_integer
+            stats["max_digits"] = min(self.max_digits, FLOAT32_DIGITS + 1) if not self.all_integer else None
+            # Perioden nur über vollständige Distinct-Werte prüfbar
+            stats["periods"] = bool(
+                self.all_integer and self.count and not self.distinct_capped
+                and all(is_period(value) for value in self.distinct)
+            )
+        return stats
+
+
+class ApproxColumnStats(ColumnStats):
+    """
+    Approximative Spaltenstatistik für sehr große Dateien.
+
+    Exakt bleiben Anzahl, Nullwerte, Min/Max und Ganzzahligkeit (C-seitige Builtins).
+    Summen laufen über `math.fsum` je Block (statt ganzzahlig skaliert), Distinct über
+    HyperLogLog, Quantile über t-Digest; die Stellenzahl für die Typableitung stammt aus der
+    Reservoir-Stichprobe (`finish_sample`).
+    """
+
+    def __init__(self, name: str, kind: str):
+        super().__init__(name, kind)
+        self.hll = HyperLogLog(HLL_PRECISION)
+        self.digest = TDigest(TDIGEST_COMPRESSION) if kind != "string" else None
+        self.sums: List[float] = []
+        self.sums_squares: List[float] = []
+        self.sample_periods = False
+
+    def update(self, values: List[Any]) -> None:
+        present = [value for value in values if value is not None]
+        self.nulls += len(values) - len(present)
+        if self.kind != "string":
+            numbers = [value for value in present if not isinstance(value, str)]
+            self.invalid += len(present) - len(numbers)
+            present = numbers
+            self.sums.append(math.fsum(present))
+            self.sums_squares.append(math.fsum([value * value for value in present]))
+            if self.all_integer and not all(type(value) is int for value in present):
+                self.all_integer = False
+            self.digest.add_many(present)
+        if not present:
+            return
+        self.count += len(present)
+        low, high = min(present), max(present)
+        if self.min is None or low < self.min:
+            self.min = low
+        if self.max is None or high > self.max:
+            self.max = high
+        self.hll.add_many(present)
+
+    def finish_sample(self, sample: List[Any]) -> None:
+        """Typmerkmale aus der Reservoir-Stichprobe (Stellenzahl, Perioden)."""
+        numbers = [value for value in sample if value is not None and not isinstance(value, str)]
+        floats = [value for value in numbers if isinstance(value, float)]
+        if floats:
+            self.max_digits = min(max(map(significant_digits, floats)), FLOAT32_DIGITS + 1)
+        self.sample_periods = bool(numbers) and all(is_period(value) for value in numbers)
+
+    def as_dict(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {
+            "type": self.kind,
+            "count": self.count,
+            "nulls": self.nulls,
+            "min": self.min,
+            "max": self.max,
+            "distinct": self.hll.estimate() if self.count else 0,
+        }
+        error: Dict[str, Any] = {"distinct_relative_std": round(self.hll.relative_error, 4)}
+        if self.kind != "string":
+            stats["invalid"] = self.invalid
+            mean = std = None
+            if self.count:
+                total = math.fsum(self.sums)
+                mean = total / self.count
+                if self.count > 1:
+                    variance = (math.fsum(self.sums_squares) - total * mean) / (self.count - 1)
+                    std = math.sqrt(max(variance, 0.0))
+            stats["mean"] = mean
+            stats["std"] = std
+            stats["all_integer"] = self.all_integer
+            stats["max_digits"] = None if self.all_integer else self.max_digits
+            stats["periods"] = bool(self.all_integer and self.count and self.sample_periods)
+            quantiles, rank_error = self.digest.quantiles(QUANTILE_LEVELS)
+            stats["quantiles"] = quantiles
+            error["quantile_rank_error"] = round(rank_error, 6)
+        stats["error"] = error
+        return stats
+
+
+# -------------------------
+# Lesen & Schreiben
+# -------------------------
+
+def hash_csv(csv_path: Path) -> str:
+    """Inhalts-Hash der CSV (SHA-256, blockweise gelesen)."""
+    digest = hashlib.sha256()
+    with open(csv_path, "rb") as fh:
+        for block in iter(lambda: fh.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def detect_delimiter(csv_path: Path) -> str:
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as fh:
+        sample = fh.read(_SNIFF_BYTES)
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=";,\t|").delimiter
+    except csv.Error:
+        return ";" if sample.count(";") >= sample.count(",") else ","
+
+
+def iter_csv_chunks(
+    csv_path: Path, chunk_rows: int, delimiter: str
+) -> Iterator[Tuple[List[str], List[List[str]]]]:
+    """(Header, Zeilenblock) je `chunk_rows` Zeilen; `chunk_rows <= 0` → ein Block."""
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as fh:
+        reader = csv.reader(fh, delimiter=delimiter)
+        header = [name.strip() for name in next(reader, [])]
+        chunk: List[List[str]] = []
+        for row in reader:
+            if not row:
+                continue
+            chunk.append(row)
+            if chunk_rows > 0 and len(chunk) >= chunk_rows:
+                yield header, chunk
+                chunk = []
+        if chunk:
+            yield header, chunk
+
+
+class Stage0Writer:
+    """Schreibt die Stage0-JSON inkrementell in eine temporäre Datei; `close()` ersetzt atomar."""
+
+    def __init__(self, target: Path, header: Dict[str, Any]):
+        self.target = target
+        self._staging = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}")
+        self._fh: io.TextIOWrapper = open(self._staging, "w", encoding="utf-8")
+        opening = json.dumps(header, ensure_ascii=False)[:-1]
+        self._fh.write(f'{opening}, "records": [')
+        self._first = True
+
+    def write_records(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        # Ein dumps je Block; Trenner an Blockgrenzen wie innerhalb eines Blocks (", ")
+        body = json.dumps(records, ensure_ascii=False)[1:-1]
+        self._fh.write(body if self._first else f", {body}")
+        self._first = False
+
+    def close(self, trailer: Dict[str, Any]) -> Path:
+        closing = json.dumps(trailer, ensure_ascii=False)[1:]
+        self._fh.write(f"], {closing}")
+        self._fh.close()
+        os.replace(self._staging, self.target)
+        return self.target
+
+    def abort(self) -> None:
+        self._fh.close()
+        self._staging.unlink(missing_ok=True)
+
+
+def is_stream_stage0(stage0_path: Path) -> bool:
+    """Trägt die Datei die Kennung des Streaming-Formats? (liest nur den Dateianfang)"""
+    try:
+        with open(stage0_path, "rb") as fh:
+            return fh.read(len(_FORMAT_PREFIX)) == _FORMAT_PREFIX
+    except OSError:
+        return False
+
+
+def cached_profile(stage0_path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Abschnitt `profile` aus dem Trailer einer Stage0-Datei (letzter Schlüssel, nur das Dateiende wird
+    gelesen). None: kein Streaming-Trailer mit Profil (Step0-Format, ältere Streaming-Datei, defekt).
+    """
+    try:
+        with open(stage0_path, "rb") as fh:
+            fh.seek(0, os.SEEK_END)
+            fh.seek(max(0, fh.tell() - _TRAILER_BYTES))
+            tail = fh.read().decode("utf-8", errors="ignore").rstrip()
+    except OSError:
+        return None
+    marker = tail.rfind('"profile": ')
+    if marker < 0 or not tail.endswith("}"):
+        return None
+    try:
+        profile = json.loads(tail[marker + len('"profile": '):-1])
+    except ValueError:
+        return None
+    return profile if isinstance(profile, dict) else None
+
+
+def profile_summary(row_count: int, column_stats: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Fehlerschranken des approximativen Profils (für Stage0 und Ergebnisse)."""
+    rank_errors = [
+        (stats.get("error") or {}).get("quantile_rank_error", 0.0) for stats in column_stats.values()
+    ]
+    sampled = min(row_count, RESERVOIR_ROWS)
+    return {
+        "mode": "approx",
+        "reservoir_rows": sampled,
+        "sample_fraction": round(sampled / row_count, 6) if row_count else 0.0,
+        # Anteil einer Eigenschaft in der Stichprobe: 95%-Schranke nach Hoeffding
+        "sample_proportion_error_95": round(math.sqrt(math.log(2 / 0.05) / (2 * sampled)), 4) if sampled else None,
+        "distinct_relative_std": round(1.04 / math.sqrt(1 << HLL_PRECISION), 4),
+        "quantile_rank_error_max": round(max(rank_errors, default=0.0), 6),
+        "tdigest_compression": TDIGEST_COMPRESSION,
+        "exact": ["count", "nulls", "min", "max", "invalid", "all_integer", "records"],
+    }
+
+
+def stream_csv_to_stage0(
+    csv_path: Path | str,
+    stage0_dir: Optional[Path] = None,
+    chunk_rows: Optional[int] = None,
+    force_reanalysis: bool = False,
+    profile: Optional[str] = None,
+) -> Tuple[Optional[Path], Dict[str, Any]]:
+    """
+    CSV blockweise nach Stage0 (`<stage0_dir>/<csv_hash>.json`, Standard: `stage0_stream/`) überführen.
+
+    Args:
+        chunk_rows: Zeilen je Block (None → `STAGE0_CHUNK_ROWS` bzw. Standard; 0 → ein Block)
+        force_reanalysis: vorhandene Stage0-Datei neu erzeugen
+        profile: `exact` (Standard) oder `approx` – Spaltenprofil über Sketches mit Fehlerschranken;
+            die Records werden in beiden Modi exakt konvertiert
+
+    Returns:
+        (stage0_file_path, results_dict) analog zu Step0 (`csv_hash`, `row_count`, `column_stats`)
+    """
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        return None, {"error": f"CSV not found: {csv_path}"}
+    if chunk_rows is None:
+        chunk_rows = configured_chunk_rows() or DEFAULT_CHUNK_ROWS
+    profile = profile or configured_profile()
+    if profile not in PROFILES:
+        return None, {"error": f"Unknown Stage0 profile: {profile}"}
+    approx = profile == "approx"
+    stage0_dir = stage0_dir or ProjectPaths.dynamic_system_outputs_directory() / STREAM_DIRECTORY
+    ProjectPaths.ensure_directory_exists(stage0_dir)
+
+    csv_hash = hash_csv(csv_path)
+    target = stage0_dir / f"{csv_hash}.json"
+    if target.exists() and not force_reanalysis:
+        # Cache nur mit Formatkennung und angefordertem Profil; das jeweils andere Profil wird neu erzeugt
+        cached = cached_profile(target) if is_stream_stage0(target) else None
+        if cached is not None and cached.get("mode") == profile:
+            return target, {"csv_hash": csv_hash, "cached": True, "profile": cached}
+
+    delimiter = detect_delimiter(csv_path)
+    writer: Optional[Stage0Writer] = None
+    stats: Dict[str, ColumnStats] = {}
+    columns: List[str] = []
+    row_count = 0
+    stats_class = ApproxColumnStats if approx else ColumnStats
+    # Stichprobe für die Typableitung (approx); Seed aus dem Inhalts-Hash → deterministisch
+    reservoir = RowReservoir(RESERVOIR_ROWS, seed=int(csv_hash[:16], 16)) if approx else None
+    samples: List[List[Any]] = []
+    try:
+        for header, rows in iter_csv_chunks(csv_path, chunk_rows, delimiter):
+            if writer is None:
+                columns = header
+                stats = {name: stats_class(name, column_kind(name)) for name in columns}
+                samples = [[] for _ in columns]
+                writer = Stage0Writer(target, {
+                    "format": STREAM_FORMAT,
+                    "csv_hash": csv_hash,
+                    "source_file": csv_path.name,
+                    "delimiter": delimiter,
+                    "columns": columns,
+                })
+            kinds = [stats[name].kind for name in columns]
+            # Spaltenweise konvertieren: Statistiken je Spalte, Records je Zeile
+            converted = [
+                [convert_value(row[i], kinds[i]) if i < len(row) else None for row in rows]
+                for i in range(len(columns))
+            ]
+            for name, values in zip(columns, converted):
+                stats[name].update(values)
+            if reservoir is not None:
+                for position, slot in reservoir.select(len(rows)):
+                    for sample, values in zip(samples, converted):
+                        if slot < len(sample):
+                            sample[slot] = values[position]
+                        else:
+                            sample.append(values[position])
+            writer.write_records([dict(zip(columns, values)) for values in zip(*converted)])
+            row_count += len(rows)
+            del converted, rows
+
+        if writer is None:
+            return None, {"error": f"CSV is empty: {csv_path}"}
+        if reservoir is not None:
+            for name, sample in zip(columns, samples):
+                stats[name].finish_sample(sample)
+        column_stats = {name: stats[name].as_dict() for name in columns}
+        schema = {name: column_schema(infer_physical_type(name, column_stats[name])) for name in columns}
+        trailer: Dict[str, Any] = {"row_count": row_count, "column_stats": column_stats, "schema": schema}
+        # Profil immer als letzter Trailer-Schlüssel → Cache-Prüfung über `cached_profile`
+        trailer["profile"] = profile_summary(row_count, column_stats) if approx else {"mode": "exact"}
+        writer.close(trailer)
+    except Exception as e:
+        if writer is not None:
+            writer.abort()
+        return None, {"error": f"Streaming ingestion failed: {e}"}
+
+    return target, {
+        "csv_hash": csv_hash,
+        "row_count": row_count,
+        "columns": columns,
+        "column_stats": column_stats,
+        "schema": schema,
+        "chunk_rows": chunk_rows,
+        "profile": trailer["profile"],
+    }
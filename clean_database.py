@@ -45,6 +45,12 @@ try:
     # Datenbank speichern
     if db.save():
         print("✅ Database cleared and saved successfully")
+        # Ingestion-Manifest verwerfen: sonst gelten alle Input-Dateien als bereits ingestiert
+        from config.paths_config import ProjectPaths
+        manifest_file = ProjectPaths.ingestion_manifest_file()
+        if manifest_file.exists():
+            manifest_file.unlink()
+            print(f"Removed ingestion manifest: {manifest_file}")
     else:
         print("❌ Error saving cleared database")
     
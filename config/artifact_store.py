@@ -0,0 +1,244 @@
+"""
+Artifact Store - Inhaltsadressierter Blob-Speicher für Streaming-Stage0 und Run-Snapshots
+
+Jede Datei liegt genau einmal unter `ProjectPaths.artifact_store_directory()/blobs/<aa>/<sha256>`;
+Streaming-Stage0 (Cache + Outbox), Experiment-Outbox und Run-Snapshots sind Hardlinks (bzw.
+Reflinks) auf diesen Blob. Step0-Cache und Modelldateien liegen nicht im Store: ihre Schreiber
+überschreiben an Ort und Stelle.
+
+- Export (`export`, `export_tree`): Datei in den Store kopieren (Reflink, sonst Kopie) und am Ziel
+  verlinken – bereits gespeicherte Inhalte kosten O(1) und keinen zusätzlichen Plattenplatz
+- Referenzzählung über den Link-Zähler des Dateisystems: `st_nlink - 1` = Anzahl Pfade,
+  die auf den Blob zeigen. Wird ein Pfad gelöscht oder atomar ersetzt, sinkt der Zähler.
+- Garbage Collection (`gc`): Blobs ohne Referenz (nur noch der Store-Eintrag) werden entfernt
+
+Fallback-Kette beim Verlinken: Hardlink → Reflink (FICLONE, z. B. Btrfs/XFS) → Kopie.
+Reflinks und Kopien sind eigenständige Dateien und zählen nicht als Referenz.
+
+Wichtig: verlinkte Dateien teilen ihren Inhalt mit dem Blob. Der Blob ist daher nie der Inode
+der Quelle (`put` kopiert); die Quelle wird nur mit `link_source=True` auf den Blob umgestellt –
+erlaubt nur, wenn ihr Schreiber atomar ersetzt (Staging-Datei + `os.replace`) wie der
+Streaming-Stage0-Writer, oder wenn die Links vor dem Schreiben aufgelöst werden (`detach_tree`,
+z. B. Pipelines in ihre Outbox vor einem echten Lauf).
+"""
+
+from __future__ import annotations
+
+import errno
+import hashlib
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from config.paths_config import ProjectPaths
+
+_HASH_BLOCK = 1024 * 1024
+_FICLONE = 0x40049409
+_STAGING_PREFIX = ".tmp-"
+
+# Blobs, die jünger sind, überspringt die GC (Export zwischen `put` und `link` läuft evtl. noch)
+DEFAULT_GC_MIN_AGE_SECONDS = 300
+
+
+def file_digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(_HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _reflink(source: Path, target: Path) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(source, "rb") as src, open(target, "wb") as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+    except OSError:
+        target.unlink(missing_ok=True)
+        return False
+    shutil.copystat(source, target)
+    return True
+
+
+class ArtifactStore:
+    """Inhaltsadressierter Speicher mit Hardlink-Dedup, Referenzzählung und GC."""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root is not None else ProjectPaths.artifact_store_directory()
+        self.blobs = self.root / "blobs"
+        ProjectPaths.ensure_directory_exists(self.blobs)
+
+    # -------------------------
+    # Blobs
+    # -------------------------
+
+    def blob_path(self, digest: str) -> Path:
+        return self.blobs / digest[:2] / digest
+
+    def put(self, source: Path | str, digest: Optional[str] = None) -> str:
+        """
+        Datei in den Store übernehmen und ihren Hash liefern.
+
+        Ein neuer Blob ist immer ein eigener Inode (Reflink, sonst Kopie in eine Staging-Datei,
+        atomar umbenannt) – überschreibt der Aufrufer seine Quelle später an Ort und Stelle, bleibt
+        der Blob unverändert. Parallele `put` desselben Inhalts sind unkritisch.
+        """
+        source = Path(source)
+        digest = digest or file_digest(source)
+        blob = self.blob_path(digest)
+        if blob.exists():
+            return digest
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        staging = blob.with_name(f"{_STAGING_PREFIX}{digest}.{uuid.uuid4().hex[:8]}")
+        try:
+            if not _reflink(source, staging):
+                shutil.copy2(source, staging)
+            os.replace(staging, blob)
+        finally:
+            staging.unlink(missing_ok=True)
+        return digest
+
+    def link(self, digest: str, target: Path | str) -> Path:
+        """Blob am Ziel bereitstellen (Hardlink → Reflink → Kopie); ersetzt das Ziel atomar."""
+        blob = self.blob_path(digest)
+        if not blob.exists():
+            raise FileNotFoundError(f"Blob not in artifact store: {digest}")
+        target = Path(target)
+        if self.is_linked(target, digest):
+            return target
+        target.parent.mkdir(parents=True, exist_ok=True)
+        staging = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}")
+        try:
+            try:
+                os.link(blob, staging)
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                    raise
+                if not _reflink(blob, staging):
+                    shutil.copy2(blob, staging)
+            os.replace(staging, target)
+        finally:
+            staging.unlink(missing_ok=True)
+        return target
+
+    def is_linked(self, path: Path | str, digest: str) -> bool:
+        """Zeigt `path` bereits auf den Blob (gleicher Inode)?"""
+        try:
+            return os.path.samefile(path, self.blob_path(digest))
+        except OSError:
+            return False
+
+    # -------------------------
+    # Export
+    # -------------------------
+
+    def export(
+        self,
+        source: Path | str,
+        target: Path | str,
+        digest: Optional[str] = None,
+        link_source: bool = False,
+    ) -> Tuple[Path, str]:
+        """
+        `source` nach `target` exportieren (Ersatz für `shutil.copy2`).
+
+        Das Ziel verweist danach auf den Blob. `link_source=True` stellt auch die Quelle auf den
+        Blob um (Dedup mit früheren Kopien) – nur für Quellen, deren Schreiber atomar ersetzen.
+        Liefert (Ziel, Hash).
+        """
+        source = Path(source)
+        target = Path(target)
+        # Hash bekannt und bereits derselbe Inode → nichts zu tun
+        try:
+            if digest and os.path.samefile(source, target):
+                return target, digest
+        except OSError:
+            pass
+        digest = self.put(source, digest)
+        if link_source and not self.is_linked(source, digest):
+            self.link(digest, source)
+        return self.link(digest, target), digest
+
+    def export_tree(
+        self, source_dir: Path | str, target_dir: Path | str, link_source: bool = False
+    ) -> Dict[str, str]:
+        """Verzeichnisbaum exportieren (Ersatz für `shutil.copytree`). Liefert relativer Pfad → Hash."""
+        source_dir = Path(source_dir)
+        target_dir = Path(target_dir)
+        exported: Dict[str, str] = {}
+        for source in sorted(source_dir.rglob("*")):
+            relative = source.relative_to(source_dir)
+            if source.is_symlink() or not source.is_file():
+                if source.is_dir():
+                    (target_dir / relative).mkdir(parents=True, exist_ok=True)
+                continue
+            _, digest = self.export(source, target_dir / relative, link_source=link_source)
+            exported[str(relative)] = digest
+        target_dir.mkdir(parents=True, exist_ok=True)
+        return exported
+
+    @staticmethod
+    def detach(path: Path | str) -> bool:
+        """
+        Geteilten Inode auflösen (eigenständige Kopie, atomar ersetzt).
+
+        Vor Schreibern nötig, die Dateien an Ort und Stelle überschreiben – sonst änderten sie
+        Blob und alle weiteren Referenzen mit. Liefert True, wenn kopiert wurde.
+        """
+        path = Path(path)
+        try:
+            if path.is_symlink() or path.stat().st_nlink < 2:
+                return False
+        except FileNotFoundError:
+            return False
+        staging = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}")
+        try:
+            if not _reflink(path, staging):
+                shutil.copy2(path, staging)
+            os.replace(staging, path)
+        finally:
+            staging.unlink(missing_ok=True)
+        return True
+
+    def detach_tree(self, directory: Path | str) -> int:
+        """Alle geteilten Dateien eines Verzeichnisbaums auflösen. Liefert Anzahl."""
+        directory = Path(directory)
+        if not directory.is_dir():
+            return 0
+        return sum(1 for path in directory.rglob("*") if path.is_file() and self.detach(path))
+
+    # -------------------------
+    # GC
+    # -------------------------
+
+    def gc(self, min_age_seconds: Optional[float] = None) -> Dict[str, int]:
+        """Unreferenzierte Blobs (und verwaiste Staging-Dateien) entfernen."""
+        if min_age_seconds is None:
+            min_age_seconds = float(os.environ.get("ARTIFACT_STORE_GC_MIN_AGE_SECONDS", DEFAULT_GC_MIN_AGE_SECONDS))
+        cutoff = time.time() - min_age_seconds
+        stats = {"blobs": 0, "removed": 0, "freed_bytes": 0}
+        for shard in self.blobs.iterdir() if self.blobs.exists() else []:
+            if not shard.is_dir():
+                continue
+            for blob in shard.iterdir():
+                try:
+                    stat = blob.stat()
+                except FileNotFoundError:
+                    continue
+                is_staging = blob.name.startswith(_STAGING_PREFIX)
+                if not is_staging:
+                    stats["blobs"] += 1
+                # ctime: ändert sich bei jedem Link/Rename (mtime stammt bei Hardlinks von der Quelle)
+                if stat.st_ctime > cutoff or (stat.st_nlink > 1 and not is_staging):
+                    continue
+                blob.unlink(missing_ok=True)
+                if not is_staging:
+                    stats["removed"] += 1
+                    stats["freed_bytes"] += stat.st_size
+        return stats
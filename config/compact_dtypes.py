@@ -0,0 +1,227 @@
+"""
+Compact Dtypes - Kompakte physische Spaltentypen für Stage0/rawdata
+
+Stage0-Records sind generisches JSON; erst der Spaltentyp macht daraus kompakte, stabile Spalten
+für Loader und DuckDB. Je Spalte wird aus den Stage0-Spaltenstatistiken ein physischer Typ
+abgeleitet, im Tabellenschema persistiert (`schema[col]["physical_type"]`) und beim Import
+erzwungen (ein Python-Typ je Spalte – keine Mischung aus bool/int/float/str).
+
+Physische Typen:
+- `int8` / `int16` / `int32` / `int64`  Ganzzahlen nach Wertebereich (Flags 0/1 → int8)
+- `period_yyyymm`                       Perioden YYYYMM (z. B. `I_TIMEBASE`), als int32
+- `float32`                             Kommazahlen mit höchstens `FLOAT32_DIGITS` signifikanten Stellen
+- `float64`                             übrige Kommazahlen
+- `category`                            Text mit wenigen Ausprägungen (Dictionary-Encoding)
+- `string`                              übriger Text; auch Zahlenspalten mit Textwerten (stabiler Typ)
+
+Über mehrere Stage0-Dateien wird nur verbreitert (`widen`): int8 + int32 → int32,
+int16 + float32 → float32, int64 + float32 → float64, alles + string → string.
+
+    from config.compact_dtypes import to_frame
+    frame = to_frame(db.data["tables"]["rawdata"]["records"], db.data["tables"]["rawdata"]["schema"])
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional
+
+# float32 gibt Dezimalzahlen bis 6 signifikante Stellen verlustfrei wieder
+FLOAT32_DIGITS = 6
+FLOAT32_MAX = 3.4e38
+# Text gilt als kategorial, wenn höchstens dieser Anteil der Werte verschieden ist
+CATEGORY_MAX_RATIO = 0.5
+
+_INT_RANGES = (
+    ("int8", -(2 ** 7), 2 ** 7 - 1),
+    ("int16", -(2 ** 15), 2 ** 15 - 1),
+    ("int32", -(2 ** 31), 2 ** 31 - 1),
+    ("int64", -(2 ** 63), 2 ** 63 - 1),
+)
+_INT_ORDER = [name for name, _, _ in _INT_RANGES]
+_PERIOD_HINTS = ("timebase", "yyyymm", "period")
+_INT_BITS = {"int8": 8, "int16": 16, "int32": 32, "int64": 64, "period_yyyymm": 32}
+
+DISPLAY_TYPES = {
+    "int8": "integer", "int16": "integer", "int32": "integer", "int64": "integer",
+    "period_yyyymm": "integer",
+    "float32": "decimal", "float64": "decimal",
+    "category": "text", "string": "text",
+}
+
+# pandas-Dtypes; bei Nullwerten die nullable Varianten (Int8 …)
+_PANDAS_DTYPES = {
+    "int8": "int8", "int16": "int16", "int32": "int32", "int64": "int64", "period_yyyymm": "int32",
+    "float32": "float32", "float64": "float64", "category": "category", "string": "object",
+}
+
+
+# -------------------------
+# Inferenz
+# -------------------------
+
+def significant_digits(value: float) -> int:
+    """Signifikante Stellen der kürzesten Darstellung (`repr`), z. B. 12.5 → 3, 0.001 → 1."""
+    digits = repr(abs(value)).lower().split("e")[0].replace(".", "").strip("0")
+    return max(len(digits), 1)
+
+
+def is_period(value: Any) -> bool:
+    return isinstance(value, int) and 190001 <= value <= 299912 and 1 <= value % 100 <= 12
+
+
+def integer_type(low: int, high: int) -> str:
+    for name, minimum, maximum in _INT_RANGES:
+        if minimum <= low and high <= maximum:
+            return name
+    return "string"  # außerhalb int64 → als Text stabil halten
+
+
+def infer_physical_type(name: str, stats: Dict[str, Any]) -> str:
+    """
+    Physischen Typ aus Stage0-Spaltenstatistiken ableiten.
+
+    Erwartet die Felder von `ColumnStats.as_dict()` (`type`, `count`, `min`, `max`, `distinct`,
+    `invalid`) sowie `all_integer`, `max_digits` und `periods` für Zahlenspalten.
+    """
+    kind = stats.get("type")
+    count = stats.get("count") or 0
+    if kind == "string":
+        distinct = stats.get("distinct")
+        if distinct is not None and count and distinct <= max(1, count * CATEGORY_MAX_RATIO):
+            return "category"
+        return "string"
+    if stats.get("invalid"):
+        return "string"
+    if not count:
+        # Nur Nullwerte: kleinster Typ, verbreitert sich mit späteren Dateien
+        return "int8" if kind == "integer" else "float32"
+    low, high = stats.get("min"), stats.get("max")
+    if stats.get("all_integer", kind == "integer"):
+        # Periode nur bei passendem Spaltennamen – Kundennummern können zufällig wie YYYYMM aussehen
+        lowered = name.strip().lower()
+        if any(hint in lowered for hint in _PERIOD_HINTS) and is_period(low) and is_period(high):
+            if stats.get("periods") or stats.get("distinct") is None:
+                return "period_yyyymm"
+        return integer_type(int(low), int(high))
+    digits = stats.get("max_digits")
+    if digits is not None and digits <= FLOAT32_DIGITS and max(abs(low), abs(high)) <= FLOAT32_MAX:
+        return "float32"
+    return "float64"
+
+
+def widen(current: Optional[str], incoming: str) -> str:
+    """Kleinster physischer Typ, der beide Typen verlustfrei aufnimmt."""
+    if current is None or current == incoming:
+        return incoming
+    if "string" in (current, incoming):
+        return "string"
+    if "category" in (current, incoming):
+        return "string"
+    pair = {current, incoming}
+    if pair <= set(_INT_ORDER) | {"period_yyyymm"}:
+        if "period_yyyymm" in pair:
+            other = (pair - {"period_yyyymm"}).pop()
+            return other if _INT_BITS[other] >= 32 else "int32"
+        return max(pair, key=_INT_ORDER.index)
+    # Ganzzahl + Kommazahl: float32 nur, wenn die Ganzzahlen exakt darstellbar sind (≤ 16 Bit)
+    integers = [t for t in pair if t in _INT_BITS]
+    floats = [t for t in pair if t in ("float32", "float64")]
+    if "float64" in floats:
+        return "float64"
+    if integers and _INT_BITS[integers[0]] > 16:
+        return "float64"
+    return "float32"
+
+
+def column_schema(physical_type: str, description: str = "") -> Dict[str, Any]:
+    """Schema-Eintrag im Format der JSON-DB-Tabellen (`display_type`, `description`)."""
+    return {
+        "display_type": DISPLAY_TYPES.get(physical_type, "text"),
+        "description": description,
+        "physical_type": physical_type,
+    }
+
+
+# -------------------------
+# Erzwingen
+# -------------------------
+
+def coerce_value(value: Any, physical_type: str) -> Any:
+    """Wert auf den Python-Typ der Spalte bringen (None bleibt None)."""
+    if value is None:
+        return None
+    if physical_type in _INT_BITS:
+        if isinstance(value, bool):
+            return int(value)
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        if isinstance(value, str):
+            try:
+                return int(value)
+            except ValueError:
+                return value
+        return value
+    if physical_type in ("float32", "float64"):
+        if isinstance(value, (bool, int)):
+            return float(value)
+        if isinstance(value, str):
+            try:
+                return float(value)
+            except ValueError:
+                return value
+        return value
+    if isinstance(value, bool):
+        return str(int(value))
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return value if isinstance(value, str) else str(value)
+
+
+def coerce_records(records: List[Dict[str, Any]], schema: Dict[str, Dict[str, Any]], columns: Optional[Iterable[str]] = None) -> None:
+    """Records an Ort und Stelle auf das Schema bringen (optional nur `columns`)."""
+    targets = [
+        (name, info["physical_type"])
+        for name, info in schema.items()
+        if (columns is None or name in columns) and (info or {}).get("physical_type")
+    ]
+    if not targets:
+        return
+    for record in records:
+        for name, physical_type in targets:
+            if name in record:
+                record[name] = coerce_value(record[name], physical_type)
+
+
+# -------------------------
+# Loader
+# -------------------------
+
+def pandas_dtypes(schema: Dict[str, Dict[str, Any]], nullable: Iterable[str] = ()) -> Dict[str, str]:
+    """Spalte → pandas-Dtype; Spalten in `nullable` erhalten nullable Ganzzahltypen (Int8 …)."""
+    nullable = set(nullable)
+    dtypes: Dict[str, str] = {}
+    for name, info in schema.items():
+        physical_type = (info or {}).get("physical_type")
+        if not physical_type:
+            continue
+        dtype = _PANDAS_DTYPES.get(physical_type, "object")
+        if name in nullable and physical_type in _INT_BITS:
+            dtype = dtype.capitalize()
+        dtypes[name] = dtype
+    return dtypes
+
+
+def to_frame(records: List[Dict[str, Any]], schema: Dict[str, Dict[str, Any]]):
+    """DataFrame mit kompakten Spaltentypen (z. B. für DuckDB-Registrierung via `register`)."""
+    import pandas as pd
+
+    frame = pd.DataFrame.from_records(records)
+    present = {name: info for name, info in schema.items() if name in frame.columns}
+    nullable = [name for name in present if frame[name].isna().any()]
+    for name, dtype in pandas_dtypes(present, nullable).items():
+        try:
+            frame[name] = frame[name].astype(dtype)
+        except (TypeError, ValueError):
+            # Unerwartete Werte → Spalte unverändert lassen statt den Loader abzubrechen
+            continue
+    return frame
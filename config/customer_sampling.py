@@ -0,0 +1,141 @@
+"""
+Customer Sampling - Deterministische, churn-stratifizierte Kundenstichprobe für Testläufe
+
+Testmodus (`test_reduction=0.9`) soll nur ~10 % der Kunden lesen statt alles zu laden und
+danach zu filtern. Die Auswahl hängt nur von `Kunde` und `seed` ab (kein Python-`hash()`,
+keine Zufallszahlen) und ist damit über Prozesse, Läufe und Speicherschichten stabil.
+
+- `sample_hash`: Hash je Kunde als ganze Zahl in [0, HASH_MODULUS) – identisch in numpy und SQL
+- `hash_predicate_sql`: Filter für die Abfrageschicht (DuckDB/SQL), ohne Labels nutzbar
+- `select_customers`: exakte Stratifizierung nach Churn-Label (kleine Abfrage Kunde → churned),
+  je Schicht die Kunden mit den kleinsten Hashwerten
+- `active_sample`: vom Runner je Job gesetzte Stichprobe (ENV), für die Datenzugriffsschicht der BL-Module
+"""
+
+from __future__ import annotations
+
+import math
+import os
+from typing import Iterable, Iterator, Mapping, Optional, Tuple
+
+import numpy as np
+
+# Multiplikatives Hashing modulo Primzahl. Der Faktor liegt unter 2^31: mit dem vorab
+# reduzierten Operanden (< HASH_MODULUS < 2^32) bleibt das Produkt < 2^63 und damit im
+# BIGINT-Bereich (DuckDB/SQLite rechnen sonst mit Überlauf bzw. float → andere Stichprobe)
+HASH_MULTIPLIER = 1103515245
+HASH_MODULUS = 4294967291
+DEFAULT_SEED = 42
+
+ENV_FRACTION = "CUSTOMER_SAMPLE_FRACTION"
+ENV_SEED = "CUSTOMER_SAMPLE_SEED"
+
+
+def _seed_offset(seed: int) -> int:
+    return (int(seed) * 40503 + 17) % HASH_MODULUS
+
+
+def sample_hash(customers, seed: int = DEFAULT_SEED) -> np.ndarray:
+    """Deterministischer Hash je Kunde in [0, HASH_MODULUS)."""
+    values = np.asarray(customers, dtype=np.int64)
+    if len(values) and (values.min() < 0 or values.max() >= 2 ** 32):
+        raise ValueError("Customer ids must be in [0, 2^32) for hash sampling")
+    # Gleiche Rechenschritte wie `hash_predicate_sql`; Produkt < 2^63
+    shifted = (values.astype(np.uint64) + np.uint64(_seed_offset(seed))) % np.uint64(HASH_MODULUS)
+    return ((shifted * np.uint64(HASH_MULTIPLIER)) % np.uint64(HASH_MODULUS)).astype(np.int64)
+
+
+def hash_threshold(fraction: float) -> int:
+    return int(math.floor(max(0.0, min(1.0, fraction)) * HASH_MODULUS))
+
+
+def in_sample(customers, fraction: float, seed: int = DEFAULT_SEED) -> np.ndarray:
+    """Bool-Maske: Kunde liegt in der (nicht stratifizierten) Hash-Stichprobe."""
+    return sample_hash(customers, seed) < hash_threshold(fraction)
+
+
+def hash_predicate_sql(fraction: float, seed: int = DEFAULT_SEED, column: str = "Kunde") -> str:
+    """
+    WHERE-Bedingung für die Abfrageschicht, identisch zu `in_sample`.
+
+    Beispiel (DuckDB): `SELECT * FROM rawdata WHERE <predicate>`
+    """
+    offset = _seed_offset(seed)
+    return (
+        f"((((CAST({column} AS BIGINT) + {offset}) % {HASH_MODULUS}) * {HASH_MULTIPLIER}) % {HASH_MODULUS}"
+        f" < {hash_threshold(fraction)})"
+    )
+
+
+def select_customers(
+    customers,
+    churned,
+    fraction: float,
+    seed: int = DEFAULT_SEED,
+) -> np.ndarray:
+    """
+    Churn-stratifizierte Auswahl: in jeder Schicht (churned / nicht churned) die
+    `ceil(fraction * n)` Kunden mit den kleinsten Hashwerten – exakter Anteil je Schicht.
+
+    Args:
+        customers: eindeutige Kunden-IDs
+        churned: Label je Kunde (True = irgendwann gekündigt)
+
+    Returns:
+        Sortierte Kunden-IDs der Stichprobe
+    """
+    customers = np.asarray(customers, dtype=np.int64)
+    churned = np.asarray(churned, dtype=bool)
+    if customers.shape != churned.shape:
+        raise ValueError("customers and churned must have the same length")
+    if fraction >= 1.0:
+        return np.sort(customers)
+    hashes = sample_hash(customers, seed)
+    selected = []
+    for stratum in (True, False):
+        members = customers[churned == stratum]
+        if not len(members):
+            continue
+        take = int(math.ceil(fraction * len(members)))
+        order = np.argsort(hashes[churned == stratum], kind="stable")
+        selected.append(members[order[:take]])
+    return np.sort(np.concatenate(selected)) if selected else np.empty(0, dtype=np.int64)
+
+
+def churn_labels_sql(table: str = "rawdata", alive_column: str = "I_Alive", column: str = "Kunde") -> str:
+    """Kleine Label-Abfrage (ein Wert je Kunde) als Grundlage für `select_customers`."""
+    return f"SELECT {column}, MIN({alive_column}) = 0 AS churned FROM {table} GROUP BY {column}"
+
+
+def filter_records(records: Iterable[Mapping], selected: np.ndarray, column: str = "Kunde") -> Iterator[Mapping]:
+    """Datensätze streamend filtern (z. B. beim Einlesen von Stage0-/JSON-Records)."""
+    members = set(int(c) for c in selected)
+    for record in records:
+        value = record.get(column)
+        if value is not None and int(value) in members:
+            yield record
+
+
+# -------------------------
+# Job-Kontext
+# -------------------------
+
+def sample_fraction_for_test_reduction(test_reduction: Optional[float]) -> float:
+    """`test_reduction=0.9` → 10 % der Kunden."""
+    reduction = float(test_reduction or 0.0)
+    return round(max(0.0, min(1.0, 1.0 - reduction)), 6)
+
+
+def sample_environment(fraction: float, seed: int = DEFAULT_SEED) -> dict:
+    return {ENV_FRACTION: repr(float(fraction)), ENV_SEED: str(int(seed))}
+
+
+def active_sample() -> Optional[Tuple[float, int]]:
+    """(fraction, seed) des laufenden Jobs oder None (keine Stichprobe → alle Kunden laden)."""
+    raw = os.environ.get(ENV_FRACTION)
+    if not raw:
+        return None
+    fraction = float(raw)
+    if fraction >= 1.0:
+        return None
+    return fraction, int(os.environ.get(ENV_SEED, str(DEFAULT_SEED)))
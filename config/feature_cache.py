@@ -0,0 +1,245 @@
+"""
+Feature Cache - Plattenbasierter Cache für Feature-Matrizen (Kunde × Monat)
+
+Churn, Cox und CF bauen aus `rawdata` dieselben Feature-Matrizen. Der Cache legt sie
+einmalig als `.npy` ab; Folgeläufe laden sie per Memory-Mapping ohne Kopie.
+
+Schlüssel: Stage0-Hashes der Eingabedateien + Periodenfenster + Feature-Set
+(+ optionale Version des Feature-Codes).
+
+Ablage unter `ProjectPaths.feature_cache_directory()/<key>/`:
+- `matrix.npy`   2-D-Matrix (Zeilen × Features), ein Datentyp
+- `index_<name>.npy`  Zeilenschlüssel (z. B. Kunde, I_TIMEBASE)
+- `meta.json`    Spaltennamen, Shape, Dtype, Schlüsselbestandteile
+
+Eviction: LRU nach Gesamtgröße (`FEATURE_CACHE_MAX_BYTES`, Standard 20 GiB).
+Schreiben ist prozesssicher (Staging-Verzeichnis + atomisches Umbenennen).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from config.paths_config import ProjectPaths
+
+_MATRIX_FILE = "matrix.npy"
+_META_FILE = "meta.json"
+_ACCESS_FILE = ".last_access"
+
+DEFAULT_MAX_BYTES = 20 * 1024 ** 3
+
+
+class CachedFeatureMatrix:
+    """Gemappte Feature-Matrix (read-only, ohne Kopie geladen)."""
+
+    def __init__(self, key: str, matrix: np.ndarray, columns: List[str], index: Dict[str, np.ndarray], meta: Dict[str, Any]):
+        self.key = key
+        self.matrix = matrix
+        self.columns = columns
+        self.index = index
+        self.meta = meta
+
+    def to_frame(self):
+        """
+        DataFrame über der gemappten Matrix.
+
+        Bei einheitlichem Dtype verwendet pandas den Puffer ohne Kopie; Schreibzugriffe
+        schlagen fehl (read-only) – vorher `.copy()` aufrufen.
+        """
+        import pandas as pd
+
+        frame = pd.DataFrame(self.matrix, columns=self.columns, copy=False)
+        for name, values in self.index.items():
+            frame.insert(len(frame.columns), name, values)
+        return frame
+
+
+class FeatureMatrixCache:
+    """LRU-Cache für Feature-Matrizen auf Platte."""
+
+    def __init__(self, root: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.root = Path(root) if root is not None else ProjectPaths.feature_cache_directory()
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("FEATURE_CACHE_MAX_BYTES", str(DEFAULT_MAX_BYTES)))
+        self.max_bytes = max_bytes
+        ProjectPaths.ensure_directory_exists(self.root)
+
+    # -------------------------
+    # Schlüssel
+    # -------------------------
+
+    @staticmethod
+    def make_key(
+        input_hashes: Iterable[str],
+        period_from: Any,
+        period_to: Any,
+        feature_set: str,
+        version: str = "",
+    ) -> str:
+        """Cache-Schlüssel; Reihenfolge der Eingabedateien ist unerheblich."""
+        payload = {
+            "inputs": sorted(str(h) for h in input_hashes),
+            "period_from": str(period_from),
+            "period_to": str(period_to),
+            "feature_set": str(feature_set),
+            "version": str(version),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    # -------------------------
+    # Lesen
+    # -------------------------
+
+    def get(self, key: str) -> Optional[CachedFeatureMatrix]:
+        """Matrix per Memory-Mapping laden (None bei Cache-Miss)."""
+        entry = self.root / key
+        meta_file = entry / _META_FILE
+        if not meta_file.exists():
+            return None
+        try:
+            meta = json.loads(meta_file.read_text(encoding="utf-8"))
+            matrix = np.load(entry / _MATRIX_FILE, mmap_mode="r")
+            index = {name: np.load(entry / f"index_{name}.npy", mmap_mode="r") for name in meta.get("index", [])}
+        except (OSError, ValueError):
+            return None
+        self._touch(entry)
+        return CachedFeatureMatrix(key, matrix, list(meta["columns"]), index, meta)
+
+    def contains(self, key: str) -> bool:
+        return (self.root / key / _META_FILE).exists()
+
+    # -------------------------
+    # Schreiben
+    # -------------------------
+
+    def put(
+        self,
+        key: str,
+        matrix: np.ndarray,
+        columns: Sequence[str],
+        index: Optional[Dict[str, np.ndarray]] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        """Matrix ablegen; existiert der Schlüssel bereits (paralleler Schreiber), bleibt dieser Eintrag."""
+        matrix = np.ascontiguousarray(matrix)
+        if matrix.ndim != 2 or matrix.shape[1] != len(columns):
+            raise ValueError(f"Matrix shape {matrix.shape} does not match {len(columns)} columns")
+        index = index or {}
+        for name, values in index.items():
+            if len(values) != matrix.shape[0]:
+                raise ValueError(f"Index {name} has {len(values)} rows, matrix has {matrix.shape[0]}")
+
+        target = self.root / key
+        staging = self.root / f".staging_{key}_{uuid.uuid4().hex[:8]}"
+        staging.mkdir(parents=True)
+        try:
+            np.save(staging / _MATRIX_FILE, matrix, allow_pickle=False)
+            for name, values in index.items():
+                np.save(staging / f"index_{name}.npy", np.ascontiguousarray(values), allow_pickle=False)
+            entry_meta = dict(meta or {})
+            entry_meta.update({
+                "columns": list(columns),
+                "index": list(index),
+                "shape": list(matrix.shape),
+                "dtype": str(matrix.dtype),
+                "created_at": time.time(),
+            })
+            (staging / _META_FILE).write_text(json.dumps(entry_meta, indent=2), encoding="utf-8")
+            try:
+                staging.rename(target)
+            except OSError:
+                # Eintrag wurde parallel angelegt → eigenen Stand verwerfen
+                shutil.rmtree(staging, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        self._touch(target)
+        self.evict()
+        return target
+
+    def put_frame(
+        self,
+        key: str,
+        frame,
+        index_columns: Sequence[str] = ("Kunde", "I_TIMEBASE"),
+        dtype: Any = np.float64,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        """DataFrame ablegen: Schlüsselspalten als Index-Arrays, übrige Spalten als Matrix in `dtype`."""
+        index_columns = [c for c in index_columns if c in frame.columns]
+        feature_columns = [c for c in frame.columns if c not in index_columns]
+        matrix = frame[feature_columns].to_numpy(dtype=dtype)
+        index = {name: frame[name].to_numpy() for name in index_columns}
+        return self.put(key, matrix, [str(c) for c in feature_columns], index=index, meta=meta)
+
+    def get_or_build(self, key: str, build: Callable[[], Any], **put_kwargs) -> CachedFeatureMatrix:
+        """Cache-Treffer liefern oder DataFrame über `build()` erzeugen, ablegen und gemappt zurückgeben."""
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        self.put_frame(key, build(), **put_kwargs)
+        cached = self.get(key)
+        if cached is None:
+            raise RuntimeError(f"Feature cache entry {key} could not be read back")
+        return cached
+
+    # -------------------------
+    # Eviction
+    # -------------------------
+
+    def entries(self) -> List[Dict[str, Any]]:
+        result = []
+        for entry in self.root.iterdir():
+            if not entry.is_dir() or entry.name.startswith(".") or not (entry / _META_FILE).exists():
+                continue
+            size = sum(f.stat().st_size for f in entry.iterdir() if f.is_file())
+            result.append({"key": entry.name, "bytes": size, "last_access": self._last_access(entry)})
+        return result
+
+    def total_bytes(self) -> int:
+        return sum(e["bytes"] for e in self.entries())
+
+    def evict(self) -> int:
+        """Am längsten ungenutzte Einträge entfernen, bis die Gesamtgröße ins Limit passt."""
+        if self.max_bytes <= 0:
+            return 0
+        entries = sorted(self.entries(), key=lambda e: e["last_access"])
+        total = sum(e["bytes"] for e in entries)
+        removed = 0
+        # Der jüngste Eintrag bleibt immer erhalten, auch wenn er allein das Limit überschreitet
+        for entry in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            # Bereits gemappte Dateien bleiben für laufende Leser gültig (Inode lebt bis munmap)
+            shutil.rmtree(self.root / entry["key"], ignore_errors=True)
+            total -= entry["bytes"]
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for entry in self.root.iterdir():
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+
+    @staticmethod
+    def _touch(entry: Path) -> None:
+        try:
+            (entry / _ACCESS_FILE).write_text(str(time.time()), encoding="utf-8")
+        except OSError:
+            pass
+
+    @staticmethod
+    def _last_access(entry: Path) -> float:
+        try:
+            return float((entry / _ACCESS_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return (entry / _META_FILE).stat().st_mtime
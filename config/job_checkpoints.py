@@ -0,0 +1,231 @@
+"""
+Job Checkpoints - Stage-Checkpoints je Runner-Job und Wiederaufnahme ab der letzten fertigen Stage
+
+Nach jeder größeren Stage (z. B. load, features, training, backtest, write) sichert die Pipeline
+ihre Zwischenergebnisse; ein Manifest hält die abgeschlossenen Stages in Reihenfolge fest.
+
+Ablage unter `ProjectPaths.runner_checkpoints_directory()/<job_id>/`:
+- `manifest.json`      abgeschlossene Stages mit Zeitpunkt, Artefakten und Metadaten
+- `<stage>/files/`     übernommene Dateien (Hardlink, sonst Kopie)
+- `<stage>/objects/`   Python-Objekte (pickle), z. B. DataFrames
+
+Wiederaufnahme: ein neuer Job mit `resume_from=<job_id>` übernimmt die Checkpoints des
+Ursprungsjobs (Hardlinks); Retries desselben Jobs finden ihre eigenen Checkpoints direkt vor.
+BL-Module greifen über `current()` auf die Checkpoints des laufenden Jobs zu:
+
+    checkpoints = current()
+    if checkpoints and checkpoints.is_completed("features"):
+        features = checkpoints.get("features").load("features")
+    else:
+        features = build_features(...)
+        if checkpoints:
+            checkpoints.save("features", objects={"features": features})
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import pickle
+import re
+import shutil
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config.paths_config import ProjectPaths
+
+_MANIFEST_FILE = "manifest.json"
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def _safe(name: str) -> str:
+    return _SAFE_NAME.sub("_", str(name))
+
+
+def _link_or_copy(source: str, target: str) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+class StageCheckpoint:
+    """Gesicherte Artefakte einer abgeschlossenen Stage."""
+
+    def __init__(self, directory: Path, entry: Dict[str, Any]):
+        self.directory = directory
+        self.name = entry["stage"]
+        self.completed_at = entry.get("completed_at")
+        self.files: List[str] = list(entry.get("files") or [])
+        self.objects: List[str] = list(entry.get("objects") or [])
+        self.meta: Dict[str, Any] = dict(entry.get("meta") or {})
+
+    def path(self, name: str) -> Path:
+        if name not in self.files:
+            raise KeyError(f"Stage {self.name} has no file {name}")
+        return self.directory / "files" / name
+
+    def load(self, name: str) -> Any:
+        if name not in self.objects:
+            raise KeyError(f"Stage {self.name} has no object {name}")
+        with open(self.directory / "objects" / f"{_safe(name)}.pkl", "rb") as fh:
+            return pickle.load(fh)
+
+
+class JobCheckpoints:
+    """Checkpoints eines Jobs."""
+
+    def __init__(self, job_id: str, root: Optional[Path] = None):
+        self.job_id = job_id
+        root = Path(root) if root is not None else ProjectPaths.runner_checkpoints_directory()
+        self.directory = root / _safe(job_id)
+
+    # -------------------------
+    # Manifest
+    # -------------------------
+
+    def manifest(self) -> Dict[str, Any]:
+        try:
+            return json.loads((self.directory / _MANIFEST_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"job_id": self.job_id, "stages": []}
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        staging = self.directory / f".{_MANIFEST_FILE}.{uuid.uuid4().hex[:8]}"
+        staging.write_text(json.dumps(manifest, indent=2, default=str), encoding="utf-8")
+        os.replace(staging, self.directory / _MANIFEST_FILE)
+
+    def completed_stages(self) -> List[str]:
+        return [entry["stage"] for entry in self.manifest()["stages"]]
+
+    def last_completed(self) -> Optional[str]:
+        stages = self.completed_stages()
+        return stages[-1] if stages else None
+
+    def is_completed(self, stage: str) -> bool:
+        return stage in self.completed_stages()
+
+    def get(self, stage: str) -> Optional[StageCheckpoint]:
+        for entry in self.manifest()["stages"]:
+            if entry["stage"] == stage:
+                return StageCheckpoint(self.directory / _safe(stage), entry)
+        return None
+
+    # -------------------------
+    # Schreiben
+    # -------------------------
+
+    def save(
+        self,
+        stage: str,
+        files: Optional[Dict[str, Path]] = None,
+        objects: Optional[Dict[str, Any]] = None,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> StageCheckpoint:
+        """
+        Stage als abgeschlossen sichern (Artefakte zuerst, Manifest zuletzt – ein Abbruch
+        dazwischen hinterlässt keine halbe Stage im Manifest).
+
+        Args:
+            files: Name → vorhandene Datei, die übernommen wird
+            objects: Name → Python-Objekt, das per pickle gesichert wird
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        target = self.directory / _safe(stage)
+        staging = self.directory / f".staging_{_safe(stage)}_{uuid.uuid4().hex[:8]}"
+        try:
+            if files:
+                (staging / "files").mkdir(parents=True)
+                for name, source in files.items():
+                    _link_or_copy(str(source), str(staging / "files" / name))
+            if objects:
+                (staging / "objects").mkdir(parents=True)
+                for name, value in objects.items():
+                    with open(staging / "objects" / f"{_safe(name)}.pkl", "wb") as fh:
+                        pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            staging.mkdir(parents=True, exist_ok=True)
+            shutil.rmtree(target, ignore_errors=True)
+            staging.rename(target)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        entry = {
+            "stage": stage,
+            "completed_at": datetime.now().isoformat(),
+            "files": sorted(files or {}),
+            "objects": sorted(objects or {}),
+            "meta": dict(meta or {}),
+        }
+        manifest = self.manifest()
+        manifest["stages"] = [e for e in manifest["stages"] if e["stage"] != stage] + [entry]
+        self._write_manifest(manifest)
+        return StageCheckpoint(target, entry)
+
+    def seed_from(self, source_job_id: str) -> List[str]:
+        """Checkpoints eines früheren Jobs übernehmen (Hardlinks). Liefert die übernommenen Stages."""
+        source = JobCheckpoints(source_job_id, self.directory.parent)
+        manifest = source.manifest()
+        if not manifest["stages"]:
+            return []
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for entry in manifest["stages"]:
+            stage_dir = source.directory / _safe(entry["stage"])
+            target = self.directory / _safe(entry["stage"])
+            if stage_dir.is_dir() and not target.exists():
+                shutil.copytree(stage_dir, target, copy_function=_link_or_copy)
+        self._write_manifest({
+            "job_id": self.job_id,
+            "resumed_from": source_job_id,
+            "stages": manifest["stages"],
+        })
+        return [entry["stage"] for entry in manifest["stages"]]
+
+    def remove(self) -> None:
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def cleanup(keep: Callable[[str], bool], root: Optional[Path] = None) -> int:
+    """Checkpoints aller Jobs entfernen, für die `keep(job_id)` False liefert. Liefert Anzahl."""
+    root = Path(root) if root is not None else ProjectPaths.runner_checkpoints_directory()
+    if not root.exists():
+        return 0
+    removed = 0
+    for job_dir in root.iterdir():
+        if not job_dir.is_dir() or keep(job_dir.name):
+            continue
+        shutil.rmtree(job_dir, ignore_errors=True)
+        removed += 1
+    return removed
+
+
+# -------------------------
+# Job-Kontext
+# -------------------------
+
+_active: Optional[JobCheckpoints] = None
+
+
+@contextmanager
+def activate(job_id: Optional[str], resume_from: Optional[str] = None) -> Iterator[Optional[JobCheckpoints]]:
+    """Checkpoints des laufenden Jobs bereitstellen (ohne Job-ID: keine Checkpoints)."""
+    global _active
+    if not job_id:
+        yield None
+        return
+    checkpoints = JobCheckpoints(job_id)
+    if resume_from and resume_from != job_id and not checkpoints.completed_stages():
+        checkpoints.seed_from(resume_from)
+    previous, _active = _active, checkpoints
+    try:
+        yield checkpoints
+    finally:
+        _active = previous
+
+
+def current() -> Optional[JobCheckpoints]:
+    """Checkpoints des laufenden Jobs oder None (Pipeline läuft außerhalb des Runners)."""
+    return _active
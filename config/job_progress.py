@@ -0,0 +1,214 @@
+"""
+Job Progress - Strukturierter Fortschrittskanal zwischen Pipeline-Prozess und Runner
+
+Neben stdout (reines Logging) melden Pipelines strukturierte Events:
+Stage-Start/-Ende, Prozent, Zeilenzahlen, Metriken, Fehler.
+
+Transport:
+- Subprozess: Pipe-Deskriptor aus `RUNNER_PROGRESS_FD`; Frames = 4-Byte-Länge (big endian)
+  + JSON-Array von Events
+- Warm-Worker: der Worker setzt per `configure()` eine Senke, die über seine Runner-Verbindung sendet
+
+Events werden gepuffert und gebündelt verschickt (alle `FLUSH_INTERVAL` Sekunden,
+ab `FLUSH_EVENTS` Events sowie bei Stage-Ende/Fehler). Ohne Kanal sind alle Aufrufe No-ops,
+BL-Module können den Reporter also bedingungslos verwenden:
+
+    from config.job_progress import reporter
+    progress = reporter()
+    progress.plan(["load", "features", "training", "backtest", "write"])
+    with progress.stage("training"):
+        progress.update(percent=40)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+ENV_PROGRESS_FD = "RUNNER_PROGRESS_FD"
+FLUSH_INTERVAL = 0.5
+FLUSH_EVENTS = 50
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+
+_HEADER = struct.Struct(">I")
+
+
+def encode_frame(events: List[Dict[str, Any]]) -> bytes:
+    payload = json.dumps(events, default=str).encode("utf-8")
+    return _HEADER.pack(len(payload)) + payload
+
+
+class FrameReader:
+    """Liest Frames aus einem Deskriptor bis EOF (Runner-Seite)."""
+
+    def __init__(self, fd: int):
+        self._file = os.fdopen(fd, "rb", buffering=0)
+
+    def __iter__(self) -> Iterator[List[Dict[str, Any]]]:
+        try:
+            while True:
+                header = self._read_exact(_HEADER.size)
+                if header is None:
+                    return
+                (length,) = _HEADER.unpack(header)
+                if length > MAX_FRAME_BYTES:
+                    raise ValueError(f"Progress frame too large: {length} bytes")
+                payload = self._read_exact(length)
+                if payload is None:
+                    return
+                yield json.loads(payload.decode("utf-8"))
+        finally:
+            self._file.close()
+
+    def _read_exact(self, size: int) -> Optional[bytes]:
+        chunks = []
+        remaining = size
+        while remaining:
+            chunk = self._file.read(remaining)
+            if not chunk:
+                return None
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+
+async def read_frames_async(reader) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Frames aus einem `asyncio.StreamReader` lesen bis EOF (Runner-Seite, Process Supervisor)."""
+    while True:
+        try:
+            header = await reader.readexactly(_HEADER.size)
+            (length,) = _HEADER.unpack(header)
+            if length > MAX_FRAME_BYTES:
+                raise ValueError(f"Progress frame too large: {length} bytes")
+            payload = await reader.readexactly(length)
+        except asyncio.IncompleteReadError:
+            return
+        yield json.loads(payload.decode("utf-8"))
+
+
+class ProgressReporter:
+    """Pipeline-Seite: Events puffern und gebündelt an die Senke geben."""
+
+    def __init__(self, sink: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        self._sink = sink
+        self._buffer: List[Dict[str, Any]] = []
+        self._last_flush = time.monotonic()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self._sink is not None
+
+    def configure(self, sink: Optional[Callable[[List[Dict[str, Any]]], None]]) -> None:
+        self.flush()
+        self._sink = sink
+
+    # -------------------------
+    # Events
+    # -------------------------
+
+    def plan(self, stages: List[str]) -> None:
+        """Erwartete Stages in Reihenfolge (Grundlage für Gesamtfortschritt/ETA)."""
+        self._emit({"type": "plan", "stages": list(stages)}, flush=True)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        started = time.time()
+        self._emit({"type": "stage_start", "stage": name}, flush=True)
+        try:
+            yield
+        except BaseException as e:
+            self._emit({"type": "stage_end", "stage": name, "status": "failed", "duration": time.time() - started,
+                        "message": str(e)}, flush=True)
+            raise
+        self._emit({"type": "stage_end", "stage": name, "status": "succeeded", "duration": time.time() - started},
+                   flush=True)
+
+    def skip(self, name: str, reason: str = "checkpoint") -> None:
+        """Stage übersprungen (z. B. aus Checkpoint wiederhergestellt) – zählt als erledigt."""
+        self._emit({"type": "stage_end", "stage": name, "status": "skipped", "message": reason}, flush=True)
+
+    def update(
+        self,
+        percent: Optional[float] = None,
+        done: Optional[int] = None,
+        total: Optional[int] = None,
+        stage: Optional[str] = None,
+    ) -> None:
+        """Fortschritt der aktuellen Stage (Prozent oder done/total)."""
+        if percent is None and done is not None and total:
+            percent = 100.0 * done / total
+        self._emit({"type": "progress", "stage": stage, "percent": percent, "done": done, "total": total})
+
+    def rows(self, count: int, name: str = "rows") -> None:
+        self._emit({"type": "rows", "name": name, "count": int(count)})
+
+    def metric(self, name: str, value: Any) -> None:
+        self._emit({"type": "metric", "name": name, "value": value})
+
+    def error(self, message: str) -> None:
+        self._emit({"type": "error", "message": message}, flush=True)
+
+    # -------------------------
+    # Puffer
+    # -------------------------
+
+    def _emit(self, event: Dict[str, Any], flush: bool = False) -> None:
+        if self._sink is None:
+            return
+        event["ts"] = time.time()
+        with self._lock:
+            self._buffer.append(event)
+            due = (
+                flush
+                or len(self._buffer) >= FLUSH_EVENTS
+                or time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+            )
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            events, self._buffer = self._buffer, []
+            self._last_flush = time.monotonic()
+            sink = self._sink
+        if events and sink is not None:
+            try:
+                sink(events)
+            except OSError:
+                # Runner nicht mehr erreichbar → Fortschritt ist optional, Pipeline läuft weiter
+                self._sink = None
+
+
+def _fd_sink(fd: int) -> Callable[[List[Dict[str, Any]]], None]:
+    def write(events: List[Dict[str, Any]]) -> None:
+        os.write(fd, encode_frame(events))
+
+    return write
+
+
+_reporter: Optional[ProgressReporter] = None
+_reporter_lock = threading.Lock()
+
+
+def reporter() -> ProgressReporter:
+    """Prozessweiter Reporter (Subprozess: aus `RUNNER_PROGRESS_FD` konfiguriert)."""
+    global _reporter
+    with _reporter_lock:
+        if _reporter is None:
+            fd = os.environ.get(ENV_PROGRESS_FD)
+            _reporter = ProgressReporter(_fd_sink(int(fd)) if fd else None)
+        return _reporter
+
+
+def configure(sink: Optional[Callable[[List[Dict[str, Any]]], None]]) -> ProgressReporter:
+    """Senke explizit setzen (Warm-Worker je Job)."""
+    progress = reporter()
+    progress.configure(sink)
+    return progress
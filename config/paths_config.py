@@ -72,6 +72,10 @@ class ProjectPaths:
     def bl_cox_directory() -> Path:
         return ProjectPaths.project_root() / "bl-cox"
 
+    @staticmethod
+    def bl_counterfactuals_directory() -> Path:
+        return ProjectPaths.project_root() / "bl-counterfactuals"
+
     @staticmethod
     def feature_mapping_file() -> Path:
         return ProjectPaths._config_file("feature_mapping.json")
@@ -155,6 +159,72 @@ class ProjectPaths:
     def outbox_counterfactuals_directory() -> Path:
         return ProjectPaths.outbox_directory() / "counterfactuals"
 
+    @staticmethod
+    def feature_cache_directory() -> Path:
+        # Memory-mappable Feature-Matrizen (geteilt von Churn/Cox/CF)
+        env_cache = os.environ.get("FEATURE_CACHE_DIR")
+        if env_cache:
+            return Path(env_cache)
+        return ProjectPaths.dynamic_system_outputs_directory() / "feature_cache"
+
+    @staticmethod
+    def json_database_file() -> Path:
+        # JSON-DB-Datei (wie im Management Studio per CHURN_DB_PATH überschreibbar)
+        env_db = os.environ.get("CHURN_DB_PATH")
+        if env_db:
+            return Path(env_db)
+        return ProjectPaths.dynamic_system_outputs_directory() / "churn_database.json"
+
+    @staticmethod
+    def ingestion_manifest_file() -> Path:
+        # Stat-Signaturen und Inhalts-Hashes ingestierter Input-CSVs (schnelle Änderungserkennung)
+        env_manifest = os.environ.get("INGESTION_MANIFEST_FILE")
+        if env_manifest:
+            return Path(env_manifest)
+        return ProjectPaths.dynamic_system_outputs_directory() / "ingestion_manifest.json"
+
+    @staticmethod
+    def artifact_store_directory() -> Path:
+        # Inhaltsadressierte Blobs (Stage0/Outbox/Modelle als Hardlinks darauf)
+        env_store = os.environ.get("ARTIFACT_STORE_DIR")
+        if env_store:
+            return Path(env_store)
+        return ProjectPaths.dynamic_system_outputs_directory() / "artifact_store"
+
+    # -------------------------
+    # Runner-Service
+    # -------------------------
+    @staticmethod
+    def runner_logs_directory() -> Path:
+        # ENV-Override für abweichende Log-Ablage (z. B. separates Volume)
+        env_logs = os.environ.get("RUNNER_LOG_DIR")
+        if env_logs:
+            return Path(env_logs)
+        return ProjectPaths.dynamic_system_outputs_directory() / "runner_logs"
+
+    @staticmethod
+    def runner_job_queue_file() -> Path:
+        env_queue = os.environ.get("RUNNER_QUEUE_DB")
+        if env_queue:
+            return Path(env_queue)
+        return ProjectPaths.dynamic_system_outputs_directory() / "runner_jobs.sqlite3"
+
+    @staticmethod
+    def runner_run_cache_directory() -> Path:
+        # Snapshots erfolgreicher Läufe je Fingerprint (Wiederverwendung identischer Runs)
+        env_cache = os.environ.get("RUNNER_RUN_CACHE_DIR")
+        if env_cache:
+            return Path(env_cache)
+        return ProjectPaths.dynamic_system_outputs_directory() / "run_cache"
+
+    @staticmethod
+    def runner_checkpoints_directory() -> Path:
+        # Stage-Checkpoints je Job (Wiederaufnahme nach Abbruch)
+        env_checkpoints = os.environ.get("RUNNER_CHECKPOINT_DIR")
+        if env_checkpoints:
+            return Path(env_checkpoints)
+        return ProjectPaths.dynamic_system_outputs_directory() / "runner_checkpoints"
+
     # -------------------------
     # Utilities
     # -------------------------
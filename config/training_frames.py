@@ -0,0 +1,178 @@
+"""
+Training Frames - Ein rawdata-Frame für alle Experimente eines Churn-Jobs
+
+Experiment-Grids variieren meist nur die Perioden (`training_from/to`, `backtest_from/to`) über
+dieselben `id_files`. Der Runner lädt rawdata dieser Dateien einmal – Fenster: Vereinigung der
+Perioden aller Experimente des Jobs – und stellt je Experiment nur dessen Periodenausschnitt bereit.
+BL-Module greifen über `current()` darauf zu, statt rawdata selbst zu laden:
+
+    frame = current()
+    if frame is None:
+        frame = load_rawdata(...)   # außerhalb des Runners bzw. ohne geteilten Frame
+
+Der Frame liegt im Feature-Cache (`config/feature_cache.py`): numerische Spalten als gemappte
+float64-Matrix, `Kunde`/`I_TIMEBASE` als Index. Schlüssel: Stage0-Hashes der `id_files`,
+Periodenfenster und `FEATURE_SET` – Wiederholungsläufe lesen ihn ohne rawdata-Aufbereitung und
+ohne Kopie. Textspalten (`category`/`string`) sind nicht Teil des Frames.
+
+Testmodus: bei aktiver Kundenstichprobe (`customer_sampling.active_sample()`) enthält der Frame nur
+die Stichprobe – gleiche Auswahl wie `select_customers` (churn-stratifiziert, falls `I_Alive` vorliegt).
+"""
+
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from config import customer_sampling
+from config.compact_dtypes import to_frame
+from config.feature_cache import FeatureMatrixCache
+
+CUSTOMER_COLUMN = "Kunde"
+TIMEBASE_COLUMN = "I_TIMEBASE"
+INDEX_COLUMNS = (CUSTOMER_COLUMN, TIMEBASE_COLUMN)
+
+# Feature-Set-Bestandteil des Cache-Schlüssels; bei Änderungen am Aufbau des Frames hochzählen
+FEATURE_SET = "rawdata-numeric"
+FRAME_VERSION = "1"
+
+_ALIVE_COLUMNS = ("I_Alive", "I_ALIVE")
+
+
+def to_timebase(value: Any) -> Optional[int]:
+    """Periode (z. B. 202401, "2024-01", "2024-01-31") → YYYYMM; None, wenn nicht gesetzt."""
+    digits = "".join(ch for ch in str(value or "") if ch.isdigit())
+    return int(digits[:6]) if len(digits) >= 6 else None
+
+
+def experiment_window(experiment: Mapping[str, Any]) -> Tuple[Optional[int], Optional[int]]:
+    """Benötigte Perioden eines Experiments: `training_from` bis `backtest_to` (sonst `training_to`)."""
+    upper = to_timebase(experiment.get("backtest_to")) or to_timebase(experiment.get("training_to"))
+    return to_timebase(experiment.get("training_from")), upper
+
+
+def union_window(experiments: Iterable[Mapping[str, Any]]) -> Tuple[Optional[int], Optional[int]]:
+    """Vereinigung der Perioden; eine offene Grenze eines Experiments bleibt offen."""
+    lowers, uppers = [], []
+    for experiment in experiments:
+        lower, upper = experiment_window(experiment)
+        lowers.append(lower)
+        uppers.append(upper)
+    lower = None if not lowers or None in lowers else min(lowers)
+    upper = None if not uppers or None in uppers else max(uppers)
+    return lower, upper
+
+
+class SharedTrainingFrame:
+    """rawdata-Frame nach `I_TIMEBASE` sortiert; Periodenausschnitte ohne erneutes Filtern."""
+
+    def __init__(self, frame, key: Optional[str] = None):
+        if TIMEBASE_COLUMN in frame.columns and not frame[TIMEBASE_COLUMN].is_monotonic_increasing:
+            frame = frame.sort_values(TIMEBASE_COLUMN, kind="stable").reset_index(drop=True)
+        self.frame = frame
+        self.key = key
+        self._timebases = (
+            frame[TIMEBASE_COLUMN].to_numpy() if TIMEBASE_COLUMN in frame.columns else np.empty(0)
+        )
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def slice(self, period_from: Optional[int] = None, period_to: Optional[int] = None):
+        """Zeilen mit `period_from <= I_TIMEBASE <= period_to` (zusammenhängender Ausschnitt)."""
+        start = 0 if period_from is None else int(np.searchsorted(self._timebases, period_from, side="left"))
+        stop = len(self.frame) if period_to is None else int(np.searchsorted(self._timebases, period_to, side="right"))
+        return self.frame.iloc[start:stop]
+
+    def for_experiment(self, experiment: Mapping[str, Any]):
+        return self.slice(*experiment_window(experiment))
+
+
+def _numeric_frame(records: List[Dict[str, Any]], schema: Dict[str, Dict[str, Any]]):
+    frame = to_frame(records, schema)
+    numeric = [
+        name for name in frame.columns
+        if name not in INDEX_COLUMNS and name != "id_files" and frame[name].dtype.kind in "biuf"
+    ]
+    index = [name for name in INDEX_COLUMNS if name in frame.columns]
+    frame = frame[index + numeric].astype({name: np.float64 for name in numeric})
+    if TIMEBASE_COLUMN in frame.columns:
+        # Bereits sortiert ablegen → gemappter Frame braucht keine sortierte Kopie
+        frame = frame.sort_values(TIMEBASE_COLUMN, kind="stable").reset_index(drop=True)
+    return frame
+
+
+def _apply_sample(frame):
+    sample = customer_sampling.active_sample()
+    if sample is None or CUSTOMER_COLUMN not in frame.columns:
+        return frame
+    fraction, seed = sample
+    alive = next((name for name in _ALIVE_COLUMNS if name in frame.columns), None)
+    if alive is not None:
+        labels = frame.groupby(CUSTOMER_COLUMN)[alive].min()
+        selected = customer_sampling.select_customers(labels.index.to_numpy(), (labels == 0).to_numpy(), fraction, seed)
+        mask = frame[CUSTOMER_COLUMN].isin(selected).to_numpy()
+    else:
+        mask = customer_sampling.in_sample(frame[CUSTOMER_COLUMN].to_numpy(), fraction, seed)
+    return frame[mask].reset_index(drop=True)
+
+
+def load_shared_frame(
+    rawdata: Mapping[str, Any],
+    id_files: Iterable[Any],
+    experiments: Iterable[Mapping[str, Any]],
+    input_hashes: Optional[Mapping[str, Optional[str]]] = None,
+    cache: Optional[FeatureMatrixCache] = None,
+) -> SharedTrainingFrame:
+    """
+    rawdata der `id_files` im Periodenfenster der Experimente einmal laden.
+
+    Mit vollständigen `input_hashes` (id_files → Stage0-Hash) über den Feature-Cache, sonst direkt
+    aus den Records (z. B. nicht auflösbare Eingabedateien).
+    """
+    files = {str(file_id) for file_id in id_files}
+    lower, upper = union_window(experiments)
+
+    def build():
+        records = [
+            record for record in rawdata.get("records") or []
+            if str(record.get("id_files")) in files
+            and (lower is None or (to_timebase(record.get(TIMEBASE_COLUMN)) or 0) >= lower)
+            and (upper is None or (to_timebase(record.get(TIMEBASE_COLUMN)) or 0) <= upper)
+        ]
+        return _numeric_frame(records, rawdata.get("schema") or {})
+
+    hashes = dict(input_hashes or {})
+    if not files or any(hashes.get(file_id) is None for file_id in files):
+        return SharedTrainingFrame(_apply_sample(build()))
+    cache = cache or FeatureMatrixCache()
+    key = cache.make_key(
+        (hashes[file_id] for file_id in files), lower, upper, FEATURE_SET, version=FRAME_VERSION
+    )
+    cached = cache.get_or_build(key, build, index_columns=INDEX_COLUMNS, meta={"id_files": sorted(files)})
+    return SharedTrainingFrame(_apply_sample(cached.to_frame()), key=key)
+
+
+# -------------------------
+# Job-Kontext
+# -------------------------
+
+_active = None
+
+
+@contextmanager
+def activate(frame) -> Iterator[None]:
+    """Periodenausschnitt für das laufende Experiment bereitstellen (None: BL lädt selbst)."""
+    global _active
+    previous, _active = _active, frame
+    try:
+        yield
+    finally:
+        _active = previous
+
+
+def current():
+    """rawdata-Ausschnitt des laufenden Experiments oder None (kein geteilter Frame)."""
+    return _active
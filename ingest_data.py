@@ -2,11 +2,52 @@
 """
 Data Ingestion Script für Churn Suite
 Verarbeitet CSV-Dateien: CSV → Stage0 → Outbox → rawdata
+
+Stage0-Erzeuger: standardmäßig der Streaming-Pfad (`stage0_streaming.py`, Blockgröße
+`--chunk-rows` bzw. ENV `STAGE0_CHUNK_ROWS`, sonst 50 000 Zeilen) – nur sein Format kann der
+rawdata-Delta-Import lesen. `--step0` nutzt stattdessen Step0 mit Union-Import.
+
+Parallelbetrieb: `--jobs N` analysiert die CSV-Dateien in N Prozessen; die Dateien
+sind bis zum abschließenden rawdata-Import unabhängig. JSON-DB-Registrierungen werden im
+Hauptprozess gesammelt und gebündelt angewendet, gespeichert wird genau einmal am Ende.
+
+    python ingest_data.py              # sequentiell, Streaming-Stage0 + Delta-Import
+    python ingest_data.py --jobs 4     # 4 Prozesse
+    python ingest_data.py --jobs 0     # ein Prozess je CPU-Kern
+    python ingest_data.py --chunk-rows 20000   # kleinere Blöcke (weniger Spitzenspeicher)
+    python ingest_data.py --profile approx     # approximatives Spaltenprofil (sehr große CSVs)
+    python ingest_data.py --step0              # Step0-Analyse, rawdata per Union-Import
+
+Änderungserkennung: ein Manifest (`ingestion_manifest.py`) hält Größe, mtime, Inode und
+Inhalts-Hash jeder ingestierten Datei. Dateien mit unveränderter Stat-Signatur werden weder
+gehasht noch analysiert; ist nichts zu tun, endet der Lauf ohne Analyse und ohne Speichern.
+`--force` ignoriert das Manifest, `--hash-mode sampled` hasht große Dateien stichprobenartig.
+Der Manifest-Stand wird gegen die JSON-DB geprüft: fehlen Registrierung oder rawdata-Partition
+einer Datei (z. B. nach `make cleanDB`), wird sie erneut ingestiert; ein geänderter Stage0-Modus
+(`--chunk-rows`, `--profile`) erzwingt die Neu-Analyse. Geladen wird die DB dafür nur, wenn
+Dateien anstehen oder sich die DB-Datei (Größe/mtime, Marke im Manifest) seit dem letzten
+Abgleich geändert hat – ein Lauf ohne Änderungen liest nur das Manifest.
+
+rawdata-Import: inkrementell je `id_files`-Partition (`rawdata_delta.py`) – nur neue, geänderte
+und entfernte Input-Dateien werden angefasst. `--full-import` baut rawdata vollständig neu auf
+(Streaming: aus allen Partitionen; `--step0`: Union-Import, der bei `--step0` immer läuft).
+`--dedup newest` hält je (Kunde, I_TIMEBASE) nur die Zeile der zuletzt registrierten Datei.
+
+Watch-Modus: `--watch` pollt das Input-Verzeichnis und ingestiert neue/geänderte CSVs, sobald
+sie `--settle-seconds` lang unverändert sind (Entprellung halb geschriebener Dateien).
+
+    python ingest_data.py --watch --jobs 2
 """
 
+import argparse
+import signal
 import sys
 import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 # Projekt-Root ermitteln
 repo_root = Path(__file__).resolve().parent
@@ -21,97 +62,594 @@ sys.path.extend([
 # Outbox-Root setzen (korrigiert für tatsächlichen Pfad)
 os.environ['OUTBOX_ROOT'] = str(repo_root / 'dynamic_system_outputs' / 'outbox')
 
-# Ausgabeverzeichnisse erstellen
-(repo_root / 'dynamic_system_outputs' / 'stage0_cache').mkdir(parents=True, exist_ok=True)
-(repo_root / 'dynamic_system_outputs' / 'outbox').mkdir(parents=True, exist_ok=True)
+_service = None
+
 
-try:
+def ingest_file(
+    csv_path: str,
+    reprocess_only: bool,
+    chunk_rows: Optional[int] = None,
+    hash_mode: str = "full",
+    profile: Optional[str] = None,
+    force_reanalysis: bool = False,
+) -> Tuple[str, Optional[str], Dict[str, Any]]:
+    """
+    Step0-Analyse + Outbox-Export einer CSV (läuft im Worker-Prozess).
+
+    Registriert nichts in der JSON-DB – das übernimmt der Hauptprozess gebündelt.
+    Liefert (Dateiname, Stage0-Pfad, kompakte Ergebnisse).
+    """
+    global _service
     from input_ingestion import InputIngestionService
+    from ingestion_manifest import content_hash
+
+    if _service is None:
+        # Eine Service-Instanz je Worker-Prozess
+        _service = InputIngestionService()
+    stage0_path, results = _service.ingest_csv_to_stage0(
+        csv_path,
+        force_reanalysis=force_reanalysis,
+        register_in_json_db=False,
+        export_to_outbox=True,
+        chunk_rows=chunk_rows,
+        profile=profile,
+    )
+    # Nur das Nötige zurück über die Prozessgrenze (Step0-Ergebnisse können groß sein)
+    summary = {
+        key: results.get(key)
+        for key in ("error", "warnings", "outbox_path")
+        if results.get(key)
+    }
+    summary["reprocess_only"] = reprocess_only
+    if (results.get("profile") or {}).get("mode") == "approx":
+        summary["profile"] = results["profile"]
+    if stage0_path:
+        # Inhalts-Hash fürs Manifest im Worker (liest die Datei parallel zu anderen)
+        summary["content_hash"] = content_hash(Path(csv_path), hash_mode)
+    return Path(csv_path).name, str(stage0_path) if stage0_path else None, summary
+
+
+def run_ingestion(
+    all_csvs: List[Path],
+    registered_input: set,
+    jobs: int,
+    chunk_rows: Optional[int] = None,
+    hash_mode: str = "full",
+    pool: Optional[Executor] = None,
+    profile: Optional[str] = None,
+    reanalyze: Optional[set] = None,
+) -> List[Tuple[str, Optional[str], Dict[str, Any]]]:
+    """
+    Alle CSVs verarbeiten (sequentiell oder im Prozess-Pool), Ergebnisse in Eingabereihenfolge.
+
+    `pool`: bestehender Pool (Watch-Modus, Worker bleiben warm); sonst wird bei `jobs > 1`
+    ein Pool für diesen Lauf erzeugt. `reanalyze`: Dateinamen, deren Stage0 trotz Cache neu
+    erzeugt wird (z. B. geänderter Stage0-Modus).
+    """
+    reanalyze = reanalyze or set()
+    tasks = [(str(csv_path), csv_path.name in registered_input) for csv_path in all_csvs]
+    outcomes: Dict[str, Tuple[str, Optional[str], Dict[str, Any]]] = {}
+
+    def report(outcome: Tuple[str, Optional[str], Dict[str, Any]]) -> None:
+        file_name, stage0_path, summary = outcome
+        if summary.get("reprocess_only"):
+            print(f'Already registered: {file_name}')
+        else:
+            print(f'Processed: {file_name}')
+        if stage0_path:
+            print(f'  → Stage0: {stage0_path}')
+            print(f'  → Outbox: {summary.get("outbox_path")}')
+            profile = summary.get("profile")
+            if profile:
+                print(
+                    f'  → Approx. profile: {profile.get("reservoir_rows")} sampled rows, '
+                    f'distinct ±{profile.get("distinct_relative_std", 0):.1%}, '
+                    f'quantile rank error ≤ {profile.get("quantile_rank_error_max", 0):.2%}'
+                )
+        else:
+            marker = '⚠️ Could not reprocess' if summary.get("reprocess_only") else '❌ Error processing'
+            print(f'  {marker} {file_name}: {summary.get("error")}')
+        for warning in summary.get("warnings") or []:
+            print(f'  ⚠️ {warning}')
+
+    if pool is None and (jobs <= 1 or len(tasks) <= 1):
+        for csv_path, reprocess_only in tasks:
+            try:
+                outcome = ingest_file(
+                    csv_path, reprocess_only, chunk_rows, hash_mode, profile, Path(csv_path).name in reanalyze
+                )
+            except Exception as e:
+                outcome = (Path(csv_path).name, None, {"error": str(e), "reprocess_only": reprocess_only})
+            outcomes[csv_path] = outcome
+            report(outcome)
+    else:
+        if tasks:
+            print(f'Processing {len(tasks)} files with {jobs} worker processes...')
+        with nullcontext(pool) if pool is not None else ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {executor.submit(ingest_file, csv_path, reprocess_only, chunk_rows, hash_mode, profile,
+                                       Path(csv_path).name in reanalyze):
+                       (csv_path, reprocess_only)
+                       for csv_path, reprocess_only in tasks}
+            for future in as_completed(futures):
+                csv_path, reprocess_only = futures[future]
+                try:
+                    outcome = future.result()
+                except Exception as e:
+                    outcome = (Path(csv_path).name, None, {"error": str(e), "reprocess_only": reprocess_only})
+                outcomes[csv_path] = outcome
+                report(outcome)
+
+    return [outcomes[csv_path] for csv_path, _ in tasks]
+
+
+def register_files(batch, outcomes: List[Tuple[str, Optional[str], Dict[str, Any]]], stage0_source: str) -> int:
+    """Neue CSV- und Stage0-Dateien gebündelt in der Files-Tabelle registrieren (ohne save)."""
+    count = 0
+    for file_name, stage0_path, summary in outcomes:
+        if not stage0_path or summary.get("reprocess_only"):
+            continue
+        for name, source_type in ((file_name, "input_data"), (Path(stage0_path).name, stage0_source)):
+            try:
+                if batch.register(name, source_type):
+                    count += 1
+            except Exception as e:
+                print(f'  ⚠️ JSON-DB registration failed for {name}: {e}')
+    return count
+
+
+def current_partitions(db, all_csvs: List[Path], stage0_names: Dict[str, str], stage0_dir: Path) -> Dict[Any, Path]:
+    """id_files → Stage0-Datei (Outbox) aller aktuell vorhandenen, registrierten Input-CSVs."""
+    files_tbl = (db.data.get('tables', {}).get('files', {}).get('records', []) or [])
+    file_ids = {
+        (r.get('file_name') or ''): r.get('id', r.get('file_id'))
+        for r in files_tbl
+        if (r.get('source_type') or '').lower() == 'input_data'
+    }
+    return {
+        file_ids[p.name]: stage0_dir / stage0_names[p.name]
+        for p in all_csvs
+        if file_ids.get(p.name) is not None and stage0_names.get(p.name)
+    }
+
+
+def open_database():
+    """
+    JSON-DB-Instanz mit aktuellem Stand.
+
+    `ChurnJSONDatabase` ist ein Singleton; der Watch-Modus hält die Instanz über viele Batches →
+    Änderungen anderer Prozesse (Runner, Management Studio) vor jeder Verwendung nachladen,
+    damit `save()` sie nicht mit einem veralteten Stand überschreibt.
+    """
     from bl.json_database.churn_json_database import ChurnJSONDatabase
-    from config.paths_config import ProjectPaths
-    
-    print("Starting data ingestion (CSV → Stage0 → Outbox → rawdata)...")
-    
-    # Services initialisieren
-    service = InputIngestionService()
+
     db = ChurnJSONDatabase()
-    
+    try:
+        db.maybe_reload()
+    except Exception as e:
+        print(f'⚠️ Warning: Could not reload JSON database: {e}')
+    return db
+
+
+def database_file(db=None) -> Path:
+    """Pfad der JSON-DB-Datei (Zustandsmarke im Manifest); ohne Instanz der konfigurierte Standard."""
+    from config.paths_config import ProjectPaths
+
+    return Path(getattr(db, 'db_path', None) or ProjectPaths.json_database_file())
+
+
+def missing_in_database(db, csv_paths: List[Path], manifest) -> List[Path]:
+    """
+    Laut Manifest ingestierte CSVs, deren Stand in der JSON-DB fehlt: keine `input_data`-Registrierung
+    oder keine passende rawdata-Partition (z. B. nach `make cleanDB` oder mit einer anderen DB).
+    """
+    from rawdata_delta import trusted_partitions
+
+    tables = db.data.get('tables', {})
+    rawdata = tables.get('rawdata', {}) or {}
+    partitions = trusted_partitions(rawdata)
+    files_tbl = (tables.get('files', {}).get('records', []) or [])
+    file_ids = {
+        (r.get('file_name') or ''): r.get('id', r.get('file_id'))
+        for r in files_tbl
+        if (r.get('source_type') or '').lower() == 'input_data'
+    }
+    missing = []
+    for p in csv_paths:
+        entry = manifest.entries.get(p.name)
+        if entry is None:
+            continue
+        file_id = file_ids.get(p.name)
+        if file_id is None:
+            missing.append(p)
+        elif partitions is not None:
+            if partitions.get(str(file_id)) != entry.get('stage0_file'):
+                missing.append(p)
+        elif not rawdata.get('records'):
+            # Ohne Partitionsstand (Union-Import): zumindest rawdata muss befüllt sein
+            missing.append(p)
+    return missing
+
+
+def update_rawdata(
+    db, partitions: Dict[Any, Path], full_import: bool, dedup: Optional[str] = None, mode: str = "streaming"
+) -> None:
+    """
+    rawdata abgleichen: Streaming-Stage0 per Delta-Import (`full_import` → Neuaufbau aus allen
+    Partitionen), Step0-Stage0 per Union-Import (der Delta-Import liest das Step0-Format nicht).
+    """
+    from rawdata_delta import compact_union_records, import_rawdata_delta, invalidate_partitions
+
+    if mode == "step0":
+        if dedup:
+            # Union-Import kennt keine Dedup → nie stillschweigend doppelte Schlüssel übernehmen
+            raise ValueError("--dedup requires streaming Stage0 (the Step0 union import cannot deduplicate)")
+        # Importiere Daten aus der Outbox in die rawdata-Tabelle
+        records_added = db.import_from_outbox_stage0_union(replace=True)
+        invalidate_partitions(db)
+        print(f'✅ Imported {records_added} records into rawdata table')
+        # Kompakte Spaltentypen wie im Delta-Import (Step0-Stage0 bringt kein Schema mit)
+        types = compact_union_records(db)
+        if types:
+            print(f"  → Compact column types: {', '.join(f'{name}={kind}' for name, kind in types.items())}")
+        return
+
+    if full_import:
+        # Partitionsstand verwerfen → Delta-Import baut aus allen Stage0-Dateien neu auf
+        invalidate_partitions(db)
+    stats = import_rawdata_delta(db, partitions, dedup)
+    print(
+        f"✅ rawdata delta: {stats['rows_added']} rows added, {stats['rows_replaced']} replaced, "
+        f"{stats['rows_removed']} removed (partitions: +{stats['partitions_added']} "
+        f"~{stats['partitions_replaced']} -{stats['partitions_removed']}, "
+        f"{stats['partitions_unchanged']} unchanged)"
+    )
+    if dedup:
+        print(f"  → Dedup ({dedup} wins): {stats['rows_deduplicated']} rows dropped")
+        for file_id, entry in sorted(stats['dedup'].items()):
+            print(
+                f"    id_files {file_id}: {entry['kept']}/{entry['rows']} kept, "
+                f"{entry['duplicates']} duplicates, {entry['superseded']} superseded"
+            )
+
+
+def ingest_changes(
+    all_csvs: List[Path],
+    pending: List[Path],
+    removed: List[str],
+    manifest,
+    args: argparse.Namespace,
+    jobs: int,
+    pool: Optional[Executor] = None,
+) -> bool:
+    """
+    Geänderte/neue CSVs verarbeiten, registrieren, rawdata abgleichen und einmal speichern.
+
+    Liefert True, wenn die JSON-DB gespeichert (und das Manifest fortgeschrieben) wurde.
+    """
+    from config.paths_config import ProjectPaths
+    from stage0_streaming import stage0_directory_name, stage0_mode
+
+    mode = stage0_mode(args.chunk_rows, args.profile)
+    stage0_source = stage0_directory_name(mode)
+    outbox_stage0 = ProjectPaths.outbox_directory() / stage0_source
+
+    # Eine DB-Instanz für Registrierung, rawdata-Import und den einzigen save()
+    db = open_database()
+
     # Korrigiere Outbox-Pfad für ProjectPaths
     original_outbox = ProjectPaths.outbox_directory()
     correct_outbox = repo_root / 'dynamic_system_outputs' / 'outbox'
     print(f"Original outbox path: {original_outbox}")
     print(f"Correct outbox path: {correct_outbox}")
-    
+
     # Temporär den korrekten Pfad setzen
     import config.paths_config
     config.paths_config._outbox_directory = str(correct_outbox)
-    
-    # CSV-Dateien finden
-    csv_dir = repo_root / 'bl-input' / 'input_data'
-    all_csvs = sorted([p for p in csv_dir.glob('*.csv')])
-    
-    # Bereits registrierte Dateien ermitteln
-    files_tbl = (db.data.get('tables', {}).get('files', {}).get('records', []) or [])
-    registered_input = {
-        (r.get('file_name') or '') 
-        for r in files_tbl 
-        if (r.get('source_type') or '').lower() == 'input_data'
-    }
-    
-    print(f'Found {len(all_csvs)} CSV files')
-    print(f'Already registered: {len(registered_input)} files')
-    
-    # CSV-Dateien verarbeiten
-    for csv_path in all_csvs:
-        file_name = csv_path.name
-        if file_name not in registered_input:
-            print(f'Processing: {file_name}')
-            try:
-                stage0_path, results = service.ingest_csv_to_stage0(
-                    csv_path, 
-                    register_in_json_db=True, 
-                    export_to_outbox=True
-                )
-                print(f'  → Stage0: {stage0_path}')
-                print(f'  → Outbox: {results.get("outbox_path")}')
-            except Exception as e:
-                print(f'  ❌ Error processing {file_name}: {e}')
-        else:
-            print(f'Already registered: {file_name}')
-            # Prüfe, ob Stage0-Datei existiert
+
+    from file_registration import RegistrationBatch
+
+    # Bereits ingestierte Dateien mit anderem Stage0-Modus: Cache umgehen, Stage0 neu erzeugen
+    reanalyze = {p.name for p in pending if p.name in manifest.entries and not manifest.mode_matches(p, mode)}
+
+    # Registrierungen + rawdata als ein Batch: genau ein save() am Ende, bei Fehler keiner
+    with RegistrationBatch(db) as batch:
+        # Bereits registrierte Dateien ermitteln
+        registered_input = batch.registered_names('input_data')
+        print(f'Already registered: {len(registered_input)} files')
+
+        # Geänderte/neue CSV-Dateien verarbeiten (Step0 + Outbox), Registrierung gebündelt danach
+        outcomes = run_ingestion(
+            pending, registered_input, jobs, args.chunk_rows, args.hash_mode, pool, args.profile, reanalyze
+        )
+        registrations = register_files(batch, outcomes, stage0_source)
+        print(f'Registered {registrations} new file records')
+
+        # rawdata-Tabelle aktualisieren (Stage0 je Datei: Manifest + Ergebnisse dieses Laufs)
+        print('Updating rawdata table...')
+        rawdata_ok = False
+        try:
+            stage0_names = {name: entry.get('stage0_file') for name, entry in manifest.entries.items()}
+            stage0_names.update({
+                file_name: Path(stage0_path).name
+                for file_name, stage0_path, _ in outcomes
+                if stage0_path
+            })
+            update_rawdata(
+                db, current_partitions(db, all_csvs, stage0_names, outbox_stage0), args.full_import, args.dedup, mode
+            )
+            rawdata_ok = True
+        except Exception as e:
+            print(f'⚠️ Warning: Could not update rawdata table: {e}')
+
+    if not batch.saved:
+        print('⚠️ Warning: Database save failed')
+        return False
+    print('✅ Database saved successfully')
+    drop_legacy_stream_files(manifest, pending, outcomes)
+    # Manifest erst nach erfolgreichem Speichern fortschreiben
+    for csv_path, (_, stage0_path, summary) in zip(pending, outcomes):
+        if stage0_path:
+            manifest.record(csv_path, Path(stage0_path).name, summary.get("content_hash"), args.hash_mode, mode)
+    manifest.forget(removed)
+    if rawdata_ok and all(stage0_path for _, stage0_path, _ in outcomes):
+        # Gespeicherter DB-Stand entspricht dem Manifest → nächster Lauf muss die DB nicht laden
+        manifest.record_database(database_file(db))
+    manifest.save()
+    return True
+
+
+def drop_legacy_stream_files(manifest, pending: List[Path], outcomes: List[Tuple[str, Optional[str], Dict[str, Any]]]) -> None:
+    """
+    Streaming-Stage0 früherer Läufe aus `stage0_cache/` entfernen, sobald die Datei neu ingestiert ist.
+
+    Vor der Trennung der Verzeichnisse schrieb der Streaming-Pfad ebenfalls nach `stage0_cache/`, wo
+    Step0-Cache und Union-Import sie als Step0-Ausgabe lesen würden. Erkannt über den Manifest-Modus.
+    """
+    from config.paths_config import ProjectPaths
+    from stage0_streaming import STEP0_DIRECTORY
+
+    directories = (
+        ProjectPaths.outbox_directory() / STEP0_DIRECTORY,
+        ProjectPaths.dynamic_system_outputs_directory() / STEP0_DIRECTORY,
+    )
+    for csv_path, (_, stage0_path, _) in zip(pending, outcomes):
+        entry = manifest.entries.get(csv_path.name) or {}
+        if not stage0_path or not str(entry.get("stage0_mode", "step0")).startswith("streaming"):
+            continue
+        if Path(stage0_path).parent.name == STEP0_DIRECTORY or not entry.get("stage0_file"):
+            continue
+        for directory in directories:
+            legacy = directory / entry["stage0_file"]
             try:
-                stage0_path, results = service.ingest_csv_to_stage0(
-                    csv_path, 
-                    register_in_json_db=False,  # Nicht erneut registrieren
-                    export_to_outbox=True
-                )
-                print(f'  → Stage0: {stage0_path}')
-                print(f'  → Outbox: {results.get("outbox_path")}')
-            except Exception as e:
-                print(f'  ⚠️ Could not reprocess {file_name}: {e}')
-    
-    # rawdata-Tabelle aktualisieren
-    print('Updating rawdata table...')
+                legacy.unlink()
+                print(f'  → Removed legacy streaming Stage0 {legacy}')
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f'  ⚠️ Could not remove legacy streaming Stage0 {legacy}: {e}')
+
+
+def changed_files(
+    all_csvs: List[Path], manifest, force: bool = False, db=None, stage0_mode: Optional[str] = None
+) -> Tuple[List[Path], List[str]]:
+    """
+    (neue/geänderte CSVs laut Manifest, aus dem Input-Verzeichnis entfernte Dateinamen).
+
+    Mit `db` zählen auch Dateien, deren Stand in der JSON-DB fehlt; mit `stage0_mode` auch
+    Dateien, deren Stage0 in einem anderen Modus erzeugt wurde.
+    """
+    from config.paths_config import ProjectPaths
+    from stage0_streaming import stage0_directory_name
+
+    outbox_stage0 = ProjectPaths.outbox_directory() / stage0_directory_name(stage0_mode or "step0")
+    missing = {p.name for p in missing_in_database(db, all_csvs, manifest)} if db is not None else set()
+    pending = [
+        p for p in all_csvs
+        if force or p.name in missing or not (
+            manifest.is_unchanged(p, outbox_stage0, stage0_mode)
+            or manifest.refresh_if_same_content(p, outbox_stage0, stage0_mode)
+        )
+    ]
+    removed = sorted(set(manifest.entries) - {p.name for p in all_csvs})
+    return pending, removed
+
+
+def watch(args: argparse.Namespace, jobs: int) -> int:
+    """
+    Dauerbetrieb: Input-Verzeichnis pollen und stabile neue/geänderte CSVs ingestieren.
+
+    Jede Runde mit Änderungen wird als ein Batch verarbeitet (Step0 im wiederverwendeten
+    Prozess-Pool, ein `db.save()`). Ruhige Polls kosten nur `stat()`-Aufrufe: die JSON-DB wird
+    nur geöffnet, wenn Dateien bereit sind oder sich die DB-Datei seit dem letzten Abgleich
+    geändert hat (Marke im Manifest), und dann per `maybe_reload()` nachgeladen, damit Änderungen
+    von Runner und Management Studio nicht überschrieben werden; das Studio cached die DB selbst
+    und lädt sie ebenfalls per `maybe_reload()` nach. Laut Manifest unveränderte Dateien gelten
+    beim Start als bereits gemeldet. SIGINT/SIGTERM beenden nach dem laufenden Batch.
+    """
+    from config.paths_config import ProjectPaths
+    from ingestion_manifest import IngestionManifest
+    from ingestion_watch import StableFileTracker, is_candidate
+    from stage0_streaming import stage0_directory_name, stage0_mode
+
+    stop = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop.set())
+
+    csv_dir = ProjectPaths.input_data_directory()
+    manifest = IngestionManifest()
+    tracker = StableFileTracker(args.settle_seconds)
+    mode = stage0_mode(args.chunk_rows, args.profile)
+    if not args.force:
+        # Bereits ingestierte Dateien nicht erst entprellen und erneut prüfen
+        outbox_stage0 = ProjectPaths.outbox_directory() / stage0_directory_name(mode)
+        tracker.seed(
+            p for p in csv_dir.glob('*.csv')
+            if is_candidate(p) and manifest.is_unchanged(p, outbox_stage0, mode)
+        )
+    # Stabile Dateien, deren DB-Stand fehlte und die bereits erneut versucht wurden
+    retried: set = set()
+    print(
+        f"👀 Watching {csv_dir} (poll {args.poll_seconds}s, settle {args.settle_seconds}s, "
+        f"{jobs} worker process(es))"
+    )
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_ignore_sigint) if jobs > 1 else nullcontext() as pool:
+        while not stop.is_set():
+            all_csvs = sorted(p for p in csv_dir.glob('*.csv') if is_candidate(p))
+            ready, _ = tracker.poll(all_csvs)
+            pending: List[Path] = []
+            if ready or not manifest.database_unchanged(database_file()):
+                db = open_database()
+                # Entprellte Dateien gegen Manifest und JSON-DB prüfen (unverändert → nichts zu tun)
+                pending, _ = changed_files(ready, manifest, args.force, db, mode)
+                # Stabile, unveränderte Dateien ohne DB-Stand (z. B. nach `make cleanDB`) – je Datei ein Versuch
+                missing = missing_in_database(db, all_csvs, manifest)
+                if not missing:
+                    manifest.record_database(database_file(db))
+                retried.intersection_update(p.name for p in missing)
+                settling = set(tracker.pending()) | {p.name for p in ready}
+                stale = [p for p in missing if p.name not in settling and p.name not in retried]
+                retried.update(p.name for p in stale)
+                pending += stale
+            removed = sorted(set(manifest.entries) - {p.name for p in all_csvs})
+            if pending or removed:
+                print(f'📥 {len(pending)} new/changed, {len(removed)} removed file(s)')
+                try:
+                    saved = ingest_changes(all_csvs, pending, removed, manifest, args, jobs, pool)
+                except Exception as e:
+                    print(f'❌ Error: {e}')
+                    saved = False
+                if not saved:
+                    # Nichts veröffentlicht → beim nächsten Poll erneut versuchen
+                    tracker.forget(p.name for p in ready)
+                args.force = False  # `--force` gilt nur für den ersten Batch
+            elif manifest.dirty:
+                manifest.save()
+            stop.wait(args.poll_seconds)
+
+    print('👋 Watch mode stopped')
+    return 0
+
+
+def _ignore_sigint() -> None:
+    # Worker ignorieren Ctrl-C; der Hauptprozess beendet nach dem laufenden Batch
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="CSV → Stage0 → Outbox → rawdata")
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1,
+        help="Parallele Step0-Prozesse (0 = Anzahl CPU-Kerne, Standard: 1)",
+    )
+    parser.add_argument(
+        "--chunk-rows", type=int, default=None,
+        help="Streaming-Stage0 in Blöcken dieser Zeilenzahl (Standard: ENV STAGE0_CHUNK_ROWS bzw. 50 000; 0 = ein Block)",
+    )
+    parser.add_argument(
+        "--step0", action="store_true",
+        help="Stage0 per Step0 statt Streaming erzeugen; rawdata dann per Union-Import (ohne Delta, nicht mit --dedup)",
+    )
+    parser.add_argument(
+        "--hash-mode", choices=("full", "sampled"), default="full",
+        help="Inhalts-Hash fürs Manifest: vollständig oder Stichproben bei großen Dateien",
+    )
+    parser.add_argument(
+        "--profile", choices=("exact", "approx"), default=None,
+        help="Spaltenprofil: exakt oder approximativ (Sketches, für sehr große CSVs; Standard: ENV STAGE0_PROFILE bzw. exact)",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Manifest ignorieren und alle Dateien neu verarbeiten",
+    )
+    parser.add_argument(
+        "--full-import", action="store_true",
+        help="rawdata vollständig neu aufbauen (Streaming: aus allen Partitionen) statt Delta-Import",
+    )
+    parser.add_argument(
+        "--dedup", choices=("newest", "oldest"), default=os.environ.get("RAWDATA_DEDUP") or None,
+        help="rawdata auf (Kunde, I_TIMEBASE) deduplizieren: neueste bzw. älteste Datei gewinnt (Standard: aus, ENV RAWDATA_DEDUP)",
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="Dauerbetrieb: Input-Verzeichnis pollen und neue/geänderte CSVs automatisch ingestieren",
+    )
+    parser.add_argument(
+        "--poll-seconds", type=float, default=float(os.environ.get("INGEST_WATCH_POLL_SECONDS", "2")),
+        help="Watch: Abfrageintervall in Sekunden (Standard: 2, ENV INGEST_WATCH_POLL_SECONDS)",
+    )
+    parser.add_argument(
+        "--settle-seconds", type=float, default=float(os.environ.get("INGEST_WATCH_SETTLE_SECONDS", "5")),
+        help="Watch: Größe/mtime so lange unverändert, bevor eine Datei gilt (Standard: 5)",
+    )
+    args = parser.parse_args(argv)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    from stage0_streaming import DEFAULT_CHUNK_ROWS, ENV_CHUNK_ROWS, configured_chunk_rows, configured_profile
+
+    if args.step0:
+        if args.chunk_rows is not None or (args.profile or configured_profile()) == "approx":
+            parser.error("--step0 cannot be combined with --chunk-rows or an approx profile")
+        if args.dedup:
+            # Union-Import kennt keine Dedup → Abbruch vor jeder Analyse statt Lauf mit doppelten Schlüsseln
+            parser.error("--dedup (or RAWDATA_DEDUP) requires streaming Stage0; the Step0 union import cannot deduplicate")
+        # Step0 auch bei gesetztem STAGE0_CHUNK_ROWS (Worker-Prozesse erben die Umgebung)
+        os.environ.pop(ENV_CHUNK_ROWS, None)
+    elif args.chunk_rows is None:
+        # Standard: Streaming-Stage0 (Delta-Import liest nur dieses Format)
+        configured = configured_chunk_rows()
+        args.chunk_rows = configured if configured is not None else DEFAULT_CHUNK_ROWS
+
+    # Ausgabeverzeichnisse erstellen
+    (repo_root / 'dynamic_system_outputs' / 'stage0_cache').mkdir(parents=True, exist_ok=True)
+    (repo_root / 'dynamic_system_outputs' / 'stage0_stream').mkdir(parents=True, exist_ok=True)
+    (repo_root / 'dynamic_system_outputs' / 'outbox').mkdir(parents=True, exist_ok=True)
+
     try:
-        # Importiere Daten aus der Outbox in die rawdata-Tabelle
-        records_added = db.import_from_outbox_stage0_union(replace=True)
-        print(f'✅ Imported {records_added} records into rawdata table')
-        
-        # Datenbank speichern
-        if db.save():
-            print('✅ Database saved successfully')
-        else:
-            print('⚠️ Warning: Database save failed')
-            
+        if args.watch:
+            return watch(args, jobs)
+
+        from config.paths_config import ProjectPaths
+        from ingestion_manifest import IngestionManifest
+
+        print("Starting data ingestion (CSV → Stage0 → Outbox → rawdata)...")
+
+        # CSV-Dateien finden
+        csv_dir = ProjectPaths.input_data_directory()
+        all_csvs = sorted([p for p in csv_dir.glob('*.csv')])
+
+        from stage0_streaming import stage0_directory_name, stage0_mode
+
+        # Änderungserkennung zuerst über das Manifest (nur `stat`); die JSON-DB wird nur geladen,
+        # wenn etwas zu tun ist oder sich die DB-Datei seit dem letzten Abgleich geändert hat
+        manifest = IngestionManifest()
+        mode = stage0_mode(args.chunk_rows, args.profile)
+        pending, removed = changed_files(all_csvs, manifest, args.force, None, mode)
+        if pending or removed or not manifest.database_unchanged(database_file()):
+            db = open_database()
+            pending, removed = changed_files(all_csvs, manifest, args.force, db, mode)
+            if not pending and not removed:
+                # DB bestätigt den Manifest-Stand → Marke merken
+                manifest.record_database(database_file(db))
+        print(f'Found {len(all_csvs)} CSV files ({len(all_csvs) - len(pending)} unchanged)')
+        if not pending and not removed:
+            manifest.save()  # ggf. aktualisierte Stat-Signaturen (gleicher Inhalt) bzw. DB-Marke
+            print('✅ Nothing to ingest – all input files unchanged')
+            return 0
+
+        ingest_changes(all_csvs, pending, removed, manifest, args, jobs)
+
         print('✅ Data ingestion completed!')
+        return 0
+
+    except ImportError as e:
+        print(f'❌ Import error: {e}')
+        print('Make sure all required modules are available in the Python path.')
+        return 1
     except Exception as e:
-        print(f'⚠️ Warning: Could not update rawdata table: {e}')
-        print('✅ Data ingestion completed (without rawdata update)!')
-    
-except ImportError as e:
-    print(f'❌ Import error: {e}')
-    print('Make sure all required modules are available in the Python path.')
-    sys.exit(1)
-except Exception as e:
-    print(f'❌ Error: {e}')
-    sys.exit(1)
+        print(f'❌ Error: {e}')
+        return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,21 +7,38 @@ FastAPI Service für Pipeline-Ausführung und Log-Streaming
 import asyncio
 import json
 import logging
-import subprocess
+import os
 import sys
+import threading
 import time
+import uuid
+from collections import Counter
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 from concurrent.futures import ThreadPoolExecutor
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
 # Zentrale Pfad-Konfiguration
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from config.paths_config import ProjectPaths
+from config.customer_sampling import DEFAULT_SEED
+from config import job_checkpoints
+
+# Service-lokale Module (runner-service/) auch bei Start aus dem Projekt-Root auffindbar
+sys.path.insert(0, str(Path(__file__).parent))
+from job_log_storage import JobLogStorage
+from job_queue import JobQueue, QUEUED, RUNNING, SUCCEEDED, FAILED, CANCELLED, FINAL_STATES
+from process_monitor import ProcessMonitor
+from process_supervisor import ProcessSupervisor, SupervisedProcess
+from progress_tracker import ProgressTracker
+from resource_budget import ResourceBudget, thread_environment
+import run_cache
+import runner_metrics
+from worker_pool import WarmWorkerPool
 
 # Logging Setup
 logging.basicConfig(level=logging.INFO)
@@ -31,7 +48,8 @@ logger = logging.getLogger(__name__)
 sys.path.insert(0, str(ProjectPaths.json_database_directory()))
 try:
     from bl.json_database.churn_json_database import ChurnJSONDatabase
-    json_db = ChurnJSONDatabase()
+    with runner_metrics.time_json_db("load"):
+        json_db = ChurnJSONDatabase()
     logger.info("JSON-DB successfully initialized")
 except ImportError as e:
     logger.warning(f"JSON-DB Import failed: {e}")
@@ -50,8 +68,81 @@ app.add_middleware(
 
 # In-Memory Log Store für Live-Streaming
 log_store: List[Dict] = []
-active_processes: Dict[str, subprocess.Popen] = {}
-executor = ThreadPoolExecutor(max_workers=3)
+log_store_lock = threading.Lock()  # Appends aus mehreren Job-Threads
+active_processes: Dict[str, SupervisedProcess] = {}  # bzw. WorkerJobHandle im Warm-Modus
+
+# Job-Queue & Scheduling
+# RUNNER_MAX_CONCURRENT_JOBS → Gesamtzahl paralleler Jobs
+# RUNNER_MAX_CONCURRENT_<PIPELINE> → Limit pro Pipeline (CHURN/COX/CF)
+MAX_CONCURRENT_JOBS = int(os.environ.get("RUNNER_MAX_CONCURRENT_JOBS", "3"))
+PIPELINE_CONCURRENCY: Dict[str, int] = {
+    pipeline: int(os.environ.get(f"RUNNER_MAX_CONCURRENT_{pipeline.upper()}", str(MAX_CONCURRENT_JOBS)))
+    for pipeline in ("churn", "cox", "cf")
+}
+DISPATCH_INTERVAL_SECONDS = 1.0
+
+# Laufzeitgrenzen (Sekunden, 0 = unbegrenzt); danach wird die Prozessgruppe des Jobs beendet
+# RUNNER_JOB_TIMEOUT_SECONDS → Standard für alle Pipelines
+# RUNNER_JOB_TIMEOUT_<PIPELINE>_SECONDS → Grenze pro Pipeline (CHURN/COX/CF)
+JOB_TIMEOUT_SECONDS = float(os.environ.get("RUNNER_JOB_TIMEOUT_SECONDS", "0"))
+PIPELINE_TIMEOUTS: Dict[str, float] = {
+    pipeline: float(os.environ.get(f"RUNNER_JOB_TIMEOUT_{pipeline.upper()}_SECONDS", str(JOB_TIMEOUT_SECONDS)))
+    for pipeline in ("churn", "cox", "cf")
+}
+
+# Warm- und Subprozess-Jobs überwacht der Supervisor auf einer Eventloop ohne blockierte
+# Threads (Executor nur für das Verbuchen nach Jobende)
+executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_JOBS)
+supervisor = ProcessSupervisor(grace_seconds=float(os.environ.get("RUNNER_TERMINATE_GRACE_SECONDS", "10")))
+job_queue = JobQueue(ProjectPaths.runner_job_queue_file())
+running_jobs: Dict[str, str] = {}  # job_id → pipeline (inkl. Startphase vor Popen)
+running_jobs_lock = threading.Lock()
+dispatch_wakeup = threading.Event()
+
+# Warm-Worker (BL-Module vorab importiert) statt eines frischen Interpreters pro Job
+# RUNNER_WORKER_MODE → "warm" (Standard) oder "subprocess"
+# RUNNER_WORKER_MAX_JOBS / RUNNER_WORKER_MAX_RSS_MB → Recycling-Grenzen je Worker
+WORKER_MODE = os.environ.get("RUNNER_WORKER_MODE", "warm").strip().lower()
+warm_pool: Optional[WarmWorkerPool] = None
+if WORKER_MODE == "warm":
+    warm_pool = WarmWorkerPool(
+        MAX_CONCURRENT_JOBS,
+        max_jobs_per_worker=int(os.environ.get("RUNNER_WORKER_MAX_JOBS", "20")),
+        max_rss_mb=float(os.environ.get("RUNNER_WORKER_MAX_RSS_MB", "4096")),
+    )
+
+# Ressourcen: Prozess-Sampling (RSS/CPU je Job-Prozessbaum) und budgetbasierte Zulassung
+# RUNNER_MEMORY_BUDGET_MB / RUNNER_MEMORY_BUDGET_FRACTION / RUNNER_CPU_BUDGET → Budget des Knotens
+# RUNNER_MEM_ESTIMATE_<PIPELINE>_MB / RUNNER_CPU_ESTIMATE_<PIPELINE> → Schätzung ohne Messhistorie
+# RUNNER_SAMPLE_INTERVAL_SECONDS → Sampling-Intervall
+process_monitor = ProcessMonitor(
+    lambda: {job_id: handle.pid for job_id, handle in list(active_processes.items())},
+    interval=float(os.environ.get("RUNNER_SAMPLE_INTERVAL_SECONDS", "1.0")),
+)
+resource_budget = ResourceBudget.from_environment(
+    observed_peaks=job_queue.recent_peaks,
+    current_usage_mb=process_monitor.current_rss_mb,
+)
+
+# Worker-Agenten (auch auf anderen Knoten) leasen Jobs über HTTP (`worker_agent.py`)
+# RUNNER_LOCAL_EXECUTION → "0": Runner führt selbst keine Jobs aus (nur Agenten)
+# RUNNER_AGENT_LEASE_SECONDS → Lease-Dauer; Heartbeats alle Lease/3 Sekunden
+LOCAL_EXECUTION = os.environ.get("RUNNER_LOCAL_EXECUTION", "1").strip().lower() not in ("0", "false", "no")
+AGENT_LEASE_SECONDS = float(os.environ.get("RUNNER_AGENT_LEASE_SECONDS", "60"))
+
+# Strukturierter Fortschritt (Stages, Prozent, Zeilen, Metriken) über einen Seitenkanal neben stdout
+progress_tracker = ProgressTracker()
+
+# Persistente Job-Logs (segmentiert, komprimiert, indiziert)
+# RUNNER_LOG_RETENTION_DAYS → Aufbewahrung in Tagen (0 = unbegrenzt)
+# RUNNER_LOG_MAX_TOTAL_BYTES → Obergrenze für alle Job-Logs (0 = unbegrenzt)
+# RUNNER_LOG_SEGMENT_BYTES → Rotationsgröße pro Segment
+job_logs = JobLogStorage(
+    ProjectPaths.runner_logs_directory(),
+    segment_max_bytes=int(os.environ.get("RUNNER_LOG_SEGMENT_BYTES", str(8 * 1024 * 1024))),
+    retention_days=float(os.environ.get("RUNNER_LOG_RETENTION_DAYS", "14")),
+    max_total_bytes=int(os.environ.get("RUNNER_LOG_MAX_TOTAL_BYTES", "0")),
+)
 
 
 # === PYDANTIC MODELS ===
@@ -63,23 +154,65 @@ class ChurnRunRequest(BaseModel):
     test_from: str
     test_to: str
     test_reduction: Optional[float] = 0.0
+    sample_seed: Optional[int] = None  # Testmodus: Seed der Kundenstichprobe
+    priority: Optional[int] = 0
+    max_retries: Optional[int] = 0
+    force: Optional[bool] = False  # Fingerprint-Cache ignorieren
+
+
+class ChurnBatchRunRequest(BaseModel):
+    experiment_ids: List[int]
+    test_reduction: Optional[float] = 0.0
+    sample_seed: Optional[int] = None  # Testmodus: Seed der Kundenstichprobe
+    priority: Optional[int] = 0
+    max_retries: Optional[int] = 0
 
 
 class CoxRunRequest(BaseModel):
     experiment_id: int
     cutoff_exclusive: str
+    priority: Optional[int] = 0
+    max_retries: Optional[int] = 0
+    force: Optional[bool] = False
 
 
 class CounterfactualsRunRequest(BaseModel):
     experiment_id: int
     sample: Optional[int] = None
     limit: Optional[int] = None
+    priority: Optional[int] = 0
+    max_retries: Optional[int] = 0
 
 
 class RunResponse(BaseModel):
     job_id: str
     status: str
     message: str
+    queue_position: Optional[int] = None
+    cache_hit: bool = False
+
+
+class AgentRegisterRequest(BaseModel):
+    name: str
+    host: Optional[str] = None
+    pipelines: Optional[List[str]] = ["churn", "cox", "cf"]
+    slots: Optional[int] = 1
+
+
+class AgentHeartbeatRequest(BaseModel):
+    job_ids: List[str] = []
+
+
+class AgentJobEventsRequest(BaseModel):
+    logs: List[str] = []
+    progress: List[Dict] = []
+
+
+class AgentJobCompleteRequest(BaseModel):
+    return_code: int
+    error: Optional[str] = None
+    peak_rss_mb: Optional[float] = None
+    cpu_seconds: Optional[float] = None
 
 
 class ExperimentCreate(BaseModel):
@@ -129,61 +262,461 @@ def add_log(level: str, message: str, job_id: Optional[str] = None):
         "message": message,
         "job_id": job_id
     }
-    log_store.append(log_entry)
+    with log_store_lock:
+        log_store.append(log_entry)
+        # Log-Store begrenzen (letzten 1000 Einträge)
+        if len(log_store) > 1000:
+            del log_store[:-1000]
     logger.info(f"[{job_id}] {message}")
-    
-    # Log-Store begrenzen (letzten 1000 Einträge)
-    if len(log_store) > 1000:
-        log_store[:] = log_store[-1000:]
+    runner_metrics.count_log_line(level)
+
+    # Job-bezogene Einträge zusätzlich dauerhaft ablegen
+    if job_id:
+        try:
+            log_entry["seq"] = job_logs.append(job_id, log_entry)
+        except Exception as e:
+            logger.warning(f"[{job_id}] Persisting log entry failed: {e}")
 
 
-def generate_job_id(pipeline: str, experiment_id: int) -> str:
+def generate_job_id(pipeline: str, experiment_id: Union[int, str]) -> str:
     """Eindeutige Job-ID generieren"""
     timestamp = int(time.time())
-    return f"{pipeline}_{experiment_id}_{timestamp}"
-
-
-def run_subprocess(cmd: List[str], job_id: str, cwd: Path) -> int:
-    """Subprocess ausführen und Logs streamen"""
-    add_log("INFO", f"Starting command: {' '.join(cmd)}", job_id)
-    
+    # Suffix verhindert Kollisionen bei mehreren Submits pro Sekunde
+    return f"{pipeline}_{experiment_id}_{timestamp}_{uuid.uuid4().hex[:6]}"
+
+
+def handle_progress(job_id: str, events: List[Dict]) -> None:
+    """Fortschritts-Events übernehmen; nur Stage-Wechsel erscheinen zusätzlich im Log"""
+    progress_tracker.apply(job_id, events)
+    for event in events:
+        if event.get("type") == "stage_start":
+            add_log("INFO", f"Stage {event.get('stage')} started", job_id)
+        elif event.get("type") == "stage_end":
+            duration = event.get("duration")
+            took = f" after {duration:.1f} s" if isinstance(duration, (int, float)) else ""
+            level = "INFO" if event.get("status") == "succeeded" else "WARNING"
+            add_log(level, f"Stage {event.get('stage')} {event.get('status')}{took}", job_id)
+
+
+def start_supervised_job(job: Dict, reservation: Optional[Dict] = None) -> None:
+    """Job als Subprozess unter dem Supervisor starten; kehrt sofort zurück, Verbuchen nach Prozessende"""
+    job_id = job["job_id"]
+    threads = (reservation or {}).get("threads")
+    timeout = PIPELINE_TIMEOUTS.get(job["pipeline"], JOB_TIMEOUT_SECONDS)
+    started = time.time()
     try:
-        process = subprocess.Popen(
+        begin_job(job)
+        cmd = build_pipeline_command(job["pipeline"], job["params"])
+        env = dict(os.environ, RUNNER_JOB_ID=job_id)
+        if threads:
+            env.update(thread_environment(threads), RUNNER_JOB_THREADS=str(threads))
+        add_log("INFO", f"Starting command: {' '.join(cmd)}", job_id)
+        handle = supervisor.launch(
+            job_id,
             cmd,
-            cwd=cwd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1,
-            universal_newlines=True
+            ProjectPaths.project_root(),
+            env,
+            on_output=lambda line: add_log("OUTPUT", line.strip(), job_id),
+            on_progress=lambda events: handle_progress(job_id, events),
+            timeout=timeout,
         )
-        
-        active_processes[job_id] = process
-        
-        # Live-Output streamen
-        for line in iter(process.stdout.readline, ''):
-            if line:
-                add_log("OUTPUT", line.strip(), job_id)
-        
-        process.wait()
-        return_code = process.returncode
-        
-        if return_code == 0:
-            add_log("SUCCESS", f"Process completed successfully", job_id)
-        else:
-            add_log("ERROR", f"Process failed with return code {return_code}", job_id)
-            
-        return return_code
-        
     except Exception as e:
         add_log("ERROR", f"Subprocess execution failed: {str(e)}", job_id)
-        return 1
+        release_job_resources(job_id)
+        complete_job(job, 1, str(e), started)
+        return
+
+    active_processes[job_id] = handle
+    process_monitor.register(job_id, handle.pid)
+    terminate_if_cancelled(job_id, handle)
+    # Verbuchen (SQLite, Snapshots) nicht im Loop-Thread des Supervisors
+    handle.future.add_done_callback(
+        lambda future: executor.submit(finish_supervised_job, job, future, timeout, started)
+    )
+
+
+def finish_supervised_job(job: Dict, future, timeout: float, started: float) -> None:
+    """Ergebnis eines Supervisor-Jobs auswerten und verbuchen"""
+    job_id = job["job_id"]
+    try:
+        result = future.result()
+        return_code = result.return_code
+        if result.timed_out:
+            error = f"Timed out after {timeout:.0f} s"
+        elif return_code == 0:
+            error = None
+        else:
+            error = f"Process failed with return code {return_code}"
+    except Exception as e:
+        return_code, error = 1, f"Subprocess supervision failed: {str(e)}"
+
+    if error is None:
+        add_log("SUCCESS", f"Process completed successfully", job_id)
+    else:
+        add_log("ERROR", error, job_id)
+    release_job_resources(job_id)
+    complete_job(job, return_code, error, started)
+
+
+def start_warm_job(job: Dict, reservation: Optional[Dict] = None) -> None:
+    """
+    Job in einem vorgewärmten Worker starten; kehrt sofort zurück.
+
+    Die Worker-Verbindung (Logs, Fortschritt, Ergebnis) liest die Eventloop des Supervisors –
+    laufende Warm-Jobs belegen keinen Thread, Verbuchen nach Jobende im Executor.
+    """
+    job_id = job["job_id"]
+    pipeline = job["pipeline"]
+    threads = (reservation or {}).get("threads")
+    timeout = PIPELINE_TIMEOUTS.get(pipeline, JOB_TIMEOUT_SECONDS)
+    started = time.time()
+    timers: List[threading.Timer] = []
+
+    def terminate_on_timeout(handle) -> None:
+        add_log("ERROR", f"Timed out after {timeout:.0f} s, terminating warm worker", job_id)
+        handle.terminate()
+
+    def register_handle(handle) -> None:
+        active_processes[job_id] = handle
+        process_monitor.register(job_id, handle.pid)
+        add_log("INFO", f"Assigned to warm worker pid={handle.pid}", job_id)
+        if terminate_if_cancelled(job_id, handle):
+            return
+        if timeout:
+            timer = threading.Timer(timeout, terminate_on_timeout, args=(handle,))
+            timer.daemon = True
+            timer.start()
+            timers.append(timer)
+
+    try:
+        begin_job(job)
+        add_log("INFO", f"Starting {pipeline} pipeline in warm worker", job_id)
+        future = supervisor.submit(
+            warm_pool.run_async(
+                job_id,
+                pipeline,
+                job["params"],
+                on_log=lambda line: add_log("OUTPUT", line.strip(), job_id),
+                on_start=register_handle,
+                threads=threads,
+                on_progress=lambda events: handle_progress(job_id, events),
+            )
+        )
+    except Exception as e:
+        add_log("ERROR", f"Job execution failed: {str(e)}", job_id)
+        release_job_resources(job_id)
+        complete_job(job, 1, str(e), started)
+        return
+
+    future.add_done_callback(
+        lambda done: executor.submit(finish_warm_job, job, done, timers, started)
+    )
+
+
+def finish_warm_job(job: Dict, future, timers: List[threading.Timer], started: float) -> None:
+    """Ergebnis eines Warm-Jobs auswerten und verbuchen"""
+    job_id = job["job_id"]
+    for timer in timers:
+        timer.cancel()
+    try:
+        return_code = future.result()
+        error = None if return_code == 0 else f"Process failed with return code {return_code}"
+    except Exception as e:
+        return_code, error = 1, f"Warm worker execution failed: {str(e)}"
+
+    if error is None:
+        add_log("SUCCESS", f"Process completed successfully", job_id)
+    else:
+        add_log("ERROR", error, job_id)
+    release_job_resources(job_id)
+    complete_job(job, return_code, error, started)
+
+
+def job_cancelled(job_id: str) -> bool:
+    """Wurde der Job inzwischen abgebrochen (z. B. zwischen Claim und Prozessstart)?"""
+    current = job_queue.get(job_id)
+    return current is not None and current["status"] == CANCELLED
+
+
+def terminate_if_cancelled(job_id: str, handle) -> bool:
+    """
+    Nach dem Registrieren des Prozesses: Abbruch, der vor der Registrierung einging, nachholen.
+
+    `kill_job` setzt erst den Queue-Status und schaut dann in `active_processes` – sieht es den
+    Prozess noch nicht, findet diese Prüfung (nach der Registrierung) den Status `cancelled`.
+    """
+    if not job_cancelled(job_id):
+        return False
+    add_log("WARNING", "Job cancelled during launch, terminating", job_id)
+    handle.terminate()
+    return True
+
+
+def release_job_resources(job_id: str) -> None:
+    """Prozess-Registrierung lösen, Job-Log schließen, Log- und Checkpoint-Retention anstoßen"""
+    active_processes.pop(job_id, None)
+    job_logs.close(job_id)
+    try:
+        job_logs.cleanup()
+        # Checkpoints leben so lange wie die Logs ihres Jobs
+        job_checkpoints.cleanup(lambda checkpoint_job: checkpoint_job in running_jobs or job_logs.exists(checkpoint_job))
+    except Exception as e:
+        logger.warning(f"Log retention failed: {e}")
+
+
+def churn_test_params(test_reduction: Optional[float], sample_seed: Optional[int]) -> Dict:
+    """Testmodus-Parameter; der Seed wird fixiert, damit Wiederholungen dieselben Kunden ziehen"""
+    params = {"test_reduction": test_reduction if test_reduction is not None else 0.0}
+    if params["test_reduction"] > 0:
+        params["sample_seed"] = sample_seed if sample_seed is not None else DEFAULT_SEED
+    return params
+
+
+def build_pipeline_command(pipeline: str, params: Dict) -> List[str]:
+    """Subprocess-Command für einen Pipeline-Job (kalter Start über pipeline_jobs.py)"""
+    if pipeline not in ("churn", "cox", "cf"):
+        raise ValueError(f"Unknown pipeline: {pipeline}")
+    return [
+        sys.executable,
+        str(Path(__file__).resolve().parent / "pipeline_jobs.py"),
+        pipeline,
+        json.dumps(params),
+    ]
+
+
+def invalidate_job_outboxes(job: Dict) -> None:
+    """
+    Vor jedem echten Lauf: Outboxen aller Experimente des Jobs (auch Batch-Jobs ohne Fingerprint)
+    von Snapshot-Blobs lösen und ihren Fingerprint-Stand verwerfen – die Pipeline schreibt neu
+    """
+    if job["pipeline"] not in ("churn", "cox"):
+        return
+    experiment_ids = list((job.get("params") or {}).get("experiment_ids") or [])
+    if job.get("experiment_id") is not None:
+        experiment_ids.append(job["experiment_id"])
+    for experiment_id in dict.fromkeys(int(e) for e in experiment_ids):
+        run_cache.invalidate_marker(job["pipeline"], experiment_id)
+
+
+def begin_job(job: Dict) -> None:
+    """Gemeinsamer Jobstart: Fortschritt erfassen, veralteten Fingerprint-Stand verwerfen"""
+    progress_tracker.start(job["job_id"], job["pipeline"])
+    invalidate_job_outboxes(job)
+
+
+def complete_job(job: Dict, return_code: int, error: Optional[str], started: float) -> None:
+    """Ergebnis in der Queue verbuchen, Reservierungen freigeben, Folgeaktionen anstoßen"""
+    job_id = job["job_id"]
+    stats = process_monitor.release(job_id)
+    final_job = None
+    try:
+        if stats is not None:
+            add_log("INFO", f"Resource usage: peak {stats.peak_rss_mb:.0f} MB RSS, {stats.cpu_seconds:.1f} s CPU", job_id)
+            final_job = job_queue.finish(job_id, return_code, error, stats.peak_rss_mb, stats.cpu_seconds)
+        else:
+            final_job = job_queue.finish(job_id, return_code, error)
     finally:
-        active_processes.pop(job_id, None)
+        runner_metrics.observe_job(
+            job["pipeline"],
+            final_job["status"] if final_job else "unknown",
+            time.time() - started,
+            stats.peak_rss_mb if stats is not None else None,
+        )
+        progress_tracker.finish(job_id, final_job["status"] if final_job else "unknown")
+        resource_budget.release(job_id)
+        with running_jobs_lock:
+            running_jobs.pop(job_id, None)
+        dispatch_wakeup.set()
+
+    process_job_outcome(job_id, final_job)
+
+
+def process_job_outcome(job_id: str, final_job: Optional[Dict]) -> None:
+    """Nach dem Verbuchen: Checkpoints aufräumen, Ergebnis cachen, Retry melden (lokal und Agenten)"""
+    if final_job and final_job["status"] == SUCCEEDED:
+        # Erfolgreich → Zwischenstände werden nicht mehr gebraucht
+        job_checkpoints.JobCheckpoints(job_id).remove()
+
+    if final_job and final_job["status"] == SUCCEEDED and final_job.get("fingerprint"):
+        try:
+            if run_cache.store_snapshot(final_job["fingerprint"], final_job["pipeline"], final_job["experiment_id"], job_id):
+                add_log("INFO", f"Result cached under fingerprint {final_job['fingerprint'][:12]}", job_id)
+        except Exception as e:
+            add_log("WARNING", f"Caching result failed: {str(e)}", job_id)
+
+    if final_job and final_job["status"] == QUEUED:
+        add_log("WARNING", f"Job re-queued for retry (attempt {final_job['attempts']}/{final_job['max_retries'] + 1})", job_id)
+
+
+def dispatch_pending_jobs() -> None:
+    """Wartende Jobs starten, solange Gesamt-/Pipeline-Limits und Ressourcenbudget es zulassen"""
+    while True:
+        reservations: Dict[str, Dict] = {}
+
+        def admit(candidate: Dict) -> bool:
+            reservation = resource_budget.try_reserve(candidate["job_id"], candidate["pipeline"])
+            if reservation is None:
+                return False
+            reservations[candidate["job_id"]] = reservation
+            return True
+
+        with running_jobs_lock:
+            if len(running_jobs) >= MAX_CONCURRENT_JOBS:
+                return
+            job = job_queue.claim_next(Counter(running_jobs.values()), PIPELINE_CONCURRENCY, admit=admit)
+            if job is None:
+                return
+            running_jobs[job["job_id"]] = job["pipeline"]
+        reservation = reservations.get(job["job_id"])
+        if job_cancelled(job["job_id"]):
+            # Abbruch zwischen Claim und Start → nicht starten, Reservierungen freigeben
+            add_log("WARNING", "Job cancelled before launch, not started", job["job_id"])
+            release_job_resources(job["job_id"])
+            complete_job(job, 1, "Cancelled before launch", time.time())
+            continue
+        add_log(
+            "INFO",
+            f"Job dispatched (attempt {job['attempts']}, reserved {reservation['memory_mb']:.0f} MB, "
+            f"{reservation['threads']} threads)",
+            job["job_id"],
+        )
+        if warm_pool is not None:
+            start_warm_job(job, reservation)
+        else:
+            start_supervised_job(job, reservation)
+
+
+def expire_agent_leases() -> None:
+    """Jobs ausgefallener Agenten (keine Heartbeats bis Lease-Ablauf) wieder einreihen"""
+    for job in job_queue.expire_leases():
+        add_log("WARNING", f"Lease of agent {job['worker_id']} expired, job re-queued", job["job_id"])
+        job_logs.close(job["job_id"])
+        progress_tracker.finish(job["job_id"], QUEUED)
+        dispatch_wakeup.set()
+    # Agenten ohne Heartbeat und ohne Leases vergessen
+    job_queue.remove_agents(unseen_for=AGENT_LEASE_SECONDS * 10)
+
+
+def dispatch_loop() -> None:
+    """Scheduler-Schleife: reagiert auf Submits/Jobende und prüft zusätzlich periodisch"""
+    while True:
+        dispatch_wakeup.wait(timeout=DISPATCH_INTERVAL_SECONDS)
+        dispatch_wakeup.clear()
+        try:
+            expire_agent_leases()
+            if LOCAL_EXECUTION:
+                dispatch_pending_jobs()
+        except Exception as e:
+            logger.error(f"Dispatch failed: {e}")
+
+
+def compute_run_fingerprint(pipeline: str, experiment_id: int, params: Dict) -> Optional[str]:
+    """Fingerprint aus Experiment, Eingabedateien und BL-Quellstand (None: nicht cachebar)"""
+    if not json_db or experiment_id is None or pipeline not in run_cache.CACHEABLE_PIPELINES:
+        return None
+    try:
+        with runner_metrics.time_json_db("reload"):
+            json_db.maybe_reload()
+        experiment = json_db.get_experiment_by_id(experiment_id)
+        if not experiment:
+            return None
+        file_records = json_db.data.get("tables", {}).get("files", {}).get("records", []) or []
+        fingerprint, _ = run_cache.compute_fingerprint(pipeline, params, experiment, file_records)
+        return fingerprint
+    except Exception as e:
+        logger.warning(f"Fingerprint for {pipeline}/{experiment_id} failed: {e}")
+        return None
+
+
+def reuse_cached_run(
+    job_id: str,
+    pipeline: str,
+    experiment_id: int,
+    params: Dict,
+    fingerprint: str,
+    group_id: Optional[str],
+) -> Optional[Dict]:
+    """Erfolgreichen Lauf mit gleichem Fingerprint wiederverwenden (Outbox bei Bedarf neu bereitstellen)"""
+    previous = job_queue.find_succeeded(fingerprint)
+    if previous is None or not run_cache.has_snapshot(fingerprint):
+        return None
+    try:
+        republished = run_cache.publish_snapshot(fingerprint, pipeline, experiment_id)
+    except Exception as e:
+        logger.warning(f"Republishing cached result {fingerprint[:12]} failed: {e}")
+        return None
+    job = job_queue.record_cache_hit(
+        job_id, pipeline, experiment_id, params, fingerprint, previous["job_id"], group_id=group_id
+    )
+    add_log(
+        "INFO",
+        f"Cache hit: reusing result of {previous['job_id']} (fingerprint {fingerprint[:12]}"
+        f"{', republished to outbox' if republished else ''})",
+        job_id,
+    )
+    job_logs.close(job_id)
+    # Abhängige Jobs können jetzt starten
+    dispatch_wakeup.set()
+    return job
+
+
+def submit_job(
+    pipeline: str,
+    experiment_id: Optional[int],
+    params: Dict,
+    priority: Optional[int],
+    max_retries: Optional[int],
+    depends_on: Optional[List[str]] = None,
+    group_id: Optional[str] = None,
+    force: Optional[bool] = False,
+) -> Dict:
+    """Job persistent einreihen und Scheduler wecken (bzw. früheres Ergebnis wiederverwenden)"""
+    job_id = generate_job_id(pipeline, experiment_id if experiment_id is not None else "batch")
+    fingerprint = compute_run_fingerprint(pipeline, experiment_id, params)
+    if fingerprint and not force:
+        cached_job = reuse_cached_run(job_id, pipeline, experiment_id, params, fingerprint, group_id)
+        if cached_job is not None:
+            return cached_job
+    job = job_queue.submit(
+        job_id,
+        pipeline,
+        experiment_id,
+        params,
+        priority=priority or 0,
+        max_retries=max_retries or 0,
+        depends_on=depends_on,
+        group_id=group_id,
+        fingerprint=fingerprint,
+    )
+    if depends_on:
+        add_log("INFO", f"Job queued (pipeline={pipeline}, priority={job['priority']}, after {', '.join(depends_on)})", job_id)
+    else:
+        add_log("INFO", f"Job queued (pipeline={pipeline}, priority={job['priority']})", job_id)
+    dispatch_wakeup.set()
+    return job
 
 
 # === API ENDPOINTS ===
 
+@app.on_event("startup")
+async def start_scheduler():
+    recovered = job_queue.recover_interrupted()
+    if recovered:
+        add_log("WARNING", f"Re-queued {recovered} jobs interrupted by restart", None)
+    if warm_pool is not None:
+        warm_pool.prestart()
+    process_monitor.start()
+    threading.Thread(target=dispatch_loop, name="job-dispatcher", daemon=True).start()
+    dispatch_wakeup.set()
+
+
+@app.on_event("shutdown")
+async def stop_workers():
+    if warm_pool is not None:
+        warm_pool.shutdown()
+    supervisor.shutdown()
+
+
 @app.get("/")
 async def root():
     return {"service": "Churn Suite Runner", "status": "running"}
@@ -191,121 +724,154 @@ async def root():
 
 @app.get("/health")
 async def health_check():
+    queue_counts = job_queue.count_by_status()
     return {
         "status": "healthy",
         "active_jobs": len(active_processes),
+        "queued_jobs": queue_counts.get(QUEUED, 0),
         "log_entries": len(log_store)
     }
 
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus-Exposition (Queue-Tiefe, Job-Laufzeiten, JSON-DB-Latenz, Log-Durchsatz)"""
+    with running_jobs_lock:
+        running_counts = Counter(running_jobs.values())
+    rendered = runner_metrics.render(job_queue.count_by_status(), running_counts)
+    if rendered is None:
+        raise HTTPException(status_code=503, detail="prometheus_client not installed")
+    body, content_type = rendered
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/resources")
+async def get_resources():
+    """Ressourcenbudget, Reservierungen und gemessene Nutzung laufender Jobs"""
+    usage = {}
+    for job_id in list(running_jobs):
+        stats = process_monitor.stats(job_id)
+        if stats is not None:
+            usage[job_id] = stats.as_dict()
+    return {
+        **resource_budget.snapshot(),
+        "sampling_available": process_monitor.available,
+        "usage": usage,
+    }
+
+
 @app.post("/run/churn", response_model=RunResponse)
-async def run_churn(request: ChurnRunRequest, background_tasks: BackgroundTasks):
-    """Churn-Pipeline ausführen"""
-    job_id = generate_job_id("churn", request.experiment_id)
-    
-    # Subprocess-Command zusammenstellen - verwende process_experiment() direkt
-    cmd = [
-        sys.executable,
-        "-c",
-        f"""
-import sys
-sys.path.insert(0, '{ProjectPaths.bl_churn_directory()}')
-sys.path.insert(0, '{ProjectPaths.json_database_directory()}')
-from bl.Churn.churn_auto_processor import ChurnAutoProcessor
-from bl.json_database.churn_json_database import ChurnJSONDatabase
-
-# Lade Experiment aus Datenbank
-db = ChurnJSONDatabase()
-exp_id = {request.experiment_id}
-experiment = db.get_experiment_by_id(exp_id)
-if not experiment:
-    print("ERROR: Experiment " + str(exp_id) + " not found")
-    sys.exit(1)
-
-# Verarbeite Experiment
-processor = ChurnAutoProcessor()
-test_reduction = {request.test_reduction if hasattr(request, 'test_reduction') and request.test_reduction is not None else 0.0}
-success = processor.process_experiment(experiment, custom_periods=None, test_reduction=float(test_reduction))
-if not success:
-    print("ERROR: Processing failed for experiment " + str(exp_id))
-    sys.exit(1)
-    
-print("SUCCESS: Experiment " + str(exp_id) + " processed successfully")
-"""
-    ]
-    
-    # Background-Task starten
-    background_tasks.add_task(
-        lambda: executor.submit(run_subprocess, cmd, job_id, ProjectPaths.project_root())
+async def run_churn(request: ChurnRunRequest):
+    """Churn-Pipeline einreihen"""
+    job = submit_job(
+        "churn",
+        request.experiment_id,
+        {
+            "experiment_id": request.experiment_id,
+            **churn_test_params(request.test_reduction, request.sample_seed),
+        },
+        request.priority,
+        request.max_retries,
+        force=request.force,
     )
-    
     return RunResponse(
-        job_id=job_id,
-        status="started",
-        message=f"Churn pipeline started for experiment {request.experiment_id}"
+        job_id=job["job_id"],
+        status=job["status"],
+        message=(
+            f"Churn result reused for experiment {request.experiment_id} (cache hit)"
+            if job["cache_hit"]
+            else f"Churn pipeline queued for experiment {request.experiment_id}"
+        ),
+        queue_position=job_queue.queue_position(job["job_id"]),
+        cache_hit=bool(job["cache_hit"])
     )
 
 
+@app.post("/run/churn/batch")
+async def run_churn_batch(request: ChurnBatchRunRequest):
+    """
+    Mehrere Churn-Experimente als Batch einreihen.
+
+    Experimente mit gleichen `id_files` laufen gemeinsam in einem Job (ein Prozess, eine
+    Daten-/DB-Ladung); unterschiedliche Datengrundlagen ergeben getrennte Jobs.
+    """
+    if not request.experiment_ids:
+        raise HTTPException(status_code=400, detail="experiment_ids must not be empty")
+    experiments = {experiment_id: load_experiment_or_404(experiment_id) for experiment_id in request.experiment_ids}
+
+    groups: Dict[tuple, List[int]] = {}
+    for experiment_id, experiment in experiments.items():
+        key = tuple(sorted(experiment.get("id_files") or []))
+        groups.setdefault(key, []).append(experiment_id)
+
+    batches = []
+    for id_files, experiment_ids in groups.items():
+        job = submit_job(
+            "churn",
+            None,
+            {
+                "experiment_ids": experiment_ids,
+                **churn_test_params(request.test_reduction, request.sample_seed),
+            },
+            request.priority,
+            request.max_retries,
+        )
+        batches.append({
+            "job_id": job["job_id"],
+            "experiment_ids": experiment_ids,
+            "id_files": list(id_files),
+            "queue_position": job_queue.queue_position(job["job_id"]),
+        })
+    return {"batches": batches, "count": len(batches)}
+
+
 @app.post("/run/cox", response_model=RunResponse)
-async def run_cox(request: CoxRunRequest, background_tasks: BackgroundTasks):
-    """Cox-Pipeline ausführen"""
-    job_id = generate_job_id("cox", request.experiment_id)
-    
-    cmd = [
-        sys.executable,
-        "-c",
-        f"""
-import sys
-sys.path.insert(0, '{ProjectPaths.bl_cox_directory()}')
-sys.path.insert(0, '{ProjectPaths.json_database_directory()}')
-from bl.Cox.cox_auto_processor import main
-main(experiment_id={request.experiment_id}, cutoff_exclusive='{request.cutoff_exclusive}')
-"""
-    ]
-    
-    background_tasks.add_task(
-        lambda: executor.submit(run_subprocess, cmd, job_id, ProjectPaths.project_root())
+async def run_cox(request: CoxRunRequest):
+    """Cox-Pipeline einreihen"""
+    job = submit_job(
+        "cox",
+        request.experiment_id,
+        {"experiment_id": request.experiment_id, "cutoff_exclusive": request.cutoff_exclusive},
+        request.priority,
+        request.max_retries,
+        force=request.force,
     )
-    
     return RunResponse(
-        job_id=job_id,
-        status="started",
-        message=f"Cox pipeline started for experiment {request.experiment_id}"
+        job_id=job["job_id"],
+        status=job["status"],
+        message=(
+            f"Cox result reused for experiment {request.experiment_id} (cache hit)"
+            if job["cache_hit"]
+            else f"Cox pipeline queued for experiment {request.experiment_id}"
+        ),
+        queue_position=job_queue.queue_position(job["job_id"]),
+        cache_hit=bool(job["cache_hit"])
     )
 
 
 @app.post("/run/cf", response_model=RunResponse)
-async def run_counterfactuals(request: CounterfactualsRunRequest, background_tasks: BackgroundTasks):
-    """Counterfactuals-Pipeline ausführen"""
-    job_id = generate_job_id("cf", request.experiment_id)
-    
-    cmd = [
-        sys.executable,
-        "-c",
-        f"""
-import sys
-sys.path.insert(0, '{ProjectPaths.bl_counterfactuals_directory()}')
-sys.path.insert(0, '{ProjectPaths.json_database_directory()}')
-from bl.Counterfactuals.counterfactuals_cli import main
-main(experiment_id={request.experiment_id}, sample={request.sample}, limit={request.limit})
-"""
-    ]
-    
-    background_tasks.add_task(
-        lambda: executor.submit(run_subprocess, cmd, job_id, ProjectPaths.project_root())
+async def run_counterfactuals(request: CounterfactualsRunRequest):
+    """Counterfactuals-Pipeline einreihen"""
+    job = submit_job(
+        "cf",
+        request.experiment_id,
+        {"experiment_id": request.experiment_id, "sample": request.sample, "limit": request.limit},
+        request.priority,
+        request.max_retries,
     )
-    
     return RunResponse(
-        job_id=job_id,
-        status="started",
-        message=f"Counterfactuals pipeline started for experiment {request.experiment_id}"
+        job_id=job["job_id"],
+        status=job["status"],
+        message=f"Counterfactuals pipeline queued for experiment {request.experiment_id}",
+        queue_position=job_queue.queue_position(job["job_id"])
     )
 
 
 @app.get("/logs/stream")
 async def get_logs(since: Optional[str] = None, job_id: Optional[str] = None):
     """Live-Logs abrufen (Polling-basiert)"""
-    filtered_logs = log_store
+    with log_store_lock:
+        filtered_logs = list(log_store)
     
     # Filter nach Zeitstempel
     if since:
@@ -329,30 +895,292 @@ async def get_logs(since: Optional[str] = None, job_id: Optional[str] = None):
     }
 
 
+@app.get("/jobs/{job_id}/logs")
+async def get_job_logs(
+    job_id: str,
+    from_: Optional[str] = Query(None, alias="from"),
+    to: Optional[str] = None,
+    limit: Optional[int] = None,
+):
+    """Persistierte Logs eines Jobs abrufen (Bereich per Sequenznummer oder ISO-Zeitstempel)"""
+    if not job_logs.exists(job_id):
+        raise HTTPException(status_code=404, detail="No logs for job")
+
+    def parse_bound(value: Optional[str]):
+        # Ganzzahl → Sequenznummer, sonst ISO-Zeitstempel
+        if value is None or value == "":
+            return None, None
+        if value.isdigit():
+            return int(value), None
+        try:
+            return None, datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid range bound: {value}")
+
+    from_seq, from_ts = parse_bound(from_)
+    to_seq, to_ts = parse_bound(to)
+    logs = job_logs.read(job_id, from_seq=from_seq, to_seq=to_seq, from_ts=from_ts, to_ts=to_ts, limit=limit)
+    return {
+        "job_id": job_id,
+        "logs": logs,
+        "count": len(logs),
+        "next_from": (logs[-1]["seq"] + 1) if logs else None
+    }
+
+
 @app.get("/jobs")
 async def get_active_jobs():
-    """Aktive Jobs anzeigen"""
+    """Aktive und wartende Jobs anzeigen"""
+    queued = job_queue.list(status=QUEUED)
     return {
         "active_jobs": list(active_processes.keys()),
-        "count": len(active_processes)
+        "count": len(active_processes),
+        "queued_jobs": [job["job_id"] for job in queued],
+        "queued_count": len(queued)
+    }
+
+
+@app.get("/jobs/{job_id}")
+async def get_job_status(job_id: str):
+    """Status eines Jobs aus der persistenten Queue"""
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    job["queue_position"] = job_queue.queue_position(job_id)
+    job["active"] = job_id in active_processes
+    stats = process_monitor.stats(job_id)
+    job["resources"] = stats.as_dict() if stats is not None else None
+    return job
+
+
+@app.post("/jobs/{job_id}/resume", response_model=RunResponse)
+async def resume_job(job_id: str):
+    """Abgebrochenen oder fehlgeschlagenen Job als neuen Job ab der letzten abgeschlossenen Stage fortsetzen"""
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job["status"] not in (FAILED, CANCELLED):
+        raise HTTPException(status_code=409, detail=f"Only failed or cancelled jobs can be resumed (job is {job['status']})")
+
+    completed = job_checkpoints.JobCheckpoints(job_id).completed_stages()
+    params = {**job["params"], "resume_from": job_id}
+    resumed = submit_job(job["pipeline"], job["experiment_id"], params, job["priority"], job["max_retries"])
+    add_log(
+        "INFO",
+        f"Resuming job {job_id} after stage {completed[-1]}" if completed else f"Restarting job {job_id} (no checkpoints)",
+        resumed["job_id"],
+    )
+    return RunResponse(
+        job_id=resumed["job_id"],
+        status=resumed["status"],
+        message=(
+            f"Resuming {job['pipeline']} job after stage {completed[-1]} ({len(completed)} stages completed)"
+            if completed
+            else f"No checkpoints for {job_id}; {job['pipeline']} job restarts from the beginning"
+        ),
+        queue_position=job_queue.queue_position(resumed["job_id"]),
+        cache_hit=bool(resumed["cache_hit"]),
+    )
+
+
+@app.get("/jobs/{job_id}/checkpoints")
+async def get_job_checkpoints(job_id: str):
+    """Checkpoint-Manifest eines Jobs (abgeschlossene Stages und ihre Artefakte)"""
+    if job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_checkpoints.JobCheckpoints(job_id).manifest()
+
+
+@app.get("/jobs/{job_id}/progress")
+async def get_job_progress(job_id: str):
+    """Strukturierter Fortschritt eines Jobs: Stages, Prozent, Zeilenzahlen, Metriken, Fehler und ETA"""
+    job = job_queue.get(job_id)
+    progress = progress_tracker.snapshot(job_id)
+    if job is None and progress is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if progress is None:
+        # Noch nicht gestartet oder vor einem Runner-Neustart beendet → nur Queue-Status
+        finished = job["status"] == SUCCEEDED
+        return {
+            "job_id": job_id,
+            "pipeline": job["pipeline"],
+            "status": job["status"],
+            "stage": None,
+            "percent": 100.0 if finished else None,
+            "eta_seconds": 0.0 if finished else None,
+            "stages": [],
+        }
+    if job is not None:
+        progress["status"] = job["status"]
+    return progress
+
+
+@app.get("/jobs/{job_id}/metrics")
+async def get_job_metrics(job_id: str):
+    """Live-Telemetrie eines Jobs (CPU %, RSS, I/O-Bytes, offene Dateien) samt Zeitreihe"""
+    job = job_queue.get(job_id)
+    stats = process_monitor.stats(job_id)
+    if job is None and stats is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if stats is None:
+        # Abgeschlossen oder noch nicht gestartet → nur gespeicherte Kennzahlen
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "active": False,
+            "current": None,
+            "peak_rss_mb": job.get("peak_rss_mb"),
+            "cpu_seconds": job.get("cpu_seconds"),
+            "samples": [],
+        }
+    return {
+        "job_id": job_id,
+        "status": job["status"] if job else RUNNING,
+        "active": True,
+        "current": stats.as_dict(),
+        "peak_rss_mb": round(stats.peak_rss_mb, 1),
+        "cpu_seconds": round(stats.cpu_seconds, 2),
+        "samples": stats.history(),
     }
 
 
 @app.delete("/jobs/{job_id}")
 async def kill_job(job_id: str):
-    """Job beenden"""
-    if job_id not in active_processes:
+    """Job beenden (laufend) bzw. aus der Queue nehmen (wartend)"""
+    job = job_queue.get(job_id)
+    if not job and job_id not in active_processes:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    process = active_processes[job_id]
+    if job and job["status"] in FINAL_STATES:
+        raise HTTPException(status_code=409, detail=f"Job already {job['status']}")
+
+    job_queue.cancel(job_id)
+    process = active_processes.get(job_id)
     try:
-        process.terminate()
-        add_log("WARNING", f"Job terminated by user", job_id)
-        return {"message": f"Job {job_id} terminated"}
+        if process is None and job and job.get("worker_id"):
+            # Agent erfährt den Abbruch beim nächsten Heartbeat und beendet den Prozess
+            add_log("WARNING", f"Job cancelled by user (agent {job['worker_id']} notified)", job_id)
+            # Der Agent verliert die Lease und meldet kein Ergebnis mehr → Aufräumen wie beim Abschluss
+            progress_tracker.finish(job_id, CANCELLED)
+            # Agenten-Jobs reservieren kein lokales Budget → nur Registrierung und Log freigeben
+            release_job_resources(job_id)
+            dispatch_wakeup.set()
+            return {"message": f"Job {job_id} cancelled, agent {job['worker_id']} will terminate it"}
+        if process is not None:
+            process.terminate()
+            add_log("WARNING", f"Job terminated by user", job_id)
+            return {"message": f"Job {job_id} terminated"}
+        add_log("WARNING", f"Job cancelled by user", job_id)
+        return {"message": f"Job {job_id} cancelled"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to terminate job: {str(e)}")
 
 
+# === WORKER-AGENT ENDPOINTS ===
+
+def load_agent_or_404(agent_id: str) -> Dict:
+    agent = job_queue.get_agent(agent_id)
+    if agent is None:
+        # Unbekannt (z. B. nach langer Funkstille entfernt) → Agent registriert sich neu
+        raise HTTPException(status_code=404, detail="Agent not registered")
+    job_queue.touch_agent(agent_id)
+    return agent
+
+
+def require_lease(agent_id: str, job_id: str) -> None:
+    if not job_queue.holds_lease(job_id, agent_id):
+        raise HTTPException(status_code=409, detail="Lease not held (job cancelled or re-assigned)")
+
+
+@app.post("/agents/register")
+async def register_agent(request: AgentRegisterRequest):
+    """Worker-Agent anmelden; liefert Agent-ID sowie Lease- und Heartbeat-Intervall"""
+    pipelines = [p for p in (request.pipelines or []) if p in PIPELINE_CONCURRENCY]
+    if not pipelines:
+        raise HTTPException(status_code=400, detail="Agent must serve at least one of churn, cox, cf")
+    agent = job_queue.register_agent(request.name, request.host, pipelines, max(1, request.slots or 1))
+    logger.info(f"Agent registered: {agent['agent_id']} ({request.host}, {pipelines}, {agent['slots']} slots)")
+    return {
+        **agent,
+        "lease_seconds": AGENT_LEASE_SECONDS,
+        "heartbeat_interval": AGENT_LEASE_SECONDS / 3,
+    }
+
+
+@app.get("/agents")
+async def list_agents(seen_within: Optional[float] = None):
+    """Registrierte Agenten mit ihren geleasten Jobs (`seen_within`: nur mit Heartbeat in den letzten n Sekunden)"""
+    agents = job_queue.list_agents(seen_within=seen_within)
+    for agent in agents:
+        agent["jobs"] = [job["job_id"] for job in job_queue.leased_jobs(agent["agent_id"])]
+        agent["seconds_since_heartbeat"] = round(time.time() - agent["last_seen"], 1)
+    return {"agents": agents, "count": len(agents), "local_execution": LOCAL_EXECUTION}
+
+
+@app.post("/agents/{agent_id}/lease")
+async def lease_job(agent_id: str):
+    """Nächsten passenden Job an den Agenten verleasen (`job` ist null, wenn nichts ansteht)"""
+    agent = load_agent_or_404(agent_id)
+    leased = job_queue.leased_jobs(agent_id)
+    if len(leased) >= agent["slots"]:
+        return {"job": None}
+    # Nur Pipelines des Agenten; Slots des Agenten begrenzen je Pipeline
+    limits = {pipeline: (agent["slots"] if pipeline in agent["pipelines"] else 0) for pipeline in PIPELINE_CONCURRENCY}
+    job = job_queue.claim_next(
+        Counter(j["pipeline"] for j in leased),
+        limits,
+        worker_id=agent_id,
+        lease_seconds=AGENT_LEASE_SECONDS,
+    )
+    if job is None:
+        return {"job": None}
+    invalidate_job_outboxes(job)
+    progress_tracker.start(job["job_id"], job["pipeline"])
+    add_log("INFO", f"Job leased to agent {agent_id} (attempt {job['attempts']})", job["job_id"])
+    return {"job": job, "lease_seconds": AGENT_LEASE_SECONDS}
+
+
+@app.post("/agents/{agent_id}/heartbeat")
+async def agent_heartbeat(agent_id: str, request: AgentHeartbeatRequest):
+    """Leases verlängern; `cancel` nennt Jobs, die der Agent beenden soll (abgebrochen/neu vergeben)"""
+    load_agent_or_404(agent_id)
+    cancel = [job_id for job_id in request.job_ids if not job_queue.renew_lease(job_id, agent_id, AGENT_LEASE_SECONDS)]
+    return {"cancel": cancel, "lease_seconds": AGENT_LEASE_SECONDS}
+
+
+@app.post("/agents/{agent_id}/jobs/{job_id}/events")
+async def agent_job_events(agent_id: str, job_id: str, request: AgentJobEventsRequest):
+    """Gebündelte Log-Zeilen und Fortschritts-Events eines Agenten-Jobs"""
+    load_agent_or_404(agent_id)
+    require_lease(agent_id, job_id)
+    for line in request.logs:
+        add_log("OUTPUT", line.rstrip(), job_id)
+    if request.progress:
+        handle_progress(job_id, request.progress)
+    return {"accepted": len(request.logs) + len(request.progress)}
+
+
+@app.post("/agents/{agent_id}/jobs/{job_id}/complete")
+async def agent_job_complete(agent_id: str, job_id: str, request: AgentJobCompleteRequest):
+    """Ergebnis eines Agenten-Jobs verbuchen (Outbox wurde vom Agenten geschrieben)"""
+    load_agent_or_404(agent_id)
+    require_lease(agent_id, job_id)
+    return_code = request.return_code
+    if return_code == 0:
+        add_log("SUCCESS", f"Process completed successfully on agent {agent_id}", job_id)
+    else:
+        add_log("ERROR", f"Process failed with return code {return_code} on agent {agent_id}", job_id)
+    error = request.error or (None if return_code == 0 else f"Process failed with return code {return_code}")
+    final_job = job_queue.finish(job_id, return_code, error, request.peak_rss_mb, request.cpu_seconds, worker_id=agent_id)
+
+    started = datetime.fromisoformat(final_job["started_at"]).timestamp() if final_job.get("started_at") else time.time()
+    runner_metrics.observe_job(final_job["pipeline"], final_job["status"], time.time() - started, request.peak_rss_mb)
+    progress_tracker.finish(job_id, final_job["status"])
+    release_job_resources(job_id)
+    process_job_outcome(job_id, final_job)
+    dispatch_wakeup.set()
+    return {"job_id": job_id, "status": final_job["status"]}
+
+
 # === EXPERIMENT CRUD ENDPOINTS ===
 
 @app.get("/experiments")
@@ -381,7 +1209,8 @@ async def get_experiment_by_ids():
     try:
         # Direkt auf die experiments Tabelle zugreifen
         try:
-            json_db.maybe_reload()
+            with runner_metrics.time_json_db("reload"):
+                json_db.maybe_reload()
         except Exception:
             pass
         experiments = json_db.data.get("tables", {}).get("experiments", {}).get("records", [])
@@ -414,7 +1243,8 @@ async def get_experiment_by_id(experiment_id: int):
     
     try:
         try:
-            json_db.maybe_reload()
+            with runner_metrics.time_json_db("reload"):
+                json_db.maybe_reload()
         except Exception:
             pass
         experiment = json_db.get_experiment_by_id(experiment_id)
@@ -484,7 +1314,8 @@ async def create_experiment(experiment: ExperimentCreate):
             feature_set=experiment.feature_set,
             file_ids=experiment.id_files
         )
-        json_db.save()  # Wichtig: Änderungen persistent speichern!
+        with runner_metrics.time_json_db("save"):
+            json_db.save()  # Wichtig: Änderungen persistent speichern!
         experiment_data["experiment_id"] = experiment_id
         
         add_log("INFO", f"Experiment created: {experiment.experiment_name} (ID: {experiment_id})", None)
@@ -556,7 +1387,8 @@ async def delete_experiment(experiment_id: int, cascade: bool = False):
             raise HTTPException(status_code=400, detail="Cascade deletion required")
         
         json_db.delete_experiment(experiment_id, cascade=True)
-        json_db.save()  # Änderungen persistent speichern!
+        with runner_metrics.time_json_db("save"):
+            json_db.save()  # Änderungen persistent speichern!
         add_log("INFO", f"Experiment deleted: {existing.get('experiment_name')} (ID: {experiment_id})", None)
         return {"message": f"Experiment {experiment_id} deleted successfully"}
         
@@ -570,10 +1402,14 @@ class ExperimentRunRequest(BaseModel):
     pipeline: str
     cutoff_exclusive: Optional[str] = None
     test: Optional[bool] = False
+    sample_seed: Optional[int] = None
+    priority: Optional[int] = 0
+    max_retries: Optional[int] = 0
+    force: Optional[bool] = False
 
 
 @app.post("/experiments/{experiment_id}/run")
-async def run_experiment_pipeline(experiment_id: int, request: ExperimentRunRequest, background_tasks: BackgroundTasks):
+async def run_experiment_pipeline(experiment_id: int, request: ExperimentRunRequest):
     """Pipeline für spezifisches Experiment ausführen"""
     if not json_db:
         raise HTTPException(status_code=500, detail="JSON-DB not available")
@@ -600,26 +1436,35 @@ async def run_experiment_pipeline(experiment_id: int, request: ExperimentRunRequ
                 training_to=format_date(experiment.get("training_to"), "2023-12"),
                 test_from=format_date(experiment.get("backtest_from"), "2024-01"),
                 test_to=format_date(experiment.get("backtest_to"), "2024-06"),
-                test_reduction=(0.9 if (getattr(request, 'test', False) or False) else 0.0)
+                test_reduction=(0.9 if (getattr(request, 'test', False) or False) else 0.0),
+                sample_seed=request.sample_seed,
+                priority=request.priority,
+                max_retries=request.max_retries,
+                force=request.force
             )
-            return await run_churn(churn_request, background_tasks)
+            return await run_churn(churn_request)
             
         elif request.pipeline == "cox":
             # Cox-Pipeline mit Experiment-Daten
             cox_request = CoxRunRequest(
                 experiment_id=experiment_id,
-                cutoff_exclusive=request.cutoff_exclusive or experiment.get("backtest_from", "202401")
+                cutoff_exclusive=request.cutoff_exclusive or experiment.get("backtest_from", "202401"),
+                priority=request.priority,
+                max_retries=request.max_retries,
+                force=request.force
             )
-            return await run_cox(cox_request, background_tasks)
+            return await run_cox(cox_request)
             
         elif request.pipeline == "cf":
             # Counterfactuals-Pipeline mit Experiment-Daten
             cf_request = CounterfactualsRunRequest(
                 experiment_id=experiment_id,
                 sample=None,
-                limit=None
+                limit=None,
+                priority=request.priority,
+                max_retries=request.max_retries
             )
-            return await run_counterfactuals(cf_request, background_tasks)
+            return await run_counterfactuals(cf_request)
             
         else:
             raise HTTPException(status_code=400, detail=f"Unknown pipeline: {request.pipeline}")
@@ -630,6 +1475,117 @@ async def run_experiment_pipeline(experiment_id: int, request: ExperimentRunRequ
         raise HTTPException(status_code=500, detail=f"Failed to run experiment pipeline: {str(e)}")
 
 
+
+class RunAllRequest(BaseModel):
+    cutoff_exclusive: Optional[str] = None
+    test: Optional[bool] = False
+    sample_seed: Optional[int] = None
+    priority: Optional[int] = 0
+    max_retries: Optional[int] = 0
+    force: Optional[bool] = False
+
+
+class BatchRunAllRequest(RunAllRequest):
+    experiment_ids: List[int]
+
+
+def submit_experiment_dag(experiment_id: int, experiment: Dict, request: RunAllRequest) -> Dict:
+    """Churn ∥ Cox → CF als abhängige Jobs einreihen (CF startet, sobald beide erfolgreich sind)"""
+    group_id = f"runall_{experiment_id}_{int(time.time())}_{uuid.uuid4().hex[:6]}"
+    churn_job = submit_job(
+        "churn",
+        experiment_id,
+        {"experiment_id": experiment_id, **churn_test_params(0.9 if request.test else 0.0, request.sample_seed)},
+        request.priority,
+        request.max_retries,
+        group_id=group_id,
+        force=request.force,
+    )
+    cox_job = submit_job(
+        "cox",
+        experiment_id,
+        {
+            "experiment_id": experiment_id,
+            "cutoff_exclusive": request.cutoff_exclusive or experiment.get("backtest_from", "202401"),
+        },
+        request.priority,
+        request.max_retries,
+        group_id=group_id,
+        force=request.force,
+    )
+    cf_job = submit_job(
+        "cf",
+        experiment_id,
+        {"experiment_id": experiment_id, "sample": None, "limit": None},
+        request.priority,
+        request.max_retries,
+        depends_on=[churn_job["job_id"], cox_job["job_id"]],
+        group_id=group_id,
+    )
+    return {
+        "group_id": group_id,
+        "experiment_id": experiment_id,
+        "jobs": {
+            "churn": churn_job["job_id"],
+            "cox": cox_job["job_id"],
+            "cf": cf_job["job_id"],
+        },
+        "cache_hits": {
+            "churn": bool(churn_job["cache_hit"]),
+            "cox": bool(cox_job["cache_hit"]),
+        },
+    }
+
+
+def load_experiment_or_404(experiment_id: int) -> Dict:
+    if not json_db:
+        raise HTTPException(status_code=500, detail="JSON-DB not available")
+    try:
+        with runner_metrics.time_json_db("reload"):
+            json_db.maybe_reload()
+    except Exception:
+        pass
+    experiment = json_db.get_experiment_by_id(experiment_id)
+    if not experiment:
+        raise HTTPException(status_code=404, detail=f"Experiment {experiment_id} not found")
+    return experiment
+
+
+@app.post("/experiments/{experiment_id}/run-all")
+async def run_experiment_all(experiment_id: int, request: RunAllRequest):
+    """Alle Pipelines eines Experiments als DAG einreihen (churn ∥ cox → cf)"""
+    experiment = load_experiment_or_404(experiment_id)
+    return submit_experiment_dag(experiment_id, experiment, request)
+
+
+@app.post("/experiments/run-all")
+async def run_experiments_all(request: BatchRunAllRequest):
+    """DAG-Runs für mehrere Experimente einreihen; unabhängige Experimente laufen parallel"""
+    if not request.experiment_ids:
+        raise HTTPException(status_code=400, detail="experiment_ids must not be empty")
+    # Erst alle Experimente prüfen, damit ein ungültiger Eintrag keinen Teil-Batch hinterlässt
+    experiments = {experiment_id: load_experiment_or_404(experiment_id) for experiment_id in request.experiment_ids}
+    runs = [submit_experiment_dag(experiment_id, experiment, request) for experiment_id, experiment in experiments.items()]
+    return {"runs": runs, "count": len(runs)}
+
+
+@app.get("/runs/{group_id}")
+async def get_run_status(group_id: str):
+    """Status eines DAG-Runs (alle Jobs der Gruppe)"""
+    jobs = job_queue.list_group(group_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail="Run not found")
+    statuses = [job["status"] for job in jobs]
+    if all(status == SUCCEEDED for status in statuses):
+        overall = SUCCEEDED
+    elif all(status in FINAL_STATES for status in statuses):
+        overall = "failed"
+    elif any(status == RUNNING for status in statuses):
+        overall = "running"
+    else:
+        overall = "queued"
+    return {"group_id": group_id, "status": overall, "jobs": jobs}
+
 if __name__ == "__main__":
     import uvicorn
     
@@ -638,6 +1594,9 @@ if __name__ == "__main__":
     ProjectPaths.ensure_directory_exists(ProjectPaths.dynamic_system_outputs_directory())
     
     add_log("INFO", "Runner Service starting up", None)
+    removed_logs = job_logs.cleanup()
+    if removed_logs:
+        add_log("INFO", f"Log retention removed {removed_logs} expired job logs", None)
     
     uvicorn.run(
         "app:app",
@@ -0,0 +1,308 @@
+"""
+Job Log Storage - Persistente, rotierende Log-Ablage pro Job
+
+Aufbau je Job (`<runner_logs>/<job_id>/`):
+- `segment_000001.log.gz`  → Append-only Folge von gzip-Members (je Member ein Block JSONL-Zeilen)
+- `segment_000001.idx`     → Binärer Index, ein Eintrag pro Block:
+                             (first_seq, last_seq, first_ts, last_ts, offset, length)
+
+Bereichsabfragen (Sequenznummer oder Zeitstempel) lesen nur die betroffenen
+Blöcke über den Byte-Offset aus dem Index – die Segmentdatei wird nicht gescannt.
+"""
+
+from __future__ import annotations
+
+import bisect
+import gzip
+import json
+import logging
+import shutil
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# first_seq, last_seq, first_ts, last_ts, offset, length
+_INDEX_ENTRY = struct.Struct("<QQddQQ")
+
+
+class _SegmentIndex:
+    """Im Speicher gehaltener Index eines Segments (klein: ein Eintrag pro Block)."""
+
+    def __init__(self, segment_no: int, log_path: Path, idx_path: Path):
+        self.segment_no = segment_no
+        self.log_path = log_path
+        self.idx_path = idx_path
+        self.entries: List[Tuple[int, int, float, float, int, int]] = []
+        if idx_path.exists():
+            raw = idx_path.read_bytes()
+            # Abgeschnittene Einträge (Absturz während des Schreibens) ignorieren
+            usable = len(raw) - (len(raw) % _INDEX_ENTRY.size)
+            self.entries = [e for e in _INDEX_ENTRY.iter_unpack(raw[:usable])]
+
+    @property
+    def size_bytes(self) -> int:
+        if not self.entries:
+            return 0
+        last = self.entries[-1]
+        return last[4] + last[5]
+
+    @property
+    def first_seq(self) -> int:
+        return self.entries[0][0] if self.entries else 0
+
+    @property
+    def last_seq(self) -> int:
+        return self.entries[-1][1] if self.entries else 0
+
+
+class _JobLog:
+    """Schreib-/Lesezustand eines einzelnen Jobs."""
+
+    def __init__(self, job_dir: Path):
+        self.job_dir = job_dir
+        self.segments: List[_SegmentIndex] = []
+        for idx_path in sorted(job_dir.glob("segment_*.idx")):
+            segment_no = int(idx_path.stem.split("_")[1])
+            log_path = job_dir / f"segment_{segment_no:06d}.log.gz"
+            self.segments.append(_SegmentIndex(segment_no, log_path, idx_path))
+        self.next_seq = (self.segments[-1].last_seq + 1) if self.segments and self.segments[-1].entries else 1
+        self.buffer: List[Dict] = []
+        self.buffer_started_at: Optional[float] = None
+
+
+def _parse_timestamp(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+class JobLogStorage:
+    """
+    Persistente Log-Ablage pro Job mit segmentierten, komprimierten Dateien.
+
+    Schreibzugriffe werden blockweise gepuffert (`block_records`/`flush_interval`);
+    Lesezugriffe flushen den Puffer vorher, sodass laufende Jobs vollständig lesbar sind.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        segment_max_bytes: int = 8 * 1024 * 1024,
+        block_records: int = 200,
+        flush_interval: float = 2.0,
+        retention_days: float = 14.0,
+        max_total_bytes: int = 0,
+    ):
+        self.root = Path(root)
+        self.segment_max_bytes = segment_max_bytes
+        self.block_records = block_records
+        self.flush_interval = flush_interval
+        self.retention_days = retention_days
+        self.max_total_bytes = max_total_bytes
+        self._jobs: Dict[str, _JobLog] = {}
+        self._lock = threading.RLock()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    # -------------------------
+    # Schreiben
+    # -------------------------
+
+    def append(self, job_id: str, entry: Dict) -> int:
+        """Log-Eintrag anhängen und vergebene Sequenznummer zurückgeben."""
+        with self._lock:
+            job = self._job(job_id)
+            seq = job.next_seq
+            job.next_seq += 1
+            job.buffer.append(dict(entry, seq=seq))
+            if job.buffer_started_at is None:
+                job.buffer_started_at = time.time()
+            if (len(job.buffer) >= self.block_records
+                    or time.time() - job.buffer_started_at >= self.flush_interval):
+                self._flush_job(job)
+            return seq
+
+    def flush(self, job_id: Optional[str] = None) -> None:
+        with self._lock:
+            if job_id is None:
+                jobs = list(self._jobs.values())
+            else:
+                jobs = [self._jobs[job_id]] if job_id in self._jobs else []
+            for job in jobs:
+                self._flush_job(job)
+
+    def close(self, job_id: str) -> None:
+        """Puffer schreiben und Job aus dem Schreib-Cache entfernen (Job beendet)."""
+        with self._lock:
+            job = self._jobs.pop(job_id, None)
+            if job is not None:
+                self._flush_job(job)
+
+    def _job(self, job_id: str) -> _JobLog:
+        job = self._jobs.get(job_id)
+        if job is None:
+            job_dir = self._job_dir(job_id)
+            job_dir.mkdir(parents=True, exist_ok=True)
+            job = _JobLog(job_dir)
+            self._jobs[job_id] = job
+        return job
+
+    def _job_dir(self, job_id: str) -> Path:
+        # Job-IDs stammen aus generate_job_id; Pfadtrenner trotzdem neutralisieren
+        safe_id = job_id.replace("/", "_").replace("\\", "_")
+        return self.root / safe_id
+
+    def _flush_job(self, job: _JobLog) -> None:
+        if not job.buffer:
+            return
+        block = job.buffer
+        job.buffer = []
+        job.buffer_started_at = None
+
+        payload = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in block).encode("utf-8")
+        member = gzip.compress(payload)
+
+        segment = job.segments[-1] if job.segments else None
+        if segment is None or segment.size_bytes >= self.segment_max_bytes:
+            segment_no = (segment.segment_no + 1) if segment else 1
+            segment = _SegmentIndex(
+                segment_no,
+                job.job_dir / f"segment_{segment_no:06d}.log.gz",
+                job.job_dir / f"segment_{segment_no:06d}.idx",
+            )
+            job.segments.append(segment)
+
+        offset = segment.size_bytes
+        with open(segment.log_path, "ab") as fh:
+            # Nach Absturz kann die Datei länger sein als der Index → auf Indexstand kürzen
+            if fh.tell() != offset:
+                fh.truncate(offset)
+                fh.seek(offset)
+            fh.write(member)
+
+        entry = (
+            int(block[0]["seq"]),
+            int(block[-1]["seq"]),
+            _parse_timestamp(block[0]["timestamp"]),
+            _parse_timestamp(block[-1]["timestamp"]),
+            offset,
+            len(member),
+        )
+        with open(segment.idx_path, "ab") as fh:
+            fh.write(_INDEX_ENTRY.pack(*entry))
+        segment.entries.append(entry)
+
+    # -------------------------
+    # Lesen
+    # -------------------------
+
+    def read(
+        self,
+        job_id: str,
+        from_seq: Optional[int] = None,
+        to_seq: Optional[int] = None,
+        from_ts: Optional[float] = None,
+        to_ts: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict]:
+        """Log-Einträge eines Jobs im Bereich [from, to] lesen (Grenzen inklusiv)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._flush_job(job)
+            else:
+                job_dir = self._job_dir(job_id)
+                if not job_dir.exists():
+                    return []
+                job = _JobLog(job_dir)
+
+        results: List[Dict] = []
+        for segment in job.segments:
+            if not segment.entries:
+                continue
+            for block in self._blocks_in_range(segment, from_seq, to_seq, from_ts, to_ts):
+                for entry in self._read_block(segment, block):
+                    if from_seq is not None and entry["seq"] < from_seq:
+                        continue
+                    if to_seq is not None and entry["seq"] > to_seq:
+                        return results
+                    ts = _parse_timestamp(entry["timestamp"])
+                    if from_ts is not None and ts < from_ts:
+                        continue
+                    if to_ts is not None and ts > to_ts:
+                        return results
+                    results.append(entry)
+                    if limit is not None and len(results) >= limit:
+                        return results
+        return results
+
+    def exists(self, job_id: str) -> bool:
+        return job_id in self._jobs or self._job_dir(job_id).exists()
+
+    @staticmethod
+    def _blocks_in_range(
+        segment: _SegmentIndex,
+        from_seq: Optional[int],
+        to_seq: Optional[int],
+        from_ts: Optional[float],
+        to_ts: Optional[float],
+    ) -> List[Tuple[int, int, float, float, int, int]]:
+        entries = segment.entries
+        start = 0
+        if from_seq is not None:
+            # Erster Block, dessen last_seq >= from_seq
+            start = bisect.bisect_left([e[1] for e in entries], from_seq)
+        if from_ts is not None:
+            # Zeitstempel sind innerhalb eines Jobs monoton → ebenfalls binär suchbar
+            start = max(start, bisect.bisect_left([e[3] for e in entries], from_ts))
+        end = len(entries)
+        if to_seq is not None:
+            end = min(end, bisect.bisect_right([e[0] for e in entries], to_seq))
+        if to_ts is not None:
+            end = min(end, bisect.bisect_right([e[2] for e in entries], to_ts))
+        return entries[start:end]
+
+    @staticmethod
+    def _read_block(segment: _SegmentIndex, block: Tuple[int, int, float, float, int, int]) -> List[Dict]:
+        offset, length = block[4], block[5]
+        with open(segment.log_path, "rb") as fh:
+            fh.seek(offset)
+            member = fh.read(length)
+        lines = gzip.decompress(member).decode("utf-8").splitlines()
+        return [json.loads(line) for line in lines if line]
+
+    # -------------------------
+    # Retention
+    # -------------------------
+
+    def cleanup(self) -> int:
+        """Abgelaufene Job-Logs entfernen (Alter und optional Gesamtgröße). Liefert Anzahl gelöschter Jobs."""
+        with self._lock:
+            active = {self._job_dir(job_id) for job_id in self._jobs}
+            job_dirs = []
+            for job_dir in self.root.iterdir():
+                if not job_dir.is_dir() or job_dir in active:
+                    continue
+                files = list(job_dir.iterdir())
+                mtime = max((f.stat().st_mtime for f in files), default=job_dir.stat().st_mtime)
+                size = sum(f.stat().st_size for f in files)
+                job_dirs.append((mtime, size, job_dir))
+
+            removed = 0
+            cutoff = time.time() - self.retention_days * 86400 if self.retention_days > 0 else None
+            total_bytes = sum(size for _, size, _ in job_dirs)
+            # Älteste zuerst entfernen
+            for mtime, size, job_dir in sorted(job_dirs):
+                expired = cutoff is not None and mtime < cutoff
+                over_budget = self.max_total_bytes > 0 and total_bytes > self.max_total_bytes
+                if not (expired or over_budget):
+                    continue
+                try:
+                    shutil.rmtree(job_dir)
+                    total_bytes -= size
+                    removed += 1
+                except OSError as e:
+                    logger.warning(f"Log-Retention: {job_dir} konnte nicht entfernt werden: {e}")
+            return removed
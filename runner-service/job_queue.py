@@ -0,0 +1,450 @@
+"""
+Job Queue - Persistente Warteschlange für Pipeline-Jobs (SQLite)
+
+Zustände: queued → running → succeeded | failed | cancelled
+- Prioritäten (höher zuerst, danach FIFO)
+- Concurrency-Limits pro Pipeline (werden beim Claim geprüft)
+- Retries: fehlgeschlagene Jobs werden bis `max_retries` erneut eingereiht
+- Nach Neustart werden unterbrochene `running`-Jobs wieder eingereiht
+- Fingerprints: erfolgreiche Läufe sind über ihren Fingerprint auffindbar; Cache-Treffer werden
+  direkt als `succeeded` (mit `cached_from`) verbucht
+- Abhängigkeiten (`depends_on`): ein Job startet erst, wenn alle Vorgänger `succeeded` sind;
+  scheitert ein Vorgänger endgültig, wird der Job (und transitiv seine Nachfolger) abgebrochen
+- Leases: Worker-Agenten (auch auf anderen Knoten) leasen Jobs (`worker_id`, `lease_expires_at`)
+  und verlängern sie per Heartbeat; abgelaufene Leases werden wieder eingereiht
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINAL_STATES = (SUCCEEDED, FAILED, CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id        TEXT PRIMARY KEY,
+    pipeline      TEXT NOT NULL,
+    experiment_id INTEGER,
+    params        TEXT NOT NULL,
+    status        TEXT NOT NULL,
+    priority      INTEGER NOT NULL DEFAULT 0,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    max_retries   INTEGER NOT NULL DEFAULT 0,
+    return_code   INTEGER,
+    error         TEXT,
+    created_at    TEXT NOT NULL,
+    queued_at     TEXT NOT NULL,
+    started_at    TEXT,
+    finished_at   TEXT,
+    depends_on    TEXT NOT NULL DEFAULT '[]',
+    group_id      TEXT,
+    peak_rss_mb   REAL,
+    cpu_seconds   REAL,
+    fingerprint   TEXT,
+    cache_hit     INTEGER NOT NULL DEFAULT 0,
+    cached_from   TEXT,
+    worker_id     TEXT,
+    lease_expires_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_priority ON jobs (status, priority DESC, queued_at);
+
+CREATE TABLE IF NOT EXISTS agents (
+    agent_id      TEXT PRIMARY KEY,
+    name          TEXT NOT NULL,
+    host          TEXT,
+    pipelines     TEXT NOT NULL,
+    slots         INTEGER NOT NULL DEFAULT 1,
+    registered_at TEXT NOT NULL,
+    last_seen     REAL NOT NULL
+);
+"""
+
+
+class JobQueue:
+    """Thread-sichere, dateibasierte Job-Queue."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Spalten späterer Versionen in bestehenden Queue-Dateien ergänzen."""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)").fetchall()}
+        if "depends_on" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN depends_on TEXT NOT NULL DEFAULT '[]'")
+        if "group_id" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN group_id TEXT")
+        if "peak_rss_mb" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN peak_rss_mb REAL")
+        if "cpu_seconds" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN cpu_seconds REAL")
+        if "fingerprint" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN fingerprint TEXT")
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN cache_hit INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN cached_from TEXT")
+        if "worker_id" not in columns:
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN worker_id TEXT")
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN lease_expires_at REAL")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_fingerprint ON jobs (fingerprint, status)")
+
+    # -------------------------
+    # Schreiben
+    # -------------------------
+
+    def submit(
+        self,
+        job_id: str,
+        pipeline: str,
+        experiment_id: Optional[int],
+        params: Dict[str, Any],
+        priority: int = 0,
+        max_retries: int = 0,
+        depends_on: Optional[List[str]] = None,
+        group_id: Optional[str] = None,
+        fingerprint: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, pipeline, experiment_id, params, status, priority, max_retries, "
+                "created_at, queued_at, depends_on, group_id, fingerprint) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id, pipeline, experiment_id, json.dumps(params), QUEUED, int(priority), int(max_retries),
+                    now, now, json.dumps(list(depends_on or [])), group_id, fingerprint,
+                ),
+            )
+        return self.get(job_id)
+
+    def record_cache_hit(
+        self,
+        job_id: str,
+        pipeline: str,
+        experiment_id: Optional[int],
+        params: Dict[str, Any],
+        fingerprint: str,
+        cached_from: str,
+        group_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Job ohne Ausführung als erfolgreich verbuchen (Ergebnis eines früheren Laufs wiederverwendet)."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, pipeline, experiment_id, params, status, return_code, created_at, "
+                "queued_at, started_at, finished_at, group_id, fingerprint, cache_hit, cached_from) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?, ?, ?, ?, ?, ?, 1, ?)",
+                (
+                    job_id, pipeline, experiment_id, json.dumps(params), SUCCEEDED,
+                    now, now, now, now, group_id, fingerprint, cached_from,
+                ),
+            )
+        return self.get(job_id)
+
+    def claim_next(
+        self,
+        running_counts: Dict[str, int],
+        limits: Dict[str, int],
+        admit: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = 0.0,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Nächsten ausführbaren Job auf `running` setzen und zurückgeben.
+
+        Pipelines, deren Limit (`limits[pipeline]`) erreicht ist, werden übersprungen,
+        sodass ein voller Churn-Slot keine Cox-/CF-Jobs blockiert. Jobs mit offenen
+        Abhängigkeiten werden übersprungen, mit gescheiterten Abhängigkeiten abgebrochen.
+        `admit` (z. B. Ressourcenbudget) kann einzelne Jobs zurückstellen; sie bleiben `queued`.
+        Mit `worker_id` wird der Job an einen Agenten verleast (Ablauf nach `lease_seconds`).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? ORDER BY priority DESC, queued_at ASC",
+                (QUEUED,),
+            ).fetchall()
+            for row in rows:
+                if not self._dependencies_satisfied(row):
+                    continue
+                pipeline = row["pipeline"]
+                limit = limits.get(pipeline)
+                if limit is not None and running_counts.get(pipeline, 0) >= limit:
+                    continue
+                if admit is not None and not admit(self._to_dict(row)):
+                    continue
+                now = datetime.now().isoformat()
+                lease_expires_at = time.time() + lease_seconds if worker_id else None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1, return_code = NULL, error = NULL, "
+                    "worker_id = ?, lease_expires_at = ? WHERE job_id = ? AND status = ?",
+                    (RUNNING, now, worker_id, lease_expires_at, row["job_id"], QUEUED),
+                )
+                return self.get(row["job_id"])
+        return None
+
+    def finish(
+        self,
+        job_id: str,
+        return_code: int,
+        error: Optional[str] = None,
+        peak_rss_mb: Optional[float] = None,
+        cpu_seconds: Optional[float] = None,
+        worker_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Ergebnis eines Laufs verbuchen; bei Fehler ggf. erneut einreihen."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            job = self.get(job_id)
+            if job is None or job["status"] != RUNNING:
+                # z. B. bereits abgebrochen → Status nicht überschreiben
+                return job
+            if worker_id is not None and job["worker_id"] != worker_id:
+                # Lease abgelaufen und neu vergeben → verspätetes Ergebnis verwerfen
+                return job
+            if return_code == 0:
+                status = SUCCEEDED
+            elif job["attempts"] <= job["max_retries"]:
+                status = QUEUED
+            else:
+                status = FAILED
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, return_code = ?, error = ?, finished_at = ?, "
+                "peak_rss_mb = ?, cpu_seconds = ?, "
+                "queued_at = CASE WHEN ? = 'queued' THEN ? ELSE queued_at END WHERE job_id = ?",
+                (status, return_code, error, now, peak_rss_mb, cpu_seconds, status, now, job_id),
+            )
+        return self.get(job_id)
+
+    def _dependencies_satisfied(self, row: sqlite3.Row) -> bool:
+        """True, wenn alle Vorgänger erfolgreich sind; bricht den Job ab, wenn einer endgültig scheiterte."""
+        depends_on = json.loads(row["depends_on"] or "[]")
+        if not depends_on:
+            return True
+        placeholders = ",".join("?" for _ in depends_on)
+        statuses = {
+            r["job_id"]: r["status"]
+            for r in self._conn.execute(
+                f"SELECT job_id, status FROM jobs WHERE job_id IN ({placeholders})", depends_on
+            ).fetchall()
+        }
+        blocking = [job_id for job_id in depends_on if statuses.get(job_id) in (FAILED, CANCELLED, None)]
+        if blocking:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE job_id = ? AND status = ?",
+                (
+                    CANCELLED,
+                    f"Dependency not satisfied: {', '.join(blocking)}",
+                    datetime.now().isoformat(),
+                    row["job_id"],
+                    QUEUED,
+                ),
+            )
+            return False
+        return all(statuses.get(job_id) == SUCCEEDED for job_id in depends_on)
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job abbrechen (queued oder running). Finale Jobs bleiben unverändert."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ? WHERE job_id = ? AND status IN (?, ?)",
+                (CANCELLED, datetime.now().isoformat(), job_id, QUEUED, RUNNING),
+            )
+        return self.get(job_id)
+
+    def recover_interrupted(self) -> int:
+        """Beim Start: durch Neustart unterbrochene lokale Jobs wieder einreihen (Leases laufen weiter)."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = ?, queued_at = ?, attempts = MAX(attempts - 1, 0) "
+                "WHERE status = ? AND worker_id IS NULL",
+                (QUEUED, datetime.now().isoformat(), RUNNING),
+            )
+            return cur.rowcount
+
+    # -------------------------
+    # Leases (Worker-Agenten)
+    # -------------------------
+
+    def renew_lease(self, job_id: str, worker_id: str, lease_seconds: float) -> bool:
+        """Lease verlängern; False, wenn der Agent den Job nicht mehr hält (abgebrochen/neu vergeben)."""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE job_id = ? AND worker_id = ? AND status = ?",
+                (time.time() + lease_seconds, job_id, worker_id, RUNNING),
+            )
+            return cur.rowcount == 1
+
+    def holds_lease(self, job_id: str, worker_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM jobs WHERE job_id = ? AND worker_id = ? AND status = ?",
+                (job_id, worker_id, RUNNING),
+            ).fetchone()
+        return row is not None
+
+    def expire_leases(self) -> List[Dict[str, Any]]:
+        """Jobs mit abgelaufener Lease wieder einreihen (Agent ausgefallen); der Versuch zählt nicht."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status = ? AND worker_id IS NOT NULL AND lease_expires_at < ?",
+                (RUNNING, time.time()),
+            ).fetchall()
+            for row in rows:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, queued_at = ?, attempts = MAX(attempts - 1, 0), "
+                    "error = ?, worker_id = NULL, lease_expires_at = NULL WHERE job_id = ? AND status = ?",
+                    (QUEUED, now, f"Lease of agent {row['worker_id']} expired", row["job_id"], RUNNING),
+                )
+        return [self._to_dict(row) for row in rows]
+
+    def leased_jobs(self, worker_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE worker_id = ? AND status = ?", (worker_id, RUNNING)
+            ).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def register_agent(self, name: str, host: Optional[str], pipelines: List[str], slots: int) -> Dict[str, Any]:
+        agent_id = f"{name}-{uuid.uuid4().hex[:8]}"
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO agents (agent_id, name, host, pipelines, slots, registered_at, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (agent_id, name, host, json.dumps(list(pipelines)), int(slots), datetime.now().isoformat(), time.time()),
+            )
+        return self.get_agent(agent_id)
+
+    def touch_agent(self, agent_id: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute("UPDATE agents SET last_seen = ? WHERE agent_id = ?", (time.time(), agent_id))
+            return cur.rowcount == 1
+
+    def get_agent(self, agent_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM agents WHERE agent_id = ?", (agent_id,)).fetchone()
+        return self._agent_to_dict(row) if row else None
+
+    def list_agents(self, seen_within: Optional[float] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            if seen_within is None:
+                rows = self._conn.execute("SELECT * FROM agents ORDER BY registered_at").fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM agents WHERE last_seen >= ? ORDER BY registered_at", (time.time() - seen_within,)
+                ).fetchall()
+        return [self._agent_to_dict(r) for r in rows]
+
+    def remove_agents(self, unseen_for: float) -> int:
+        """Agenten ohne Heartbeat seit `unseen_for` Sekunden und ohne Leases entfernen."""
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM agents WHERE last_seen < ? AND agent_id NOT IN "
+                "(SELECT worker_id FROM jobs WHERE status = ? AND worker_id IS NOT NULL)",
+                (time.time() - unseen_for, RUNNING),
+            )
+            return cur.rowcount
+
+    # -------------------------
+    # Lesen
+    # -------------------------
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def list_group(self, group_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE group_id = ? ORDER BY created_at ASC", (group_id,)
+            ).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def list(self, status: Optional[str] = None, limit: int = 200) -> List[Dict[str, Any]]:
+        with self._lock:
+            if status:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?", (status, limit)
+                ).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+                ).fetchall()
+        return [self._to_dict(r) for r in rows]
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """1-basierte Position in der Warteschlange (None, wenn nicht `queued`)."""
+        with self._lock:
+            job = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if job is None or job["status"] != QUEUED:
+                return None
+            ahead = self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = ? AND "
+                "(priority > ? OR (priority = ? AND queued_at < ?))",
+                (QUEUED, job["priority"], job["priority"], job["queued_at"]),
+            ).fetchone()[0]
+        return int(ahead) + 1
+
+    def find_succeeded(self, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """Jüngster tatsächlich ausgeführter, erfolgreicher Lauf mit diesem Fingerprint."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE fingerprint = ? AND status = ? AND cache_hit = 0 "
+                "ORDER BY finished_at DESC LIMIT 1",
+                (fingerprint, SUCCEEDED),
+            ).fetchone()
+        return self._to_dict(row) if row else None
+
+    def recent_peaks(self, pipeline: str, limit: int = 5) -> List[float]:
+        """Spitzen-RSS (MB) der letzten erfolgreichen Läufe einer Pipeline."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT peak_rss_mb FROM jobs WHERE pipeline = ? AND status = ? AND peak_rss_mb IS NOT NULL "
+                "ORDER BY finished_at DESC LIMIT ?",
+                (pipeline, SUCCEEDED, limit),
+            ).fetchall()
+        return [float(r["peak_rss_mb"]) for r in rows]
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status").fetchall()
+        return {r["status"]: r["n"] for r in rows}
+
+    @staticmethod
+    def _agent_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        agent = dict(row)
+        agent["pipelines"] = json.loads(agent.get("pipelines") or "[]")
+        return agent
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        try:
+            job["params"] = json.loads(job.get("params") or "{}")
+        except ValueError:
+            job["params"] = {}
+        try:
+            job["depends_on"] = json.loads(job.get("depends_on") or "[]")
+        except ValueError:
+            job["depends_on"] = []
+        return job
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+Pipeline Jobs - Einstiegspunkte der BL-Pipelines für den Runner-Service
+
+Wird auf zwei Wegen genutzt:
+- Kalt: `python pipeline_jobs.py <pipeline> '<params-json>'` als eigener Subprozess
+- Warm: von `worker_pool.py` in langlebigen Worker-Prozessen mit vorab geladenen BL-Modulen
+
+Keine Businesslogik – nur Delegation an Churn/Cox/Counterfactuals. Grobe Stages
+(Laden, Verarbeitung, Batch-Fortschritt) werden über `config.job_progress` gemeldet;
+feinere Stages können die BL-Module selbst über denselben Reporter melden.
+
+Churn-Jobs laden rawdata einmal je Job über `config.training_frames` (Feature-Cache) und
+stellen jedem Experiment seinen Periodenausschnitt per `training_frames.current()` bereit.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+# Projekt-Root für config.paths_config
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config import customer_sampling, job_checkpoints, training_frames
+from config.job_progress import reporter
+from config.paths_config import ProjectPaths
+from resource_budget import thread_environment
+
+_BL_DIRECTORIES = (
+    ProjectPaths.bl_churn_directory(),
+    ProjectPaths.bl_cox_directory(),
+    ProjectPaths.bl_counterfactuals_directory(),
+    ProjectPaths.json_database_directory(),
+)
+
+for _directory in _BL_DIRECTORIES:
+    if str(_directory) not in sys.path:
+        sys.path.insert(0, str(_directory))
+
+
+def preload_modules() -> Dict[str, str]:
+    """
+    BL-Module und schwere Abhängigkeiten vorab importieren (Warm-Worker).
+
+    Returns:
+        Fehler je Modul (leer, wenn alles geladen wurde)
+    """
+    errors: Dict[str, str] = {}
+    for module_name in (
+        "bl.json_database.churn_json_database",
+        "bl.Churn.churn_auto_processor",
+        "bl.Cox.cox_auto_processor",
+        "bl.Counterfactuals.counterfactuals_cli",
+    ):
+        try:
+            __import__(module_name)
+        except Exception as e:
+            errors[module_name] = str(e)
+    return errors
+
+
+def _database():
+    from bl.json_database.churn_json_database import ChurnJSONDatabase
+
+    db = ChurnJSONDatabase()
+    # Warm-Worker halten die (Singleton-)Instanz → Änderungen anderer Prozesse nachladen
+    try:
+        db.maybe_reload()
+    except Exception:
+        pass
+    return db
+
+
+def _shared_frame(db, experiments: List[Dict[str, Any]]) -> Optional[training_frames.SharedTrainingFrame]:
+    """
+    rawdata der gemeinsamen `id_files` einmal laden (Fenster: alle Perioden der Experimente).
+
+    Fehler sind nicht fatal: ohne geteilten Frame laden die BL-Module rawdata wie bisher selbst.
+    """
+    from run_cache import input_file_hashes
+
+    id_files = experiments[0].get("id_files") or []
+    if any(sorted(map(str, e.get("id_files") or [])) != sorted(map(str, id_files)) for e in experiments):
+        print("WARNING: Experiments use different id_files; no shared training frame")
+        return None
+    try:
+        tables = db.data.get("tables", {})
+        file_records = tables.get("files", {}).get("records", []) or []
+        shared = training_frames.load_shared_frame(
+            tables.get("rawdata", {}) or {},
+            id_files,
+            experiments,
+            input_hashes=input_file_hashes(id_files, file_records),
+        )
+    except Exception as e:
+        print(f"WARNING: Shared training frame unavailable ({e}); experiments load rawdata themselves")
+        return None
+    print(f"Shared training frame: {len(shared)} rows for id_files {sorted(str(f) for f in id_files)}"
+          + (" (feature cache)" if shared.key else ""))
+    return shared
+
+
+def _experiment_frame(shared: Optional[training_frames.SharedTrainingFrame], experiment: Dict[str, Any]):
+    return shared.for_experiment(experiment) if shared is not None else None
+
+
+def run_churn(params: Dict[str, Any]) -> int:
+    from bl.Churn.churn_auto_processor import ChurnAutoProcessor
+
+    if params.get("experiment_ids"):
+        return run_churn_batch(params)
+
+    progress = reporter()
+    progress.plan(["load", "process"])
+
+    # Lade Experiment aus Datenbank
+    exp_id = int(params["experiment_id"])
+    with progress.stage("load"):
+        db = _database()
+        experiment = db.get_experiment_by_id(exp_id)
+        shared = _shared_frame(db, [experiment]) if experiment else None
+    if not experiment:
+        print("ERROR: Experiment " + str(exp_id) + " not found")
+        progress.error(f"Experiment {exp_id} not found")
+        return 1
+
+    # Verarbeite Experiment
+    test_reduction = float(params.get("test_reduction") or 0.0)
+    with progress.stage("process"), training_frames.activate(_experiment_frame(shared, experiment)):
+        processor = ChurnAutoProcessor()
+        success = processor.process_experiment(experiment, custom_periods=None, test_reduction=test_reduction)
+    if not success:
+        print("ERROR: Processing failed for experiment " + str(exp_id))
+        return 1
+
+    print("SUCCESS: Experiment " + str(exp_id) + " processed successfully")
+    return 0
+
+
+def run_churn_batch(params: Dict[str, Any]) -> int:
+    """
+    Mehrere Churn-Experimente (gleiche `id_files`) nacheinander in einem Prozess ausführen.
+
+    JSON-DB, Processor und rawdata (Vereinigung der Perioden aller Experimente, über den
+    Feature-Cache) werden einmal geladen; jedes Experiment erhält nur seinen Periodenausschnitt.
+    """
+    from bl.Churn.churn_auto_processor import ChurnAutoProcessor
+
+    progress = reporter()
+    checkpoints = job_checkpoints.current()
+    experiment_ids = [int(exp_id) for exp_id in params["experiment_ids"]]
+    progress.plan(["load"] + [f"experiment_{exp_id}" for exp_id in experiment_ids])
+    with progress.stage("load"):
+        db = _database()
+        processor = ChurnAutoProcessor()
+        experiments = {exp_id: db.get_experiment_by_id(exp_id) for exp_id in experiment_ids}
+        # Nur noch offene Experimente bestimmen das Periodenfenster
+        open_experiments = [
+            experiment for exp_id, experiment in experiments.items()
+            if experiment and not (checkpoints is not None and checkpoints.is_completed(f"experiment_{exp_id}"))
+        ]
+        shared = _shared_frame(db, open_experiments) if open_experiments else None
+    test_reduction = float(params.get("test_reduction") or 0.0)
+    failed = []
+    for index, exp_id in enumerate(experiment_ids, start=1):
+        stage = f"experiment_{exp_id}"
+        if checkpoints is not None and checkpoints.is_completed(stage):
+            # Wiederaufnahme: Ergebnis liegt aus dem abgebrochenen Lauf bereits in der Outbox
+            print(f"BATCH: Experiment {exp_id} ({index}/{len(experiment_ids)}) already completed, skipping")
+            progress.skip(stage)
+            continue
+        print(f"BATCH: Experiment {exp_id} ({index}/{len(experiment_ids)})")
+        experiment = experiments[exp_id]
+        if not experiment:
+            print("ERROR: Experiment " + str(exp_id) + " not found")
+            progress.error(f"Experiment {exp_id} not found")
+            failed.append(exp_id)
+            continue
+        try:
+            with progress.stage(stage), training_frames.activate(_experiment_frame(shared, experiment)):
+                success = processor.process_experiment(experiment, custom_periods=None, test_reduction=test_reduction)
+        except Exception as e:
+            print(f"ERROR: Experiment {exp_id} raised {e}")
+            success = False
+        if not success:
+            print("ERROR: Processing failed for experiment " + str(exp_id))
+            progress.error(f"Processing failed for experiment {exp_id}")
+            failed.append(exp_id)
+            continue
+        print("SUCCESS: Experiment " + str(exp_id) + " processed successfully")
+        if checkpoints is not None:
+            checkpoints.save(stage, meta={"experiment_id": exp_id})
+
+    progress.metric("failed_experiments", len(failed))
+    if failed:
+        print(f"ERROR: Batch finished with {len(failed)} failed experiments: {failed}")
+        return 1
+    print(f"SUCCESS: Batch of {len(experiment_ids)} experiments processed successfully")
+    return 0
+
+
+def run_cox(params: Dict[str, Any]) -> int:
+    from bl.Cox.cox_auto_processor import main
+
+    progress = reporter()
+    progress.plan(["load", "process"])
+    with progress.stage("load"):
+        _database()
+    with progress.stage("process"):
+        main(experiment_id=int(params["experiment_id"]), cutoff_exclusive=str(params.get("cutoff_exclusive")))
+    return 0
+
+
+def run_cf(params: Dict[str, Any]) -> int:
+    from bl.Counterfactuals.counterfactuals_cli import main
+
+    progress = reporter()
+    progress.plan(["load", "process"])
+    with progress.stage("load"):
+        _database()
+    with progress.stage("process"):
+        main(experiment_id=int(params["experiment_id"]), sample=params.get("sample"), limit=params.get("limit"))
+    return 0
+
+
+PIPELINES: Dict[str, Callable[[Dict[str, Any]], int]] = {
+    "churn": run_churn,
+    "cox": run_cox,
+    "cf": run_cf,
+}
+
+
+@contextmanager
+def _thread_limits(threads: Optional[int]) -> Iterator[None]:
+    """
+    BLAS/OpenMP-Threads für die Dauer eines Jobs begrenzen.
+
+    ENV-Variablen greifen nur bei noch nicht initialisierten Bibliotheken; in Warm-Workern
+    sind diese bereits geladen, daher zusätzlich threadpoolctl. Warm-Worker laufen weiter →
+    ENV nach dem Job wiederherstellen.
+    """
+    if not threads:
+        yield
+        return
+    variables = thread_environment(threads)
+    previous = {name: os.environ.get(name) for name in variables}
+    os.environ.update(variables)
+    try:
+        try:
+            from threadpoolctl import threadpool_limits
+        except ImportError:
+            yield
+            return
+        with threadpool_limits(limits=threads):
+            yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+@contextmanager
+def _customer_sample(params: Dict[str, Any]) -> Iterator[None]:
+    """
+    Testmodus: Stichprobe (Anteil, Seed) für die Datenzugriffsschicht per ENV bereitstellen.
+
+    Warm-Worker laufen weiter → ENV nach dem Job wiederherstellen.
+    """
+    fraction = customer_sampling.sample_fraction_for_test_reduction(params.get("test_reduction"))
+    if fraction >= 1.0:
+        yield
+        return
+    seed = params.get("sample_seed")
+    seed = int(seed) if seed is not None else customer_sampling.DEFAULT_SEED
+    variables = customer_sampling.sample_environment(fraction, seed)
+    previous = {name: os.environ.get(name) for name in variables}
+    os.environ.update(variables)
+    print(f"Customer sample: {fraction:.0%} (seed {seed})")
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def run_pipeline(
+    pipeline: str,
+    params: Dict[str, Any],
+    threads: Optional[int] = None,
+    job_id: Optional[str] = None,
+) -> int:
+    """
+    Pipeline ausführen und Return-Code liefern (SystemExit der BL-Module wird übersetzt).
+
+    Mit `job_id` stehen den BL-Modulen Stage-Checkpoints zur Verfügung (`job_checkpoints.current()`);
+    `params["resume_from"]` übernimmt die Checkpoints eines abgebrochenen Jobs.
+    """
+    runner = PIPELINES.get(pipeline)
+    if runner is None:
+        print(f"ERROR: Unknown pipeline: {pipeline}")
+        return 2
+    try:
+        with _thread_limits(threads), _customer_sample(params), \
+                job_checkpoints.activate(job_id, resume_from=params.get("resume_from")) as checkpoints:
+            if checkpoints is not None and checkpoints.completed_stages():
+                print(f"Resuming after stage {checkpoints.last_completed()} ({len(checkpoints.completed_stages())} completed)")
+            return int(runner(params) or 0)
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    finally:
+        reporter().flush()
+
+
+def main(argv: list[str]) -> int:
+    if len(argv) != 3:
+        print("Usage: pipeline_jobs.py <churn|cox|cf> '<params-json>'")
+        return 2
+    threads = int(os.environ.get("RUNNER_JOB_THREADS", "0")) or None
+    job_id = os.environ.get("RUNNER_JOB_ID") or None
+    return run_pipeline(argv[1], json.loads(argv[2]), threads=threads, job_id=job_id)
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
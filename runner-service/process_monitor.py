@@ -0,0 +1,185 @@
+"""
+Process Monitor - Periodisches Sampling der Prozessbäume laufender Jobs
+
+Pro Job wird der Prozess (Subprozess bzw. Warm-Worker) inklusive aller Kindprozesse
+erfasst: aktueller und maximaler RSS, CPU-Sekunden und CPU-Auslastung, I/O-Bytes und
+offene Dateien. Kumulative Zähler (CPU, I/O) werden relativ zur Registrierung gezählt,
+damit wiederverwendete Warm-Worker nicht die Vorgänger-Jobs mitrechnen.
+Die letzten Messpunkte je Job werden als Zeitreihe vorgehalten.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import psutil
+except ImportError:  # psutil ist optional; ohne Sampling bleibt das Scheduling rein schätzungsbasiert
+    psutil = None
+
+
+class JobProcessStats:
+    """Gesammelte Messwerte eines Jobs."""
+
+    def __init__(self, pid: int, history: int = 300):
+        self.pid = pid
+        self.started_at = time.time()
+        self.rss_mb = 0.0
+        self.peak_rss_mb = 0.0
+        self.cpu_seconds = 0.0
+        self.cpu_percent = 0.0
+        self.read_bytes = 0
+        self.write_bytes = 0
+        self.open_files = 0
+        self.cpu_baseline: Optional[float] = None
+        self.io_baseline: Optional[tuple] = None
+        self.sampled_at: Optional[float] = None
+        self.samples: Deque[Dict] = deque(maxlen=history)
+
+    def as_dict(self) -> Dict:
+        return {
+            "pid": self.pid,
+            "rss_mb": round(self.rss_mb, 1),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "cpu_seconds": round(self.cpu_seconds, 2),
+            "cpu_percent": round(self.cpu_percent, 1),
+            "read_bytes": self.read_bytes,
+            "write_bytes": self.write_bytes,
+            "open_files": self.open_files,
+            "sampled_at": self.sampled_at,
+        }
+
+    def history(self) -> List[Dict]:
+        return list(self.samples)
+
+
+class ProcessMonitor:
+    """Sampelt in festem Intervall alle von `pid_source` gelieferten Job-Prozesse."""
+
+    def __init__(self, pid_source: Callable[[], Dict[str, int]], interval: float = 1.0, history: int = 300):
+        self.pid_source = pid_source
+        self.interval = interval
+        self.history = history
+        self._stats: Dict[str, JobProcessStats] = {}
+        self._processes: Dict[int, "psutil.Process"] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def available(self) -> bool:
+        return psutil is not None
+
+    def start(self) -> None:
+        if not self.available or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="process-monitor", daemon=True)
+        self._thread.start()
+
+    def register(self, job_id: str, pid: int) -> None:
+        """Job-Prozess sofort erfassen (setzt die CPU-Basis für diesen Job)."""
+        self._sample_job(job_id, pid)
+
+    def stats(self, job_id: str) -> Optional[JobProcessStats]:
+        with self._lock:
+            return self._stats.get(job_id)
+
+    def current_rss_mb(self) -> Dict[str, float]:
+        with self._lock:
+            return {job_id: s.rss_mb for job_id, s in self._stats.items()}
+
+    def release(self, job_id: str) -> Optional[JobProcessStats]:
+        """Job abschließen: letzte Messung durchführen und Messwerte herausgeben."""
+        pids = self.pid_source()
+        if job_id in pids:
+            self._sample_job(job_id, pids[job_id])
+        with self._lock:
+            stats = self._stats.pop(job_id, None)
+        if stats is not None:
+            self._processes.pop(stats.pid, None)
+        return stats
+
+    def _loop(self) -> None:
+        while True:
+            try:
+                self.sample_once()
+            except Exception as e:
+                logger.warning(f"Process sampling failed: {e}")
+            time.sleep(self.interval)
+
+    def sample_once(self) -> None:
+        for job_id, pid in self.pid_source().items():
+            self._sample_job(job_id, pid)
+
+    def _sample_job(self, job_id: str, pid: Optional[int]) -> None:
+        if not self.available or not pid:
+            return
+        with self._lock:
+            stats = self._stats.get(job_id)
+            if stats is None or stats.pid != pid:
+                stats = JobProcessStats(pid, self.history)
+                self._stats[job_id] = stats
+        try:
+            root = self._processes.get(pid)
+            if root is None:
+                root = psutil.Process(pid)
+                self._processes[pid] = root
+            tree = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return
+
+        rss_bytes = 0
+        cpu_seconds = 0.0
+        read_bytes = 0
+        write_bytes = 0
+        open_files = 0
+        for process in tree:
+            try:
+                rss_bytes += process.memory_info().rss
+                times = process.cpu_times()
+                cpu_seconds += times.user + times.system
+            except psutil.Error:
+                continue
+            try:
+                io = process.io_counters()
+                read_bytes += io.read_bytes
+                write_bytes += io.write_bytes
+            except (psutil.Error, AttributeError):
+                # io_counters fehlt z. B. unter macOS
+                pass
+            try:
+                open_files += len(process.open_files())
+            except psutil.Error:
+                pass
+
+        now = time.time()
+        with self._lock:
+            previous_cpu = stats.cpu_seconds
+            previous_at = stats.sampled_at
+            stats.rss_mb = rss_bytes / (1024 * 1024)
+            stats.peak_rss_mb = max(stats.peak_rss_mb, stats.rss_mb)
+            if stats.cpu_baseline is None:
+                stats.cpu_baseline = cpu_seconds
+                stats.io_baseline = (read_bytes, write_bytes)
+            # CPU-Zeit/I/O beendeter Kinder fällt aus dem Baum → nie rückwärts zählen
+            stats.cpu_seconds = max(stats.cpu_seconds, cpu_seconds - stats.cpu_baseline)
+            stats.read_bytes = max(stats.read_bytes, read_bytes - stats.io_baseline[0])
+            stats.write_bytes = max(stats.write_bytes, write_bytes - stats.io_baseline[1])
+            stats.open_files = open_files
+            if previous_at is not None and now > previous_at:
+                # Auslastung über alle Kerne (100 % = ein voll ausgelasteter Kern)
+                stats.cpu_percent = (stats.cpu_seconds - previous_cpu) / (now - previous_at) * 100
+            stats.sampled_at = now
+            stats.samples.append({
+                "ts": now,
+                "rss_mb": round(stats.rss_mb, 1),
+                "cpu_percent": round(stats.cpu_percent, 1),
+                "read_bytes": stats.read_bytes,
+                "write_bytes": stats.write_bytes,
+                "open_files": open_files,
+            })
@@ -0,0 +1,243 @@
+"""
+Process Supervisor - Überwachung von Pipeline-Subprozessen auf einer asyncio-Eventloop
+
+Statt pro Job einen Executor-Thread in `readline()`/`wait()` zu blockieren, laufen alle
+Subprozesse (`asyncio.create_subprocess_exec`) auf einer Eventloop in einem eigenen Thread.
+Ausgabe und Fortschrittskanal werden nicht-blockierend gelesen; die Zahl gleichzeitiger
+Jobs begrenzt damit allein die Scheduling-Policy (Limits, Ressourcenbudget), nicht die Threads.
+
+- Jeder Job startet in einer eigenen Prozessgruppe; Abbruch und Timeout beenden die ganze
+  Gruppe (SIGTERM, nach `grace_seconds` SIGKILL), also auch Kindprozesse der Pipeline
+- Fortschritts-Frames (`config.job_progress`) kommen über eine vererbte Pipe
+- Callbacks (`on_output`, `on_progress`) laufen im Loop-Thread und müssen kurz bleiben
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import logging
+import os
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from config.job_progress import ENV_PROGRESS_FD, read_frames_async
+
+logger = logging.getLogger(__name__)
+
+_STREAM_LIMIT = 16 * 1024 * 1024
+_DRAIN_TIMEOUT = 5.0
+
+
+class SupervisedResult:
+    """Ergebnis eines überwachten Prozesses."""
+
+    def __init__(self, return_code: int, duration: float, timed_out: bool = False, cancelled: bool = False):
+        self.return_code = return_code
+        self.duration = duration
+        self.timed_out = timed_out
+        self.cancelled = cancelled
+
+
+class SupervisedProcess:
+    """Handle eines laufenden Jobs (Popen-ähnlich für `DELETE /jobs/{id}` und Prozess-Sampling)."""
+
+    def __init__(self, supervisor: "ProcessSupervisor", job_id: str, process: asyncio.subprocess.Process):
+        self._supervisor = supervisor
+        self.job_id = job_id
+        self.pid = process.pid
+        self.process = process
+        self.cancelled = False
+        self.future: Optional[concurrent.futures.Future] = None
+
+    def terminate(self) -> None:
+        """Prozessgruppe beenden (thread-sicher, kehrt sofort zurück)."""
+        self.cancelled = True
+        self._supervisor.submit(self._supervisor.kill_group(self))
+
+
+class ProcessSupervisor:
+    """Eventloop-Thread, der beliebig viele Job-Prozesse parallel überwacht."""
+
+    def __init__(self, grace_seconds: float = 10.0):
+        self.grace_seconds = grace_seconds
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready = threading.Event()
+        self._running: Dict[str, SupervisedProcess] = {}
+        self._submitted: Set[concurrent.futures.Future] = set()
+
+    def start(self) -> None:
+        if self._loop is not None:
+            return
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._ready.set()
+            self._loop.run_forever()
+
+        threading.Thread(target=run, name="process-supervisor", daemon=True).start()
+        self._ready.wait()
+
+    def submit(self, coroutine) -> concurrent.futures.Future:
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        # Die Eventloop hält Tasks nur schwach: ohne eigene Referenz kann der GC einen wartenden
+        # Task samt Stream einsammeln (sein `finally` läuft dann in einem fremden Thread)
+        self._submitted.add(future)
+        future.add_done_callback(self._submitted.discard)
+        return future
+
+    @property
+    def running(self) -> int:
+        return len(self._running)
+
+    # -------------------------
+    # Start & Überwachung
+    # -------------------------
+
+    def launch(
+        self,
+        job_id: str,
+        cmd: List[str],
+        cwd: Path,
+        env: Optional[Dict[str, str]],
+        on_output: Callable[[str], None],
+        on_progress: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        timeout: Optional[float] = None,
+    ) -> SupervisedProcess:
+        """
+        Prozess starten und überwachen. Liefert sofort das Handle; `handle.future`
+        wird mit einem `SupervisedResult` erfüllt, sobald Prozess und Ausgaben beendet sind.
+        """
+        progress_read, progress_write = os.pipe()
+        try:
+            handle = self.submit(
+                self._spawn(job_id, cmd, cwd, dict(env if env is not None else os.environ), progress_write)
+            ).result()
+        except Exception:
+            os.close(progress_read)
+            raise
+        finally:
+            os.close(progress_write)
+        handle.future = self.submit(self._supervise(handle, progress_read, on_output, on_progress, timeout))
+        return handle
+
+    async def _spawn(self, job_id: str, cmd: List[str], cwd: Path, env: Dict[str, str], progress_write: int):
+        env[ENV_PROGRESS_FD] = str(progress_write)
+        process = await asyncio.create_subprocess_exec(
+            *cmd,
+            cwd=str(cwd),
+            env=env,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            pass_fds=(progress_write,),
+            start_new_session=True,
+            limit=_STREAM_LIMIT,
+        )
+        handle = SupervisedProcess(self, job_id, process)
+        self._running[job_id] = handle
+        return handle
+
+    async def _supervise(
+        self,
+        handle: SupervisedProcess,
+        progress_read: int,
+        on_output: Callable[[str], None],
+        on_progress: Optional[Callable[[List[Dict[str, Any]]], None]],
+        timeout: Optional[float],
+    ) -> SupervisedResult:
+        started = time.time()
+        process = handle.process
+        readers = [asyncio.ensure_future(self._read_output(handle, on_output))]
+        readers.append(asyncio.ensure_future(self._read_progress(handle, progress_read, on_progress)))
+        timed_out = False
+        try:
+            try:
+                await asyncio.wait_for(process.wait(), timeout=timeout or None)
+            except asyncio.TimeoutError:
+                timed_out = True
+                logger.warning(f"[{handle.job_id}] Timeout after {timeout:.0f} s, terminating process group")
+                await self.kill_group(handle)
+            # Restliche Ausgaben abholen; hält ein verwaister Kindprozess die Pipes offen, nicht ewig warten
+            done, pending = await asyncio.wait(readers, timeout=_DRAIN_TIMEOUT)
+            for task in pending:
+                task.cancel()
+        finally:
+            self._running.pop(handle.job_id, None)
+        return SupervisedResult(process.returncode, time.time() - started, timed_out, handle.cancelled)
+
+    async def _read_output(self, handle: SupervisedProcess, on_output: Callable[[str], None]) -> None:
+        stream = handle.process.stdout
+        while True:
+            try:
+                line = await stream.readline()
+            except ValueError:
+                # Zeile über dem Limit → Rest bis zum Zeilenende verwerfen
+                line = await stream.read(_STREAM_LIMIT)
+            if not line:
+                return
+            text = line.decode("utf-8", errors="replace").rstrip()
+            if text:
+                try:
+                    on_output(text)
+                except Exception as e:
+                    logger.warning(f"[{handle.job_id}] Output callback failed: {e}")
+
+    async def _read_progress(
+        self,
+        handle: SupervisedProcess,
+        progress_read: int,
+        on_progress: Optional[Callable[[List[Dict[str, Any]]], None]],
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=_STREAM_LIMIT)
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(progress_read, "rb", buffering=0)
+        )
+        try:
+            async for events in read_frames_async(reader):
+                if on_progress is not None:
+                    try:
+                        on_progress(events)
+                    except Exception as e:
+                        logger.warning(f"[{handle.job_id}] Progress callback failed: {e}")
+        except ValueError as e:
+            logger.warning(f"[{handle.job_id}] Progress channel closed: {e}")
+        finally:
+            transport.close()
+
+    # -------------------------
+    # Abbruch
+    # -------------------------
+
+    async def kill_group(self, handle: SupervisedProcess) -> None:
+        """SIGTERM an die Prozessgruppe, nach Frist SIGKILL."""
+        process = handle.process
+        if process.returncode is not None:
+            return
+        try:
+            os.killpg(handle.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        try:
+            await asyncio.wait_for(process.wait(), timeout=self.grace_seconds)
+        except asyncio.TimeoutError:
+            logger.warning(f"[{handle.job_id}] Process group did not exit after SIGTERM, sending SIGKILL")
+            try:
+                os.killpg(handle.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+            await process.wait()
+
+    def shutdown(self) -> None:
+        """Alle laufenden Jobs beenden (Runner-Shutdown)."""
+        if self._loop is None:
+            return
+        handles = list(self._running.values())
+        futures = [self.submit(self.kill_group(handle)) for handle in handles]
+        concurrent.futures.wait(futures, timeout=self.grace_seconds + 5)
@@ -0,0 +1,205 @@
+"""
+Progress Tracker - Aggregation der strukturierten Fortschritts-Events je Job (Runner-Seite)
+
+Gegenstück zu `config/job_progress.py`: Events kommen gebündelt über den Seitenkanal
+(Pipe bei Subprozessen, Worker-Verbindung bei Warm-Workern) und werden hier zu einem
+kompakten Zustand je Job verdichtet – aktuelle Stage, Stage-Dauern, Prozent, Zeilenzahlen,
+Metriken, Fehler. stdout bleibt reines Logging; Fortschritt landet nicht im Log-Store.
+
+ETA:
+- bekannte Stage-Dauern früherer Läufe derselben Pipeline (gleitender Mittelwert)
+- sonst Hochrechnung aus Gesamtfortschritt (abgeschlossene Stages + Prozent der aktuellen)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+
+_MAX_ERRORS = 20
+_HISTORY_WEIGHT = 0.3
+# Endzustände (job_queue); `queued` nach Lease-Ablauf ist kein Ende – der Job läuft erneut
+_TERMINAL = ("succeeded", "failed", "cancelled")
+
+
+class JobProgress:
+    """Verdichteter Fortschritt eines Jobs."""
+
+    def __init__(self, job_id: str, pipeline: str):
+        self.job_id = job_id
+        self.pipeline = pipeline
+        self.started_at = time.time()
+        self.updated_at = self.started_at
+        self.finished_at: Optional[float] = None
+        self.status: Optional[str] = None
+        self.plan: List[str] = []
+        self.stages: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.active: List[str] = []  # verschachtelte Stages, innerste zuletzt
+        self.percent: Optional[float] = None
+        self.rows: Dict[str, int] = {}
+        self.metrics: Dict[str, Any] = {}
+        self.errors: List[Dict[str, Any]] = []
+        self.events = 0
+
+    def apply(self, event: Dict[str, Any]) -> None:
+        kind = event.get("type")
+        ts = float(event.get("ts") or time.time())
+        self.events += 1
+        self.updated_at = max(self.updated_at, ts)
+        if kind == "plan":
+            self.plan = [str(s) for s in event.get("stages") or []]
+        elif kind == "stage_start":
+            name = str(event.get("stage"))
+            self.stages[name] = {"name": name, "status": "running", "started_at": ts, "duration": None}
+            self.active.append(name)
+            self.percent = 0.0
+        elif kind == "stage_end":
+            name = str(event.get("stage"))
+            stage = self.stages.setdefault(name, {"name": name, "started_at": ts})
+            stage["status"] = event.get("status") or "succeeded"
+            stage["duration"] = event.get("duration")
+            if event.get("message"):
+                stage["message"] = event["message"]
+            if name in self.active:
+                self.active.remove(name)
+                self.percent = None
+        elif kind == "progress":
+            if event.get("percent") is not None:
+                self.percent = max(0.0, min(100.0, float(event["percent"])))
+        elif kind == "rows":
+            name = str(event.get("name") or "rows")
+            self.rows[name] = self.rows.get(name, 0) + int(event.get("count") or 0)
+        elif kind == "metric":
+            self.metrics[str(event.get("name"))] = event.get("value")
+        elif kind == "error":
+            self.errors.append({"ts": ts, "message": event.get("message")})
+            del self.errors[:-_MAX_ERRORS]
+
+    @property
+    def current(self) -> Optional[str]:
+        return self.active[-1] if self.active else None
+
+    def completed_stages(self) -> List[str]:
+        return [name for name, stage in self.stages.items() if stage.get("status") in ("succeeded", "skipped")]
+
+    def overall_fraction(self) -> Optional[float]:
+        """Anteil erledigter Arbeit in [0, 1] (None ohne Anhaltspunkt)."""
+        if self.finished_at is not None and self.status == "succeeded":
+            return 1.0
+        # Prozent der innersten Stage gilt näherungsweise auch für die umschließende Plan-Stage
+        current_fraction = (self.percent or 0.0) / 100.0 if self.current else 0.0
+        if self.plan:
+            done = len([name for name in self.completed_stages() if name in self.plan])
+            return min(1.0, (done + current_fraction) / len(self.plan))
+        if self.current and self.percent is not None:
+            return current_fraction
+        return None
+
+    def eta_seconds(self, stage_history: Dict[str, float]) -> Optional[float]:
+        if self.status is not None:
+            # Beendet oder wieder eingereiht: keine Hochrechnung mehr
+            return 0.0 if self.status == "succeeded" else None
+        now = time.time()
+
+        # 1) Stage-Historie: Rest der aktuellen Stage + Dauer der ausstehenden Stages
+        remaining_stages = [s for s in self.plan if s not in self.stages]
+        if self.plan and all(s in stage_history for s in remaining_stages):
+            eta = sum(stage_history[s] for s in remaining_stages)
+            running = [s for s in self.active if s in self.plan]
+            if running:
+                stage = running[-1]
+                elapsed = now - self.stages[stage]["started_at"]
+                if stage in stage_history:
+                    eta += max(stage_history[stage] - elapsed, 0.0)
+                elif self.percent:
+                    eta += elapsed * (100.0 - self.percent) / self.percent
+                else:
+                    eta = None
+            if eta is not None:
+                return round(eta, 1)
+
+        # 2) Hochrechnung aus Gesamtfortschritt
+        fraction = self.overall_fraction()
+        if not fraction:
+            return None
+        return round((now - self.started_at) * (1.0 - fraction) / fraction, 1)
+
+    def as_dict(self, stage_history: Dict[str, float]) -> Dict[str, Any]:
+        fraction = self.overall_fraction()
+        return {
+            "job_id": self.job_id,
+            "pipeline": self.pipeline,
+            "status": self.status,
+            "stage": self.current,
+            "stage_percent": round(self.percent, 1) if self.percent is not None else None,
+            "percent": round(fraction * 100.0, 1) if fraction is not None else None,
+            "eta_seconds": self.eta_seconds(stage_history),
+            "elapsed_seconds": round((self.finished_at or time.time()) - self.started_at, 1),
+            "plan": self.plan,
+            "stages": [dict(stage) for stage in self.stages.values()],
+            "rows": dict(self.rows),
+            "metrics": dict(self.metrics),
+            "errors": list(self.errors),
+            "events": self.events,
+            "updated_at": self.updated_at,
+        }
+
+
+class ProgressTracker:
+    """Fortschritt laufender und kürzlich beendeter Jobs (begrenzt auf `max_jobs`)."""
+
+    def __init__(self, max_jobs: int = 500):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, JobProgress]" = OrderedDict()
+        self._stage_history: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def start(self, job_id: str, pipeline: str) -> None:
+        with self._lock:
+            self._jobs[job_id] = JobProgress(job_id, pipeline)
+            self._jobs.move_to_end(job_id)
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+
+    def apply(self, job_id: str, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            progress = self._jobs.get(job_id)
+            if progress is None:
+                return
+            for event in events:
+                progress.apply(event)
+
+    def finish(self, job_id: str, status: str) -> None:
+        """
+        Job abschließen (bzw. nach Lease-Ablauf wieder einreihen: Status `queued`, Fortschritt der
+        abgeschlossenen Stages bleibt bis zum Neustart sichtbar); erfolgreiche Stage-Dauern
+        fließen in die ETA-Historie der Pipeline.
+        """
+        with self._lock:
+            progress = self._jobs.get(job_id)
+            if progress is None:
+                return
+            if status in _TERMINAL:
+                progress.finished_at = time.time()
+            progress.status = status
+            progress.percent = None
+            progress.active = []
+            history = self._stage_history.setdefault(progress.pipeline, {})
+            for name, stage in progress.stages.items():
+                duration = stage.get("duration")
+                if stage.get("status") != "succeeded" or duration is None:
+                    continue
+                previous = history.get(name)
+                history[name] = duration if previous is None else (
+                    (1 - _HISTORY_WEIGHT) * previous + _HISTORY_WEIGHT * duration
+                )
+
+    def snapshot(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            progress = self._jobs.get(job_id)
+            if progress is None:
+                return None
+            return progress.as_dict(dict(self._stage_history.get(progress.pipeline, {})))
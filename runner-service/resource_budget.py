@@ -0,0 +1,164 @@
+"""
+Resource Budget - Admission Control für Pipeline-Jobs nach CPU- und Speicherbudget
+
+- Speicherbudget des Knotens (Anteil am Gesamtspeicher oder fester Wert)
+- Schätzung je Pipeline: beobachtete Spitzen-RSS der letzten Läufe (+ Sicherheitsaufschlag),
+  sonst konfigurierter Default
+- Ein Job wird nur gestartet, wenn Reservierungen + Schätzung ins Budget passen und der
+  aktuell freie Speicher die noch nicht belegten Reservierungen abdeckt
+- Thread-Zuteilung je Job (BLAS/OpenMP), damit parallele Jobs die Kerne nicht überbuchen
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Umgebungsvariablen, über die numpy/sklearn/catboost/lightgbm ihre Threadpools dimensionieren
+THREAD_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "LOKY_MAX_CPU_COUNT",
+)
+
+DEFAULT_MEMORY_ESTIMATES_MB = {"churn": 6144.0, "cox": 3072.0, "cf": 3072.0}
+DEFAULT_CPU_ESTIMATES = {"churn": 4, "cox": 2, "cf": 2}
+ESTIMATE_HEADROOM = 1.2
+
+
+class _Reservation:
+    def __init__(self, pipeline: str, memory_mb: float, threads: int):
+        self.pipeline = pipeline
+        self.memory_mb = memory_mb
+        self.threads = threads
+
+    def as_dict(self) -> Dict:
+        return {"pipeline": self.pipeline, "memory_mb": round(self.memory_mb, 1), "threads": self.threads}
+
+
+class ResourceBudget:
+    """Reservierungsbasierte Zulassung von Jobs."""
+
+    def __init__(
+        self,
+        memory_budget_mb: float,
+        cpu_budget: int,
+        memory_estimates_mb: Optional[Dict[str, float]] = None,
+        cpu_estimates: Optional[Dict[str, int]] = None,
+        observed_peaks: Optional[Callable[[str], List[float]]] = None,
+        current_usage_mb: Optional[Callable[[], Dict[str, float]]] = None,
+    ):
+        self.memory_budget_mb = memory_budget_mb
+        self.cpu_budget = max(1, int(cpu_budget))
+        self.memory_estimates_mb = dict(DEFAULT_MEMORY_ESTIMATES_MB, **(memory_estimates_mb or {}))
+        self.cpu_estimates = dict(DEFAULT_CPU_ESTIMATES, **(cpu_estimates or {}))
+        self.observed_peaks = observed_peaks
+        self.current_usage_mb = current_usage_mb
+        self._reservations: Dict[str, _Reservation] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls, **kwargs) -> "ResourceBudget":
+        """
+        Budget aus ENV:
+        - RUNNER_MEMORY_BUDGET_MB (fest) oder RUNNER_MEMORY_BUDGET_FRACTION (Anteil am RAM, Standard 0.8)
+        - RUNNER_CPU_BUDGET (Standard: Anzahl Kerne)
+        - RUNNER_MEM_ESTIMATE_<PIPELINE>_MB / RUNNER_CPU_ESTIMATE_<PIPELINE>
+        """
+        if os.environ.get("RUNNER_MEMORY_BUDGET_MB"):
+            memory_budget_mb = float(os.environ["RUNNER_MEMORY_BUDGET_MB"])
+        elif psutil is not None:
+            fraction = float(os.environ.get("RUNNER_MEMORY_BUDGET_FRACTION", "0.8"))
+            memory_budget_mb = psutil.virtual_memory().total / (1024 * 1024) * fraction
+        else:
+            memory_budget_mb = float("inf")
+        cpu_budget = int(os.environ.get("RUNNER_CPU_BUDGET", str(os.cpu_count() or 1)))
+
+        memory_estimates = {}
+        cpu_estimates = {}
+        for pipeline in DEFAULT_MEMORY_ESTIMATES_MB:
+            mem_value = os.environ.get(f"RUNNER_MEM_ESTIMATE_{pipeline.upper()}_MB")
+            if mem_value:
+                memory_estimates[pipeline] = float(mem_value)
+            cpu_value = os.environ.get(f"RUNNER_CPU_ESTIMATE_{pipeline.upper()}")
+            if cpu_value:
+                cpu_estimates[pipeline] = int(cpu_value)
+        return cls(memory_budget_mb, cpu_budget, memory_estimates, cpu_estimates, **kwargs)
+
+    # -------------------------
+    # Schätzung
+    # -------------------------
+
+    def estimate_memory_mb(self, pipeline: str) -> float:
+        default = self.memory_estimates_mb.get(pipeline, max(self.memory_estimates_mb.values()))
+        peaks = self.observed_peaks(pipeline) if self.observed_peaks else []
+        peaks = [p for p in peaks if p]
+        if not peaks:
+            return default
+        return max(peaks) * ESTIMATE_HEADROOM
+
+    # -------------------------
+    # Zulassung
+    # -------------------------
+
+    def try_reserve(self, job_id: str, pipeline: str) -> Optional[Dict]:
+        """Ressourcen für einen Job reservieren; None, wenn das Budget es aktuell nicht zulässt."""
+        memory_mb = self.estimate_memory_mb(pipeline)
+        with self._lock:
+            if self._reservations:
+                reserved_mb = sum(r.memory_mb for r in self._reservations.values())
+                if reserved_mb + memory_mb > self.memory_budget_mb:
+                    return None
+                if not self._free_memory_covers(memory_mb):
+                    return None
+                free_threads = self.cpu_budget - sum(r.threads for r in self._reservations.values())
+                if free_threads < 1:
+                    return None
+            else:
+                # Leerer Knoten: immer zulassen, sonst würde ein Job > Budget nie starten
+                free_threads = self.cpu_budget
+            threads = max(1, min(self.cpu_estimates.get(pipeline, 1), free_threads))
+            reservation = _Reservation(pipeline, memory_mb, threads)
+            self._reservations[job_id] = reservation
+            return reservation.as_dict()
+
+    def release(self, job_id: str) -> None:
+        with self._lock:
+            self._reservations.pop(job_id, None)
+
+    def _free_memory_covers(self, memory_mb: float) -> bool:
+        if psutil is None:
+            return True
+        available_mb = psutil.virtual_memory().available / (1024 * 1024)
+        usage = self.current_usage_mb() if self.current_usage_mb else {}
+        # Laufende Jobs wachsen noch bis zu ihrer Reservierung → diesen Rest als belegt rechnen
+        outstanding_mb = sum(
+            max(r.memory_mb - usage.get(job_id, 0.0), 0.0) for job_id, r in self._reservations.items()
+        )
+        return available_mb - outstanding_mb >= memory_mb
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            reservations = {job_id: r.as_dict() for job_id, r in self._reservations.items()}
+        return {
+            "memory_budget_mb": round(self.memory_budget_mb, 1),
+            "memory_reserved_mb": round(sum(r["memory_mb"] for r in reservations.values()), 1),
+            "cpu_budget": self.cpu_budget,
+            "threads_reserved": sum(r["threads"] for r in reservations.values()),
+            "estimates_mb": {p: round(self.estimate_memory_mb(p), 1) for p in self.memory_estimates_mb},
+            "reservations": reservations,
+        }
+
+
+def thread_environment(threads: int) -> Dict[str, str]:
+    """ENV-Variablen für die Thread-Begrenzung eines Job-Prozesses."""
+    return {name: str(threads) for name in THREAD_ENV_VARS}
@@ -0,0 +1,252 @@
+"""
+Run Cache - Fingerprints für Pipeline-Läufe und Snapshots ihrer Outbox-Ergebnisse
+
+Fingerprint eines Laufs (SHA-256) aus:
+- Experiment-Parametern (Perioden, id_files, feature_set, Hyperparameter, Job-Parameter)
+- Stage0-Hashes der Eingabedateien (`id_files` → files-Tabelle)
+- Quellstand der beteiligten BL-Module (Inhalts-Hash aller *.py)
+
+Nach einem erfolgreichen Lauf wird das Outbox-Verzeichnis des Experiments unter
+`ProjectPaths.runner_run_cache_directory()/<fingerprint>/` gesichert. Ein späterer Lauf mit
+gleichem Fingerprint wird nicht erneut ausgeführt; fehlt oder weicht die Outbox ab,
+wird der Snapshot dorthin zurückgespielt.
+
+Outbox und Snapshots verweisen per Hardlink auf inhaltsadressierte Blobs
+(`config/artifact_store.py`): Sichern und Zurückspielen kosten keine Kopie; nach dem
+Ausdünnen alter Snapshots entfernt die GC nicht mehr referenzierte Blobs.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import shutil
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.artifact_store import ArtifactStore
+from config.paths_config import ProjectPaths
+
+# Pipelines mit eigenem Outbox-Verzeichnis je Experiment
+CACHEABLE_PIPELINES = ("churn", "cox")
+
+FINGERPRINT_MARKER = ".run_fingerprint"
+_SNAPSHOT_META = "snapshot.json"
+
+# Experiment-Felder, die das Ergebnis bestimmen (Name/Status/Zeitstempel nicht)
+_EXPERIMENT_KEYS = (
+    "experiment_id",
+    "model_type",
+    "feature_set",
+    "training_from",
+    "training_to",
+    "backtest_from",
+    "backtest_to",
+    "id_files",
+    "hyperparameters",
+    "parameters",
+)
+
+# Steuerparameter, die das Ergebnis nicht beeinflussen
+_IGNORED_PARAMS = ("force", "priority", "max_retries", "resume_from")
+
+_SKIPPED_DIRECTORIES = {"__pycache__", "dynamic_system_outputs", "models", ".git", ".venv", ".venv311"}
+
+_file_hash_cache: Dict[Tuple[str, int, int], str] = {}
+_file_hash_lock = threading.Lock()
+
+
+def _hash_file(path: Path) -> str:
+    """Inhalts-Hash mit Cache auf (Pfad, Größe, mtime) – unveränderte Dateien werden nicht neu gelesen."""
+    stat = path.stat()
+    key = (str(path), stat.st_size, stat.st_mtime_ns)
+    with _file_hash_lock:
+        cached = _file_hash_cache.get(key)
+    if cached is not None:
+        return cached
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    with _file_hash_lock:
+        _file_hash_cache[key] = value
+    return value
+
+
+def _source_files(root: Path) -> Iterable[Path]:
+    for path in sorted(root.rglob("*.py")):
+        if not _SKIPPED_DIRECTORIES.intersection(path.relative_to(root).parts):
+            yield path
+
+
+def source_version(pipeline: str) -> str:
+    """Inhalts-Hash der BL-Quellen, die eine Pipeline ausführt (inkl. JSON-DB)."""
+    roots = [ProjectPaths.json_database_directory()]
+    if pipeline == "churn":
+        roots.append(ProjectPaths.bl_churn_directory())
+    elif pipeline == "cox":
+        roots.append(ProjectPaths.bl_cox_directory())
+    digest = hashlib.sha256()
+    for root in roots:
+        if not root.exists():
+            continue
+        for path in _source_files(root):
+            digest.update(str(path.relative_to(root)).encode("utf-8"))
+            digest.update(_hash_file(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+def input_file_hashes(id_files: Iterable[Any], file_records: List[Dict[str, Any]]) -> Dict[str, Optional[str]]:
+    """
+    Stage0-Hash je referenzierter Datei.
+
+    Stage0-Dateien heißen `<csv_hash>.json`; für registrierte CSVs wird der Inhalt gehasht.
+    Nicht auflösbare Dateien liefern None (→ Lauf nicht cachebar).
+    """
+    by_id = {}
+    for record in file_records:
+        record_id = record.get("id", record.get("file_id"))
+        if record_id is not None:
+            by_id[str(record_id)] = record
+
+    hashes: Dict[str, Optional[str]] = {}
+    for file_id in id_files or []:
+        record = by_id.get(str(file_id))
+        if record is None:
+            hashes[str(file_id)] = None
+            continue
+        file_name = record.get("file_name") or ""
+        source_type = (record.get("source_type") or "").lower()
+        if source_type in ("stage0_cache", "stage0_stream") and file_name.endswith(".json"):
+            hashes[str(file_id)] = Path(file_name).stem
+            continue
+        candidate = ProjectPaths.input_data_directory() / file_name
+        hashes[str(file_id)] = _hash_file(candidate) if file_name and candidate.is_file() else None
+    return hashes
+
+
+def compute_fingerprint(
+    pipeline: str,
+    params: Dict[str, Any],
+    experiment: Dict[str, Any],
+    file_records: List[Dict[str, Any]],
+) -> Tuple[Optional[str], Dict[str, Any]]:
+    """
+    Fingerprint und seine Bestandteile berechnen.
+
+    Returns:
+        (fingerprint oder None, wenn der Lauf nicht cachebar ist; Bestandteile zur Diagnose)
+    """
+    components: Dict[str, Any] = {
+        "pipeline": pipeline,
+        "experiment": {key: experiment.get(key) for key in _EXPERIMENT_KEYS},
+        "params": {key: value for key, value in sorted(params.items()) if key not in _IGNORED_PARAMS},
+        "inputs": input_file_hashes(experiment.get("id_files") or [], file_records),
+        "source": source_version(pipeline),
+    }
+    if pipeline not in CACHEABLE_PIPELINES or any(value is None for value in components["inputs"].values()):
+        return None, components
+    payload = json.dumps(components, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest(), components
+
+
+# -------------------------
+# Snapshots
+# -------------------------
+
+def outbox_directory_for(pipeline: str, experiment_id: int) -> Path:
+    if pipeline == "churn":
+        return ProjectPaths.outbox_churn_experiment_directory(experiment_id)
+    if pipeline == "cox":
+        return ProjectPaths.outbox_cox_experiment_directory(experiment_id)
+    raise ValueError(f"Pipeline {pipeline} has no per-experiment outbox")
+
+
+def _snapshot_directory(fingerprint: str) -> Path:
+    return ProjectPaths.runner_run_cache_directory() / fingerprint
+
+
+def has_snapshot(fingerprint: str) -> bool:
+    return (_snapshot_directory(fingerprint) / _SNAPSHOT_META).exists()
+
+
+def store_snapshot(fingerprint: str, pipeline: str, experiment_id: int, job_id: str, keep: int = 3) -> bool:
+    """Outbox-Ergebnis eines erfolgreichen Laufs sichern und mit dem Fingerprint markieren."""
+    source = outbox_directory_for(pipeline, experiment_id)
+    if not source.is_dir():
+        return False
+    marker = source / FINGERPRINT_MARKER
+    marker.unlink(missing_ok=True)
+    marker.write_text(fingerprint, encoding="utf-8")
+
+    target = _snapshot_directory(fingerprint)
+    staging = target.with_name(target.name + ".tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    # Outbox und Snapshot teilen sich die Dateien über den Artifact Store (Hardlinks); die Outbox darf
+    # mitverlinkt werden, weil `invalidate_marker` die Links vor jedem echten Lauf auflöst
+    ArtifactStore().export_tree(source, staging / "outbox", link_source=True)
+    meta = {
+        "pipeline": pipeline,
+        "experiment_id": experiment_id,
+        "job_id": job_id,
+        "created_at": datetime.now().isoformat(),
+    }
+    (staging / _SNAPSHOT_META).write_text(json.dumps(meta, indent=2), encoding="utf-8")
+    shutil.rmtree(target, ignore_errors=True)
+    staging.rename(target)
+    _prune(pipeline, experiment_id, keep)
+    return True
+
+
+def publish_snapshot(fingerprint: str, pipeline: str, experiment_id: int) -> bool:
+    """
+    Ergebnis eines früheren Laufs in der Outbox bereitstellen.
+
+    Returns:
+        True, wenn die Outbox neu beschrieben wurde (False: war bereits aktuell)
+    """
+    target = outbox_directory_for(pipeline, experiment_id)
+    marker = target / FINGERPRINT_MARKER
+    if marker.exists() and marker.read_text(encoding="utf-8").strip() == fingerprint:
+        return False
+    snapshot = _snapshot_directory(fingerprint) / "outbox"
+    if target.exists():
+        shutil.rmtree(target)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    ArtifactStore().export_tree(snapshot, target)
+    return True
+
+
+def invalidate_marker(pipeline: str, experiment_id: int) -> None:
+    """
+    Vor einem echten Lauf: Outbox gilt nicht mehr als Stand eines bestimmten Fingerprints.
+
+    Zusätzlich werden die Hardlinks auf Snapshot-Blobs aufgelöst – die Pipeline darf ihre
+    Outbox-Dateien an Ort und Stelle überschreiben, ohne Snapshots zu verändern.
+    """
+    directory = outbox_directory_for(pipeline, experiment_id)
+    (directory / FINGERPRINT_MARKER).unlink(missing_ok=True)
+    ArtifactStore().detach_tree(directory)
+
+
+def _prune(pipeline: str, experiment_id: int, keep: int) -> None:
+    """Nur die jüngsten `keep` Snapshots je Pipeline/Experiment behalten."""
+    root = ProjectPaths.runner_run_cache_directory()
+    snapshots = []
+    for meta_file in root.glob(f"*/{_SNAPSHOT_META}"):
+        try:
+            meta = json.loads(meta_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if meta.get("pipeline") == pipeline and int(meta.get("experiment_id", -1)) == int(experiment_id):
+            snapshots.append((meta.get("created_at") or "", meta_file.parent))
+    snapshots.sort(reverse=True)
+    for _, directory in snapshots[keep:]:
+        shutil.rmtree(directory, ignore_errors=True)
+    if snapshots[keep:]:
+        ArtifactStore().gc()
@@ -0,0 +1,93 @@
+"""
+Runner Metrics - Prometheus-Metriken des Runner-Service
+
+- Queue-Tiefe je Status und laufende Jobs je Pipeline
+- Laufzeit- und Spitzen-RSS-Histogramme je Pipeline
+- Latenz von JSON-DB-Zugriffen (Laden/Nachladen/Speichern) im Runner-Prozess
+- Log-Durchsatz (Zeilen je Level)
+
+prometheus_client ist optional: ohne Paket sind alle Funktionen No-ops und
+`render()` liefert None.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+except ImportError:
+    CollectorRegistry = None
+
+# Pipelines laufen Minuten bis Stunden
+_DURATION_BUCKETS = (10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200, 14400, float("inf"))
+_RSS_BUCKETS_MB = (256, 512, 1024, 2048, 4096, 6144, 8192, 12288, 16384, 32768, float("inf"))
+_DB_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, float("inf"))
+
+if CollectorRegistry is not None:
+    registry = CollectorRegistry()
+    queue_depth = Gauge("runner_queue_depth", "Jobs in der Queue je Status", ["status"], registry=registry)
+    running_jobs_gauge = Gauge("runner_running_jobs", "Laufende Jobs je Pipeline", ["pipeline"], registry=registry)
+    job_duration = Histogram(
+        "runner_job_duration_seconds",
+        "Laufzeit abgeschlossener Jobs",
+        ["pipeline", "status"],
+        buckets=_DURATION_BUCKETS,
+        registry=registry,
+    )
+    job_peak_rss = Histogram(
+        "runner_job_peak_rss_megabytes",
+        "Spitzen-RSS abgeschlossener Jobs (Prozessbaum)",
+        ["pipeline"],
+        buckets=_RSS_BUCKETS_MB,
+        registry=registry,
+    )
+    json_db_latency = Histogram(
+        "runner_json_db_seconds",
+        "Latenz von JSON-DB-Operationen im Runner",
+        ["operation"],
+        buckets=_DB_BUCKETS,
+        registry=registry,
+    )
+    log_lines = Counter("runner_log_lines_total", "Geschriebene Log-Zeilen je Level", ["level"], registry=registry)
+
+
+def available() -> bool:
+    return CollectorRegistry is not None
+
+
+def observe_job(pipeline: str, status: str, duration_seconds: float, peak_rss_mb: Optional[float] = None) -> None:
+    if not available():
+        return
+    job_duration.labels(pipeline=pipeline, status=status).observe(duration_seconds)
+    if peak_rss_mb:
+        job_peak_rss.labels(pipeline=pipeline).observe(peak_rss_mb)
+
+
+def count_log_line(level: str) -> None:
+    if available():
+        log_lines.labels(level=level).inc()
+
+
+@contextmanager
+def time_json_db(operation: str) -> Iterator[None]:
+    """Dauer einer JSON-DB-Operation messen (`load`, `reload`, `save`)."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        if available():
+            json_db_latency.labels(operation=operation).observe(time.perf_counter() - started)
+
+
+def render(queue_counts: Dict[str, int], running_counts: Dict[str, int]) -> Optional[Tuple[bytes, str]]:
+    """Aktuelle Gauges setzen und das Exposition-Format erzeugen."""
+    if not available():
+        return None
+    for status in ("queued", "running", "succeeded", "failed", "cancelled"):
+        queue_depth.labels(status=status).set(queue_counts.get(status, 0))
+    for pipeline in ("churn", "cox", "cf"):
+        running_jobs_gauge.labels(pipeline=pipeline).set(running_counts.get(pipeline, 0))
+    return generate_latest(registry), CONTENT_TYPE_LATEST
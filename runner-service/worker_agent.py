@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+"""
+Worker Agent - Führt Pipeline-Jobs des Runners auf diesem Knoten aus
+
+Der Agent meldet sich per HTTP beim Runner an, least passende Jobs aus dessen Queue
+und startet sie als Subprozess (`pipeline_jobs.py`, wie der kalte Runner-Modus).
+Ergebnisse schreibt die Pipeline wie gewohnt in die Outbox (`OUTBOX_ROOT`, bei mehreren
+Knoten auf gemeinsamem Speicher); an den Runner gehen nur Logs, Fortschritt und Return-Code.
+
+- Heartbeats alle Lease/3 Sekunden verlängern die Leases; nennt der Runner einen Job unter
+  `cancel` (abgebrochen oder nach Lease-Ablauf neu vergeben), wird dessen Prozessgruppe beendet
+- Log-Zeilen und Fortschritts-Events werden gebündelt übertragen (alle `FLUSH_INTERVAL` Sekunden)
+- SIGTERM/SIGINT: keine neuen Leases, laufende Jobs werden zu Ende geführt (zweites Signal bricht ab)
+
+Mehrere Agenten auf einem Rechner:
+    python runner-service/worker_agent.py --runner http://localhost:5050 --name agent-1 --slots 2
+    python runner-service/worker_agent.py --runner http://localhost:5050 --name agent-2 --pipelines churn
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from config.job_progress import ENV_PROGRESS_FD, FrameReader
+from process_monitor import ProcessMonitor
+
+logger = logging.getLogger("worker_agent")
+
+FLUSH_INTERVAL = 0.5
+TERMINATE_GRACE_SECONDS = 10.0
+_PIPELINE_JOBS = Path(__file__).resolve().parent / "pipeline_jobs.py"
+
+
+class RunnerClient:
+    """Schmale HTTP-Schicht zum Runner (Wiederholung bei Verbindungsfehlern)."""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def post(self, path: str, payload: Optional[Dict[str, Any]] = None, retries: int = 3) -> httpx.Response:
+        for attempt in range(retries):
+            try:
+                return httpx.post(f"{self.base_url}{path}", json=payload or {}, timeout=self.timeout)
+            except httpx.HTTPError as e:
+                if attempt == retries - 1:
+                    raise
+                logger.warning(f"Runner not reachable ({e}), retrying")
+                time.sleep(2 ** attempt)
+        raise RuntimeError("unreachable")
+
+
+class AgentJob:
+    """Ein laufender Job: Prozess plus gepufferte Logs/Events für den Runner."""
+
+    def __init__(self, job: Dict[str, Any]):
+        self.job = job
+        self.job_id = job["job_id"]
+        self.process: Optional[subprocess.Popen] = None
+        self.cancelled = False
+        self._logs: List[str] = []
+        self._progress: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add_log(self, line: str) -> None:
+        with self._lock:
+            self._logs.append(line)
+
+    def add_progress(self, events: List[Dict[str, Any]]) -> None:
+        with self._lock:
+            self._progress.extend(events)
+
+    def take(self):
+        with self._lock:
+            logs, self._logs = self._logs, []
+            progress, self._progress = self._progress, []
+        return logs, progress
+
+    def terminate(self) -> None:
+        """Prozessgruppe beenden (SIGTERM, nach Frist SIGKILL)."""
+        self.cancelled = True
+        process = self.process
+        if process is None or process.poll() is not None:
+            return
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            return
+        try:
+            process.wait(timeout=TERMINATE_GRACE_SECONDS)
+        except subprocess.TimeoutExpired:
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+class WorkerAgent:
+    def __init__(
+        self,
+        runner_url: str,
+        name: str,
+        pipelines: List[str],
+        slots: int = 1,
+        poll_interval: float = 2.0,
+    ):
+        self.client = RunnerClient(runner_url)
+        self.name = name
+        self.pipelines = pipelines
+        self.slots = slots
+        self.poll_interval = poll_interval
+        self.agent_id: Optional[str] = None
+        self.heartbeat_interval = 20.0
+        self._jobs: Dict[str, AgentJob] = {}
+        self._jobs_lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._monitor = ProcessMonitor(
+            lambda: {job_id: job.process.pid for job_id, job in list(self._jobs.items()) if job.process},
+        )
+
+    # -------------------------
+    # Anmeldung & Hauptschleife
+    # -------------------------
+
+    def register(self) -> None:
+        response = self.client.post("/agents/register", {
+            "name": self.name,
+            "host": socket.gethostname(),
+            "pipelines": self.pipelines,
+            "slots": self.slots,
+        })
+        response.raise_for_status()
+        data = response.json()
+        self.agent_id = data["agent_id"]
+        self.heartbeat_interval = float(data.get("heartbeat_interval") or self.heartbeat_interval)
+        logger.info(f"Registered as {self.agent_id} (lease {data.get('lease_seconds')} s)")
+
+    def run(self) -> None:
+        self.register()
+        self._monitor.start()
+        threading.Thread(target=self._heartbeat_loop, name="agent-heartbeat", daemon=True).start()
+        while not self._stopping.is_set():
+            if self._free_slots() <= 0 or not self._lease_one():
+                self._stopping.wait(self.poll_interval)
+        # Laufende Jobs zu Ende führen (Heartbeats laufen weiter)
+        while self._running_jobs():
+            time.sleep(0.5)
+        logger.info("Agent stopped")
+
+    def stop(self, force: bool = False) -> None:
+        if self._stopping.is_set() and force:
+            for job in self._running_jobs():
+                job.terminate()
+        self._stopping.set()
+
+    def _free_slots(self) -> int:
+        with self._jobs_lock:
+            return self.slots - len(self._jobs)
+
+    def _running_jobs(self) -> List[AgentJob]:
+        with self._jobs_lock:
+            return list(self._jobs.values())
+
+    def _agent_post(self, path: str, payload: Optional[Dict[str, Any]] = None) -> Optional[httpx.Response]:
+        """Agent-bezogener Aufruf; unbekannter Agent (404) → neu anmelden."""
+        try:
+            response = self.client.post(f"/agents/{self.agent_id}{path}", payload)
+        except httpx.HTTPError as e:
+            logger.warning(f"Runner call {path} failed: {e}")
+            return None
+        if response.status_code == 404 and response.json().get("detail") == "Agent not registered":
+            logger.warning("Runner does not know this agent anymore, registering again")
+            # Leases der alten Anmeldung sind verloren → deren Jobs beenden
+            for job in self._running_jobs():
+                job.terminate()
+            self.register()
+            return None
+        return response
+
+    def _lease_one(self) -> bool:
+        response = self._agent_post("/lease")
+        if response is None or response.status_code != 200:
+            return False
+        job = response.json().get("job")
+        if not job:
+            return False
+        agent_job = AgentJob(job)
+        with self._jobs_lock:
+            self._jobs[agent_job.job_id] = agent_job
+        threading.Thread(target=self._execute, args=(agent_job,), name=f"job-{agent_job.job_id}", daemon=True).start()
+        return True
+
+    def _heartbeat_loop(self) -> None:
+        while True:
+            time.sleep(self.heartbeat_interval)
+            jobs = self._running_jobs()
+            response = self._agent_post("/heartbeat", {"job_ids": [job.job_id for job in jobs]})
+            if response is None or response.status_code != 200:
+                continue
+            for job_id in response.json().get("cancel", []):
+                with self._jobs_lock:
+                    job = self._jobs.get(job_id)
+                if job is not None and not job.cancelled:
+                    logger.warning(f"[{job_id}] Lease revoked by runner, terminating")
+                    threading.Thread(target=job.terminate, daemon=True).start()
+
+    # -------------------------
+    # Job-Ausführung
+    # -------------------------
+
+    def _execute(self, agent_job: AgentJob) -> None:
+        job_id = agent_job.job_id
+        job = agent_job.job
+        logger.info(f"[{job_id}] Starting {job['pipeline']} job")
+        return_code, error = 1, None
+        flusher_stop = threading.Event()
+        flusher = threading.Thread(target=self._flush_loop, args=(agent_job, flusher_stop), daemon=True)
+        flusher.start()
+        try:
+            progress_read, progress_write = os.pipe()
+            try:
+                agent_job.process = subprocess.Popen(
+                    [sys.executable, str(_PIPELINE_JOBS), job["pipeline"], json.dumps(job["params"])],
+                    cwd=str(Path(__file__).resolve().parent.parent),
+                    env=dict(os.environ, RUNNER_JOB_ID=job_id, **{ENV_PROGRESS_FD: str(progress_write)}),
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    stdin=subprocess.DEVNULL,
+                    text=True,
+                    bufsize=1,
+                    pass_fds=(progress_write,),
+                    # Eigene Prozessgruppe → Abbruch erfasst auch Kindprozesse der Pipeline
+                    start_new_session=True,
+                )
+            except Exception:
+                os.close(progress_read)
+                raise
+            finally:
+                os.close(progress_write)
+            self._monitor.register(job_id, agent_job.process.pid)
+            reader = threading.Thread(
+                target=lambda: [agent_job.add_progress(events) for events in FrameReader(progress_read)],
+                daemon=True,
+            )
+            reader.start()
+            for line in iter(agent_job.process.stdout.readline, ""):
+                if line:
+                    agent_job.add_log(line.rstrip("\n"))
+            return_code = agent_job.process.wait()
+            reader.join(timeout=5)
+            if agent_job.cancelled:
+                error = "Terminated by runner"
+        except Exception as e:
+            error = f"Agent failed to run job: {e}"
+            agent_job.add_log(f"ERROR: {error}")
+        finally:
+            flusher_stop.set()
+            flusher.join()
+            stats = self._monitor.release(job_id)
+
+        if not agent_job.cancelled:
+            response = self._agent_post(f"/jobs/{job_id}/complete", {
+                "return_code": int(return_code),
+                "error": error,
+                "peak_rss_mb": stats.peak_rss_mb if stats is not None else None,
+                "cpu_seconds": stats.cpu_seconds if stats is not None else None,
+            })
+            if response is not None and response.status_code == 200:
+                logger.info(f"[{job_id}] Finished with return code {return_code} → {response.json().get('status')}")
+            else:
+                logger.warning(f"[{job_id}] Result not accepted by runner")
+        with self._jobs_lock:
+            self._jobs.pop(job_id, None)
+
+    def _flush_loop(self, agent_job: AgentJob, stop: threading.Event) -> None:
+        while True:
+            stopped = stop.wait(FLUSH_INTERVAL)
+            logs, progress = agent_job.take()
+            if logs or progress:
+                response = self._agent_post(f"/jobs/{agent_job.job_id}/events", {"logs": logs, "progress": progress})
+                if response is not None and response.status_code == 409 and not agent_job.cancelled:
+                    threading.Thread(target=agent_job.terminate, daemon=True).start()
+            if stopped:
+                return
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Runner worker agent")
+    parser.add_argument("--runner", default=os.environ.get("RUNNER_URL", "http://localhost:5050"))
+    parser.add_argument("--name", default=socket.gethostname())
+    parser.add_argument("--pipelines", default="churn,cox,cf", help="Kommagetrennt: churn,cox,cf")
+    parser.add_argument("--slots", type=int, default=1, help="Parallele Jobs auf diesem Agenten")
+    parser.add_argument("--poll-interval", type=float, default=2.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    # Jede Lease-Abfrage wäre sonst eine Logzeile
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    agent = WorkerAgent(
+        args.runner,
+        args.name,
+        [p.strip() for p in args.pipelines.split(",") if p.strip()],
+        slots=args.slots,
+        poll_interval=args.poll_interval,
+    )
+
+    def handle_signal(signum, frame) -> None:
+        logger.info("Stopping: no new leases, waiting for running jobs (signal again to abort them)")
+        agent.stop(force=True)
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    agent.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,380 @@
+"""
+Warm Worker Pool - Langlebige Worker-Prozesse mit vorab importierten BL-Modulen
+
+Jeder Worker lädt einmalig pandas/sklearn/catboost/lightgbm über die BL-Module
+(`pipeline_jobs.preload_modules`) und führt danach Jobs nacheinander aus.
+Ausgaben (stdout/stderr, auch aus C-Erweiterungen) werden auf Dateideskriptor-Ebene
+abgegriffen und zeilenweise an den Runner zurückgemeldet.
+
+Recycling: nach `max_jobs_per_worker` Jobs oder oberhalb von `max_rss_mb` beendet
+sich ein Worker selbst und wird beim nächsten Bedarf neu gestartet.
+
+Worker werden per `subprocess` gestartet (nicht `multiprocessing.spawn`, das den
+`__main__` des Runners erneut importieren würde) und sprechen über ein Socketpair.
+
+Im Runner überwacht `run_async` die Worker-Verbindung auf der Eventloop des Process Supervisors
+(gleiches Nachrichtenformat wie `Connection`, nicht-blockierend über ein Duplikat des Sockets):
+ein laufender Warm-Job belegt keinen Thread. Nur Start/Vorwärmen eines Workers läuft kurz im
+Default-Executor der Eventloop.
+
+Protokoll (multiprocessing.connection.Connection):
+- Runner → Worker: ("run", job_id, pipeline, params, threads) | ("stop",)
+- Worker → Runner: ("ready", preload_errors) | ("log", job_id, line) | ("progress", job_id, events)
+  | ("done", job_id, return_code, rss_mb, retire)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import pickle
+import queue
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import threading
+import traceback
+from multiprocessing.connection import Connection
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_DRAIN_MARKER = "\x00__worker_drain__\x00"
+
+
+def _frame(message) -> bytes:
+    """Nachricht im Format von `Connection.send` (Längenheader + Pickle)."""
+    payload = pickle.dumps(message)
+    if len(payload) > 0x7FFFFFFF:
+        return struct.pack("!i", -1) + struct.pack("!Q", len(payload)) + payload
+    return struct.pack("!i", len(payload)) + payload
+
+
+async def _read_message(reader: asyncio.StreamReader):
+    """Gegenstück zu `Connection.recv` für einen asyncio-StreamReader."""
+    size, = struct.unpack("!i", await reader.readexactly(4))
+    if size == -1:
+        size, = struct.unpack("!Q", await reader.readexactly(8))
+    return pickle.loads(await reader.readexactly(size))
+
+
+def _current_rss_mb() -> float:
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except Exception:
+        import resource
+
+        # ru_maxrss ist unter Linux in KiB
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _worker_main(conn, max_jobs: int, max_rss_mb: float) -> None:
+    """Hauptschleife eines Worker-Prozesses."""
+    send_lock = threading.Lock()
+    current_job = {"job_id": None}
+    drained = threading.Event()
+
+    def send(message) -> None:
+        with send_lock:
+            conn.send(message)
+
+    # stdout/stderr auf eine Pipe umleiten (fd-Ebene → auch native Ausgaben)
+    read_fd, write_fd = os.pipe()
+    os.dup2(write_fd, 1)
+    os.dup2(write_fd, 2)
+    os.close(write_fd)
+    sys.stdout = os.fdopen(1, "w", buffering=1, encoding="utf-8", errors="replace", closefd=False)
+    sys.stderr = sys.stdout
+
+    def pump_output() -> None:
+        with os.fdopen(read_fd, "r", encoding="utf-8", errors="replace") as reader:
+            for line in reader:
+                line = line.rstrip("\n")
+                if line == _DRAIN_MARKER:
+                    drained.set()
+                    continue
+                if line:
+                    send(("log", current_job["job_id"], line))
+
+    threading.Thread(target=pump_output, name="worker-output", daemon=True).start()
+
+    def drain_output() -> None:
+        # Sicherstellen, dass alle Ausgaben eines Jobs vor "done" beim Runner sind
+        drained.clear()
+        sys.stdout.flush()
+        print(_DRAIN_MARKER, flush=True)
+        drained.wait(timeout=5)
+
+    import pipeline_jobs
+    from config import job_progress
+
+    preload_errors = pipeline_jobs.preload_modules()
+    drain_output()
+    send(("ready", preload_errors))
+
+    jobs_done = 0
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message[0] == "stop":
+            return
+
+        _, job_id, pipeline, params, threads = message
+        current_job["job_id"] = job_id
+        # Fortschritts-Events über die Runner-Verbindung statt über eine eigene Pipe
+        job_progress.configure(lambda events, job_id=job_id: send(("progress", job_id, events)))
+        try:
+            return_code = pipeline_jobs.run_pipeline(pipeline, params, threads=threads, job_id=job_id)
+        except Exception:
+            traceback.print_exc()
+            return_code = 1
+        job_progress.configure(None)
+        drain_output()
+        current_job["job_id"] = None
+
+        jobs_done += 1
+        rss_mb = _current_rss_mb()
+        retire = jobs_done >= max_jobs or (max_rss_mb > 0 and rss_mb > max_rss_mb)
+        send(("done", job_id, return_code, rss_mb, retire))
+        if retire:
+            return
+
+
+class _Worker:
+    def __init__(self, max_jobs: int, max_rss_mb: float):
+        parent_sock, child_sock = socket.socketpair()
+        child_fd = child_sock.fileno()
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                str(Path(__file__).resolve()),
+                "--fd", str(child_fd),
+                "--max-jobs", str(max_jobs),
+                "--max-rss-mb", str(max_rss_mb),
+            ],
+            cwd=str(Path(__file__).resolve().parent.parent),
+            stdin=subprocess.DEVNULL,
+            pass_fds=(child_fd,),
+            # Eigene Prozessgruppe: Abbruch erfasst auch von BL-Code gestartete Kindprozesse
+            start_new_session=True,
+        )
+        child_sock.close()
+        self.conn = Connection(parent_sock.detach())
+        self.ready = False
+        self.preload_errors: Dict[str, str] = {}
+        self.jobs_done = 0
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.process.pid
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def wait_ready(self, on_log: Callable[[str], None]) -> None:
+        while not self.ready:
+            message = self.conn.recv()
+            if message[0] == "ready":
+                self.ready = True
+                self.preload_errors = message[1] or {}
+            elif message[0] == "log":
+                on_log(message[2])
+
+    async def open_stream(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Verbindung für die Eventloop öffnen (Duplikat des Sockets; danach `restore_blocking`)."""
+        sock = socket.socket(fileno=os.dup(self.conn.fileno()))
+        return await asyncio.open_connection(sock=sock)
+
+    def restore_blocking(self) -> None:
+        # O_NONBLOCK gilt für Original und Duplikat gemeinsam → für `conn.recv()` zurücksetzen
+        try:
+            os.set_blocking(self.conn.fileno(), True)
+        except OSError:
+            pass  # Verbindung bereits geschlossen (Worker beendet)
+
+    def kill(self) -> None:
+        try:
+            os.killpg(self.process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            logger.warning(f"Warm worker {self.pid} did not exit after kill")
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+
+
+class WorkerJobHandle:
+    """Handle eines laufenden Warm-Jobs (Popen-ähnlich für `DELETE /jobs/{id}`)."""
+
+    def __init__(self, worker: _Worker):
+        self._worker = worker
+        self.pid = worker.pid
+
+    def terminate(self) -> None:
+        # Job-Abbruch beendet den Worker; der Pool startet einen neuen
+        self._worker.kill()
+
+
+class WarmWorkerPool:
+    """Pool aus vorgewärmten Worker-Prozessen (Start bei Bedarf, Recycling nach Limits)."""
+
+    def __init__(self, size: int, max_jobs_per_worker: int = 20, max_rss_mb: float = 4096.0):
+        self.size = size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_mb = max_rss_mb
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._started = 0
+
+    def prestart(self) -> None:
+        """Alle Worker im Hintergrund starten und vorwärmen."""
+        def warm_up() -> None:
+            workers = []
+            with self._lock:
+                while self._started < self.size:
+                    workers.append(self._spawn())
+            for worker in workers:
+                try:
+                    worker.wait_ready(lambda line: logger.info(f"[warm-worker {worker.pid}] {line}"))
+                    self._report_preload(worker)
+                except (EOFError, OSError):
+                    self._discard(worker)
+                    continue
+                self._idle.put(worker)
+
+        threading.Thread(target=warm_up, name="warm-worker-prestart", daemon=True).start()
+
+    async def run_async(
+        self,
+        job_id: str,
+        pipeline: str,
+        params: Dict[str, Any],
+        on_log: Callable[[str], None],
+        on_start: Optional[Callable[[WorkerJobHandle], None]] = None,
+        threads: Optional[int] = None,
+        on_progress: Optional[Callable[[list], None]] = None,
+    ) -> int:
+        """Job in einem Warm-Worker auf der Eventloop ausführen; der laufende Job belegt keinen Thread."""
+        loop = asyncio.get_running_loop()
+        # Belegen kann einen Worker starten und auf sein Vorwärmen warten → nicht im Loop-Thread
+        worker = await loop.run_in_executor(None, self._acquire, on_log)
+        if on_start is not None:
+            on_start(WorkerJobHandle(worker))
+        done = None
+        writer = None
+        try:
+            reader, writer = await worker.open_stream()
+            writer.write(_frame(("run", job_id, pipeline, params, threads)))
+            await writer.drain()
+            while done is None:
+                message = await _read_message(reader)
+                kind = message[0]
+                if kind == "log":
+                    on_log(message[2])
+                elif kind == "progress":
+                    if on_progress is not None:
+                        on_progress(message[2])
+                elif kind == "done":
+                    done = message
+        except (EOFError, OSError, asyncio.IncompleteReadError):
+            pass  # Worker abgestürzt oder per terminate() beendet
+        finally:
+            if writer is not None:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except OSError:
+                    pass
+            worker.restore_blocking()
+
+        if done is None:
+            await loop.run_in_executor(None, self._discard, worker)
+            exit_code = worker.process.returncode
+            return exit_code if exit_code not in (None, 0) else 1
+        _, _, return_code, rss_mb, retire = done
+        if retire:
+            await loop.run_in_executor(None, self._release, worker, rss_mb, retire)
+        else:
+            self._release(worker, rss_mb, retire)
+        return int(return_code)
+
+    def _release(self, worker: _Worker, rss_mb: float, retire: bool) -> None:
+        """Worker nach einem Job zurückgeben bzw. recyceln."""
+        worker.jobs_done += 1
+        if retire:
+            logger.info(f"Recycling warm worker {worker.pid} after {worker.jobs_done} jobs ({rss_mb:.0f} MB RSS)")
+            self._discard(worker)
+        else:
+            self._idle.put(worker)
+
+    def shutdown(self) -> None:
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                worker.conn.send(("stop",))
+            except OSError:
+                pass
+            try:
+                worker.process.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                pass
+            self._discard(worker)
+
+    def _acquire(self, on_log: Callable[[str], None]) -> _Worker:
+        while True:
+            with self._lock:
+                spawn_new = self._started < self.size and self._idle.empty()
+                worker = self._spawn() if spawn_new else None
+            if worker is None:
+                worker = self._idle.get()
+            if not worker.alive():
+                self._discard(worker)
+                continue
+            try:
+                worker.wait_ready(on_log)
+            except (EOFError, OSError):
+                self._discard(worker)
+                continue
+            self._report_preload(worker)
+            return worker
+
+    def _spawn(self) -> _Worker:
+        # Aufrufer hält self._lock
+        self._started += 1
+        return _Worker(self.max_jobs_per_worker, self.max_rss_mb)
+
+    def _discard(self, worker: _Worker) -> None:
+        worker.kill()
+        with self._lock:
+            self._started -= 1
+
+    @staticmethod
+    def _report_preload(worker: _Worker) -> None:
+        for module_name, error in worker.preload_errors.items():
+            logger.warning(f"Warm worker {worker.pid}: preload of {module_name} failed: {error}")
+        worker.preload_errors = {}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Runner warm worker (intern)")
+    parser.add_argument("--fd", type=int, required=True)
+    parser.add_argument("--max-jobs", type=int, default=20)
+    parser.add_argument("--max-rss-mb", type=float, default=4096.0)
+    args = parser.parse_args()
+    _worker_main(Connection(args.fd), args.max_jobs, args.max_rss_mb)
@@ -0,0 +1,11 @@
+import sys
+from pathlib import Path
+
+# Wie ingest_data.py: Repo-Root (config), bl-input (flache Module) und BL-Pakete in den Pfad
+repo_root = Path(__file__).resolve().parents[1]
+sys.path[:0] = [
+    str(repo_root),
+    str(repo_root / "bl-input"),
+    str(repo_root / "bl-churn"),
+    str(repo_root / "json-database"),
+]
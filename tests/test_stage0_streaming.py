@@ -0,0 +1,95 @@
+"""
+Streaming-Stage0 gegen Step0 auf einer kleinen CSV.
+
+Beide Erzeuger bleiben getrennt: gleicher Inhalts-Hash, aber eigene Verzeichnisse und Formate;
+der Delta-Import liest nur Dateien mit Streaming-Kennung. Der Step0-Teil läuft nur mit bl-churn.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+import pytest
+
+from rawdata_delta import DeltaImportUnavailable, load_stage0_partition
+from stage0_streaming import (
+    STEP0_DIRECTORY,
+    STREAM_DIRECTORY,
+    STREAM_FORMAT,
+    is_stream_stage0,
+    stream_csv_to_stage0,
+)
+
+CSV = (
+    "Kunde;I_TIMEBASE;N_UMSATZ;I_ALIVE;S_REGION\n"
+    "1;202401;10,5;1;Nord\n"
+    "2;202401;;0;Süd\n"
+    "1;202402;12.25;1;Nord\n"
+    "3;202402;7;1;\n"
+    "2;202402;0,75;0;Süd\n"
+)
+
+EXPECTED_RECORDS = [
+    {"Kunde": 1, "I_TIMEBASE": 202401, "N_UMSATZ": 10.5, "I_ALIVE": 1, "S_REGION": "Nord"},
+    {"Kunde": 2, "I_TIMEBASE": 202401, "N_UMSATZ": None, "I_ALIVE": 0, "S_REGION": "Süd"},
+    {"Kunde": 1, "I_TIMEBASE": 202402, "N_UMSATZ": 12.25, "I_ALIVE": 1, "S_REGION": "Nord"},
+    {"Kunde": 3, "I_TIMEBASE": 202402, "N_UMSATZ": 7, "I_ALIVE": 1, "S_REGION": None},
+    {"Kunde": 2, "I_TIMEBASE": 202402, "N_UMSATZ": 0.75, "I_ALIVE": 0, "S_REGION": "Süd"},
+]
+
+
+@pytest.fixture
+def small_csv(tmp_path: Path) -> Path:
+    path = tmp_path / "ChurnData_test.csv"
+    path.write_text(CSV, encoding="utf-8")
+    return path
+
+
+def test_streaming_output_is_marked_and_chunk_independent(small_csv: Path, tmp_path: Path):
+    chunked, results = stream_csv_to_stage0(small_csv, tmp_path / "chunked", chunk_rows=2)
+    single, _ = stream_csv_to_stage0(small_csv, tmp_path / "single", chunk_rows=0)
+
+    assert chunked.read_bytes() == single.read_bytes()
+    assert is_stream_stage0(chunked)
+    data = json.loads(chunked.read_text(encoding="utf-8"))
+    assert next(iter(data)) == "format" and data["format"] == STREAM_FORMAT
+    assert data["csv_hash"] == results["csv_hash"] == hashlib.sha256(small_csv.read_bytes()).hexdigest()
+    assert data["row_count"] == 5
+    assert data["records"] == EXPECTED_RECORDS
+    assert data["column_stats"]["N_UMSATZ"]["nulls"] == 1
+    assert data["column_stats"]["Kunde"]["min"] == 1 and data["column_stats"]["Kunde"]["max"] == 3
+
+
+def test_delta_reader_accepts_only_streaming_format(small_csv: Path, tmp_path: Path):
+    stage0_path, _ = stream_csv_to_stage0(small_csv, tmp_path / STREAM_DIRECTORY, chunk_rows=2)
+    records, schema = load_stage0_partition(stage0_path)
+    assert records == EXPECTED_RECORDS
+    assert set(schema) == set(EXPECTED_RECORDS[0])
+
+    # Fremdes Format unter gleichem Namen (z. B. Step0): nie als Streaming-Stage0 gelesen
+    foreign = tmp_path / STEP0_DIRECTORY / stage0_path.name
+    foreign.parent.mkdir()
+    foreign.write_text(json.dumps({"csv_hash": "x", "records": EXPECTED_RECORDS}), encoding="utf-8")
+    assert not is_stream_stage0(foreign)
+    with pytest.raises(DeltaImportUnavailable):
+        load_stage0_partition(foreign)
+
+
+def test_streaming_matches_step0_identity_and_stays_separate(small_csv: Path, tmp_path: Path):
+    step0 = pytest.importorskip("bl.Churn.Step0_InputAnalysis")
+    from config.paths_config import ProjectPaths
+
+    stream_path, stream_results = stream_csv_to_stage0(small_csv, tmp_path / STREAM_DIRECTORY, chunk_rows=2)
+    step0_results = step0.analyze_csv_input(str(small_csv), force_reanalysis=True)
+    assert not step0_results.get("error")
+
+    # Gleiche Identität (Inhalts-Hash → Dateiname) ...
+    assert step0_results["csv_hash"] == stream_results["csv_hash"]
+    step0_path = ProjectPaths.dynamic_system_outputs_directory() / STEP0_DIRECTORY / f"{step0_results['csv_hash']}.json"
+    assert step0_path.exists()
+    # ... aber eigenes Format und Verzeichnis: Step0-Ausgabe bleibt Step0-Ausgabe
+    assert step0_path.parent.name != stream_path.parent.name
+    assert not is_stream_stage0(step0_path)
+    assert is_stream_stage0(stream_path)
+    if "row_count" in step0_results:
+        assert step0_results["row_count"] == stream_results["row_count"]
@@ -0,0 +1,77 @@
+"""
+Geteilter rawdata-Frame für Churn-Batches: einmal laden, je Experiment nur dessen Perioden.
+"""
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from config import training_frames
+from config.compact_dtypes import column_schema
+
+SCHEMA = {
+    "Kunde": column_schema("int32"),
+    "I_TIMEBASE": column_schema("period_yyyymm"),
+    "N_UMSATZ": column_schema("float64"),
+    "S_REGION": column_schema("category"),
+}
+
+EXPERIMENTS = [
+    {"id_files": [1, 2], "training_from": "202401", "training_to": "202402", "backtest_to": "202403"},
+    {"id_files": [1, 2], "training_from": 202402, "training_to": 202403, "backtest_to": "2024-04"},
+]
+
+
+def rawdata():
+    records = [
+        {"Kunde": customer, "I_TIMEBASE": timebase, "N_UMSATZ": customer * 1.5, "S_REGION": "Nord", "id_files": file_id}
+        for file_id, timebases in ((1, (202401, 202402)), (2, (202403, 202404)), (3, (202401,)))
+        for timebase in timebases
+        for customer in range(1, 6)
+    ]
+    # Absteigend gespeichert – der Frame sortiert einmal nach I_TIMEBASE
+    return {"records": records[::-1], "schema": SCHEMA}
+
+
+def test_union_window_covers_all_experiments():
+    assert training_frames.union_window(EXPERIMENTS) == (202401, 202404)
+    assert training_frames.union_window(EXPERIMENTS + [{"training_to": 202402}]) == (None, 202404)
+
+
+def test_experiment_slices_come_from_one_frame():
+    shared = training_frames.load_shared_frame(rawdata(), [1, 2], EXPERIMENTS)
+
+    # Nur die id_files des Jobs, nur numerische Spalten
+    assert len(shared) == 20
+    assert set(shared.frame.columns) == {"Kunde", "I_TIMEBASE", "N_UMSATZ"}
+
+    first = shared.for_experiment(EXPERIMENTS[0])
+    second = shared.for_experiment(EXPERIMENTS[1])
+    assert (first["I_TIMEBASE"].min(), first["I_TIMEBASE"].max(), len(first)) == (202401, 202403, 15)
+    assert (second["I_TIMEBASE"].min(), second["I_TIMEBASE"].max(), len(second)) == (202402, 202404, 15)
+
+
+def test_current_is_scoped_to_activate():
+    shared = training_frames.load_shared_frame(rawdata(), [1, 2], EXPERIMENTS)
+    assert training_frames.current() is None
+    with training_frames.activate(shared.for_experiment(EXPERIMENTS[0])):
+        assert len(training_frames.current()) == 15
+    assert training_frames.current() is None
+
+
+def test_repeat_load_reads_the_feature_cache(tmp_path):
+    from config.feature_cache import FeatureMatrixCache
+
+    cache = FeatureMatrixCache(root=tmp_path)
+    hashes = {"1": "stage0-a", "2": "stage0-b"}
+    first = training_frames.load_shared_frame(rawdata(), [1, 2], EXPERIMENTS, input_hashes=hashes, cache=cache)
+    # Zweiter Lauf ohne Records: Treffer über Stage0-Hashes + Periodenfenster
+    second = training_frames.load_shared_frame({}, [1, 2], EXPERIMENTS, input_hashes=hashes, cache=cache)
+
+    assert first.key == second.key and len(cache.entries()) == 1
+    assert len(second) == 20
+    assert len(second.for_experiment(EXPERIMENTS[1])) == 15
+
+    # Nicht auflösbare Eingabedatei → ohne Cache
+    uncached = training_frames.load_shared_frame(rawdata(), [1, 2], EXPERIMENTS, input_hashes={"1": "stage0-a"}, cache=cache)
+    assert uncached.key is None and len(cache.entries()) == 1
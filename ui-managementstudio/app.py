@@ -675,22 +675,35 @@ def delete_experiment(experiment_id: int):
             return jsonify({"error": "Experiment not found"}), 404
         db.save()
 
+        # Artefakte des Experiments entfernen; nicht mehr referenzierte Blobs (Run-Snapshots,
+        # Outbox) gibt die GC des Artifact Store frei
+        try:
+            import shutil
+            from config.artifact_store import ArtifactStore
+            for directory in (
+                ProjectPaths.artifacts_for_experiment(experiment_id),
+                ProjectPaths.outbox_churn_experiment_directory(experiment_id),
+                ProjectPaths.outbox_cox_experiment_directory(experiment_id),
+            ):
+                shutil.rmtree(directory, ignore_errors=True)
+            ArtifactStore().gc()
+        except Exception as e:
+            _append_log("WARNING", "ui", f"⚠️ Aufräumen der Artefakte für Experiment {experiment_id} fehlgeschlagen: {e}")
+
         # Optionales Aufräumen der Modelldateien: Behalte nur jeweils die neueste .json und .joblib
         try:
-            import glob
             models_dir = ProjectPaths.get_models_directory()
             if models_dir.exists():
                 json_files = sorted(models_dir.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
                 joblib_files = sorted(models_dir.glob("*.joblib"), key=lambda p: p.stat().st_mtime, reverse=True)
                 # Lösche alle bis auf die jeweils neueste Datei
-                for p in (json_files[1:] if len(json_files) > 1 else []):
-                    try: p.unlink()
-                    except Exception: pass
-                for p in (joblib_files[1:] if len(joblib_files) > 1 else []):
-                    try: p.unlink()
-                    except Exception: pass
-        except Exception:
-            pass
+                for p in json_files[1:] + joblib_files[1:]:
+                    try:
+                        p.unlink()
+                    except Exception as e:
+                        _append_log("WARNING", "ui", f"⚠️ Modelldatei {p.name} konnte nicht gelöscht werden: {e}")
+        except Exception as e:
+            _append_log("WARNING", "ui", f"⚠️ Aufräumen der Modelldateien fehlgeschlagen: {e}")
 
         return jsonify({"success": True})
     except Exception as e:
@@ -1112,24 +1125,27 @@ def outbox_info():
     try:
         base = ProjectPaths.outbox_directory()
         stage0 = (base / "stage0_cache").resolve()
+        # Streaming-Stage0 (eigenes Format) liegt getrennt von Step0 in stage0_stream
+        stream = (base / "stage0_stream").resolve()
+        items = [p for d in (stage0, stream) if d.exists() for p in d.glob("*.json")]
         files = []
-        if stage0.exists():
-            # Jüngste zuerst (max 20)
-            items = sorted(stage0.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)[:20]
-            for p in items:
-                try:
-                    st = p.stat()
-                    files.append({
-                        "name": p.name,
-                        "path": str(p),
-                        "size": st.st_size,
-                        "mtime": st.st_mtime
-                    })
-                except Exception:
-                    files.append({"name": p.name, "path": str(p)})
+        # Jüngste zuerst (max 20)
+        for p in sorted(items, key=lambda p: p.stat().st_mtime, reverse=True)[:20]:
+            try:
+                st = p.stat()
+                files.append({
+                    "name": p.name,
+                    "path": str(p),
+                    "source": p.parent.name,
+                    "size": st.st_size,
+                    "mtime": st.st_mtime
+                })
+            except Exception:
+                files.append({"name": p.name, "path": str(p), "source": p.parent.name})
         return jsonify({
             "outbox_root": str(base),
             "stage0_dir": str(stage0),
+            "stream_dir": str(stream),
             "files": files,
             "count": len(files)
         })